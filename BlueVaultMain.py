@@ -3,6 +3,12 @@ BlueVault Main Application Controller
 
 This file manages the application flow and global settings.
 Run this file to start the BlueVault application.
+
+Startup is kept light so the login window shows quickly: only tkinter and
+the login screen are imported here. Cryptography, the vault and settings
+services and the main menu are imported while the login screen waits for
+the master password (or after login). Run with --profile-startup to
+measure it (see utils/startup_profile.py).
 """
 
 import sys
@@ -33,17 +39,39 @@ class AppConfig:
 
 def main():
     """Main entry point for BlueVault application."""
+    profiling = "--profile-startup" in sys.argv[1:]
+    timer = None
+    if profiling:
+        if "importtime" not in sys._xoptions:
+            # Re-run this script under -X importtime and report on it
+            from utils.startup_profile import run_profiled
+            return run_profiled(os.path.abspath(__file__), sys.argv[1:])
+        from utils.startup_profile import StartupTimer
+        timer = StartupTimer()
+        timer.mark("interpreter + BlueVaultMain.py")
+
     print(f"Starting {AppConfig.APP_NAME} v{AppConfig.VERSION}...")
-    
+
     # Import login window
     from gui.ui_login import LoginWindow
-    
+    if timer:
+        timer.mark("import login window")
+
     # Start with login window
     app = LoginWindow()
+    if timer:
+        timer.mark("build login window")
+        app.update()  # map the window and draw its first frame
+        timer.mark("first frame")
+        timer.report()
+        app.destroy()
+        return 0
+
     app.mainloop()
-    
+
     print("BlueVault closed.")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
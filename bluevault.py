@@ -0,0 +1,425 @@
+"""
+BlueVault command line interface (no GUI).
+
+Usage:
+    python bluevault.py -u USER list [--sort MODE] [--limit N]
+    python bluevault.py -u USER search QUERY
+    python bluevault.py -u USER get NAME_OR_ID [--field password]
+    python bluevault.py -u USER add NAME [--username U] [--url URL] [--generate]
+    python bluevault.py generate [--length 16] [--no-symbols]
+    python bluevault.py [-u USER] audit [--vault]
+
+    python bluevault.py -u USER unlock [--ttl SECONDS]
+    python bluevault.py [-u USER] lock [--all]
+    python bluevault.py agent start|stop|status
+
+The user can also be given with the BLUEVAULT_USER environment variable.
+The master password is prompted for, or read from the first line of stdin
+with --password-stdin. After "unlock" the derived vault key is cached in
+the key agent (services/key_agent.py) and later commands skip the prompt
+and the key derivation until the key expires or "lock" is run.
+
+Only the requested values are written to stdout (get --field password
+prints just the password, ready to pipe); the services' status messages
+go to stderr. Everything beyond argparse is imported lazily inside the
+command that needs it, and tkinter is never imported, so the CLI starts
+quickly and works without a display.
+"""
+
+import argparse
+import os
+import sys
+
+
+class CLIError(Exception):
+    """A command failed; the message is printed and the exit status is 1."""
+
+
+# ----------------------------------------------------------------------
+# Unlocking
+# ----------------------------------------------------------------------
+def _read_master_password(args):
+    if args.password_stdin:
+        return sys.stdin.readline().rstrip("\r\n")
+    import getpass
+    return getpass.getpass(f"Master password for {args.user}: ")
+
+
+def _require_user(args):
+    if not args.user:
+        raise CLIError("No user given (use -u USER or set BLUEVAULT_USER).")
+
+
+def _verify_master_password(args):
+    """Prompt for (or read) the master password and check it."""
+    from services.login import LoginManager
+
+    password = _read_master_password(args)
+    ok, message = LoginManager().verify_login(args.user, password)
+    if not ok:
+        raise CLIError(message)
+    return password
+
+
+def _open_with_agent_key(username, storage):
+    """
+    Unlock with a key cached by the key agent.
+
+    Returns:
+        AccountManager, or None if the agent has no (valid) key
+    """
+    from services import key_agent
+
+    key = key_agent.fetch_key(username)
+    if key is None:
+        return None
+
+    from services import vault_file
+    from services.account import AccountManager
+    try:
+        manager = AccountManager(username, key=key, storage=storage)
+    except vault_file.VaultKeyError:
+        manager = None
+    if (manager is not None and storage == "json"
+            and vault_file.verify_key(manager.vault_file, key) is False):
+        manager = None
+    if manager is None:
+        # The master password changed since the key was cached
+        key_agent.forget_key(username)
+    return manager
+
+
+def _open_vault(args):
+    """Return an unlocked AccountManager, using the key agent if possible."""
+    _require_user(args)
+    # Not SettingsManager: that would write a settings file for any
+    # user name typed, before the master password is checked
+    from services.settings import read_vault_storage
+    storage = read_vault_storage(args.user)
+
+    if not args.password_stdin:
+        manager = _open_with_agent_key(args.user, storage)
+        if manager is not None:
+            return manager
+
+    password = _verify_master_password(args)
+    from services.account import AccountManager
+    return AccountManager(args.user, password, storage=storage)
+
+
+def _find_one(manager, name_or_id, exact=False):
+    """
+    Resolve an account id or (case-insensitive) account name to one entry.
+
+    Without an exact name match a unique fuzzy match is accepted, unless
+    ``exact`` is set (when a secret is about to be printed).
+    """
+    if name_or_id.isdigit():
+        account = manager.get_account(int(name_or_id), include_secrets=False)
+        if account is None:
+            raise CLIError(f"No account with id {name_or_id}.")
+        return account
+
+    matches = manager.find_accounts_by_name(name_or_id)
+    if not matches:
+        # Fall back to the quick switcher's fuzzy match
+        matches = manager.fuzzy_find(name_or_id, limit=2)
+        if matches and exact:
+            # A typo must not print another account's secret
+            names = " or ".join(f"'{a['account_name']}' (id {a['id']})" for a in matches)
+            raise CLIError(f"No account named '{name_or_id}'. Did you mean {names}? "
+                           f"Use the exact name or the id.")
+    if not matches:
+        raise CLIError(f"No account named '{name_or_id}'.")
+    if len(matches) > 1:
+        ids = ", ".join(f"{a['id']} ({a['account_name']})" for a in matches)
+        raise CLIError(f"'{name_or_id}' matches several accounts: {ids}. Use the id.")
+    return matches[0]
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+_LIST_FIELDS = ("account_name", "username", "website_url")
+
+_SORT_MODES = ("alphabetical", "date_created", "date_modified", "last_copied", "most_used")
+
+
+def _print_accounts(out, accounts, as_json):
+    if as_json:
+        import json
+        json.dump(accounts, out, indent=2)
+        out.write("\n")
+        return
+    for account in accounts:
+        line = f"{account['id']:>5}  {account.get('account_name') or ''}"
+        if account.get("username"):
+            line += f"  ({account['username']})"
+        if account.get("website_url"):
+            line += f"  {account['website_url']}"
+        out.write(line + "\n")
+
+
+# ----------------------------------------------------------------------
+# Commands
+# ----------------------------------------------------------------------
+def cmd_list(args, out):
+    manager = _open_vault(args)
+    sort_by = args.sort
+    if sort_by is None:
+        from services.settings import SettingsManager
+        sort_by = SettingsManager(args.user).get_account_sort_by()
+    accounts = list(manager.iter_accounts(sort_by, limit=args.limit, fields=_LIST_FIELDS))
+    _print_accounts(out, accounts, args.json)
+
+
+def cmd_search(args, out):
+    from services.query_filter import QueryError
+
+    manager = _open_vault(args)
+    # The vault is open, so the login was checked: the settings file may
+    # be created now
+    from services.settings import SettingsManager
+    manager.renewal_days = SettingsManager(args.user).get_password_renewal_days()
+    try:
+        accounts = list(manager.iter_accounts(
+            args.sort, query=" ".join(args.query), limit=args.limit, fields=_LIST_FIELDS
+        ))
+    except QueryError as e:
+        raise CLIError(f"Invalid filter: {e}")
+    _print_accounts(out, accounts, args.json)
+
+
+def cmd_get(args, out):
+    manager = _open_vault(args)
+    secret = args.field in ("password", "notes")
+    account = _find_one(manager, args.account, exact=secret)
+    if secret:
+        out.write(manager.get_secret(account["id"], args.field) + "\n")
+        if args.field == "password":
+            manager.update_last_copied(account["id"])
+        return
+    if args.field is not None:
+        key = "website_url" if args.field == "url" else args.field
+        out.write(f"{account.get(key) or ''}\n")
+        return
+
+    account = manager.get_account(account["id"], include_secrets=False)
+    if args.json:
+        _print_accounts(out, [account], True)
+        return
+    for label, key in (("Id", "id"), ("Name", "account_name"), ("Username", "username"),
+                       ("Website", "website_url"), ("Created", "created_date"),
+                       ("Modified", "last_modified"), ("Password changed", "last_password_change"),
+                       ("Last copied", "last_copied")):
+        out.write(f"{label + ':':<18}{account.get(key) or '-'}\n")
+
+
+def cmd_add(args, out):
+    manager = _open_vault(args)
+    if args.generate:
+        from services.password_generator import PasswordGenerator
+        password = PasswordGenerator().generate_password(length=args.length)
+    else:
+        import getpass
+        password = getpass.getpass(f"Password for {args.name}: ")
+
+    account = manager.create_account(
+        args.name, args.username or "", password,
+        notes=args.notes or "", website_url=args.url or "",
+    )
+    if account is None:
+        raise CLIError("Could not save the new account.")
+    out.write(f"Added account {account['id']} ({account['account_name']}).\n")
+    if args.generate and args.print_password:
+        out.write(password + "\n")
+
+
+def cmd_generate(args, out):
+    from services.password_generator import PasswordGenerator
+
+    try:
+        password = PasswordGenerator().generate_password(
+            length=args.length,
+            include_uppercase=not args.no_uppercase,
+            include_lowercase=not args.no_lowercase,
+            include_digits=not args.no_digits,
+            include_symbols=not args.no_symbols,
+        )
+    except ValueError as e:
+        raise CLIError(str(e))
+    out.write(password + "\n")
+
+
+def cmd_audit(args, out):
+    from services.password_auditor import PasswordAuditor
+
+    auditor = PasswordAuditor()
+    if not args.vault:
+        # Audit a single password typed at the prompt
+        import getpass
+        report = auditor.audit_password(getpass.getpass("Password to audit: "))
+        out.write(f"Strength: {report['score']} ({report['entropy']:.1f} bits)\n")
+        for warning in report["warnings"]:
+            out.write(f"  - {warning}\n")
+        return
+
+    # Audit every entry in the vault
+    manager = _open_vault(args)
+    weak = 0
+    for account in manager.iter_accounts("alphabetical", fields=("account_name", "password")):
+        report = auditor.audit_password(account["password"])
+        if report["score"] == "Weak" or report["breached"]:
+            weak += 1
+            flags = "breached, " if report["breached"] else ""
+            out.write(f"{account['id']:>5}  {account['account_name']}: "
+                      f"{flags}{report['score']} ({report['entropy']:.1f} bits)\n")
+    out.write(f"{weak} weak or breached password(s).\n")
+
+
+def cmd_unlock(args, out):
+    from services import key_agent, vault_file
+    from services.settings import DEFAULT_SETTINGS, SettingsManager
+
+    _require_user(args)
+    password = _verify_master_password(args)
+    ttl = args.ttl or SettingsManager(args.user).get_auto_logout_time()
+    if ttl <= 0:
+        ttl = DEFAULT_SETTINGS["auto_logout_time"]
+    try:
+        key_agent.start_agent()
+        key_agent.store_key(args.user, vault_file.derive_key(password), ttl)
+    except key_agent.AgentError as e:
+        raise CLIError(f"Key agent: {e}")
+    out.write(f"Unlocked {args.user}; the key is forgotten after {ttl} s without use.\n")
+
+
+def cmd_lock(args, out):
+    from services import key_agent
+
+    if args.all:
+        out.write(f"Forgot {key_agent.forget_all()} key(s).\n")
+        return
+    _require_user(args)
+    if key_agent.forget_key(args.user):
+        out.write(f"Locked {args.user}.\n")
+    else:
+        out.write(f"{args.user} was not unlocked.\n")
+
+
+def cmd_agent(args, out):
+    from services import key_agent
+
+    if args.action == "start":
+        try:
+            key_agent.start_agent()
+        except key_agent.AgentError as e:
+            raise CLIError(f"Key agent: {e}")
+        out.write(f"Key agent running on {key_agent.agent_socket_path()}\n")
+    elif args.action == "stop":
+        stopped = key_agent.stop_agent()
+        out.write("Key agent stopped.\n" if stopped else "Key agent was not running.\n")
+    else:
+        try:
+            keys = key_agent.list_keys()
+        except key_agent.AgentError:
+            out.write("Key agent is not running.\n")
+            return
+        out.write(f"Key agent running on {key_agent.agent_socket_path()}\n")
+        for username, seconds in sorted(keys.items()):
+            out.write(f"  {username}: expires in {seconds} s unless used\n")
+
+
+# ----------------------------------------------------------------------
+# Argument parsing
+# ----------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bluevault", description="BlueVault password manager (command line).")
+    parser.add_argument("-u", "--user", default=os.environ.get("BLUEVAULT_USER"),
+                        help="BlueVault username (default: $BLUEVAULT_USER)")
+    parser.add_argument("--password-stdin", action="store_true",
+                        help="read the master password from the first line of stdin")
+    parser.add_argument("--json", action="store_true", help="print entries as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="list accounts")
+    p.add_argument("--sort", choices=_SORT_MODES, help="sort mode (default: your settings)")
+    p.add_argument("--limit", type=int)
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("search", help="search accounts (same filters as the search box)")
+    p.add_argument("query", nargs="+")
+    p.add_argument("--sort", choices=_SORT_MODES, default="alphabetical")
+    p.add_argument("--limit", type=int)
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("get", help="show one account, or print one field")
+    p.add_argument("account", help="account id or name")
+    p.add_argument("-f", "--field", choices=("password", "username", "notes", "url"),
+                   help="print only this field")
+    p.set_defaults(func=cmd_get)
+
+    p = commands.add_parser("add", help="add an account")
+    p.add_argument("name")
+    p.add_argument("--username")
+    p.add_argument("--url")
+    p.add_argument("--notes")
+    p.add_argument("--generate", action="store_true", help="generate the password")
+    p.add_argument("--length", type=int, default=16, help="generated password length")
+    p.add_argument("--print-password", action="store_true",
+                   help="print the generated password")
+    p.set_defaults(func=cmd_add)
+
+    p = commands.add_parser("generate", help="generate a password")
+    p.add_argument("--length", type=int, default=16)
+    p.add_argument("--no-uppercase", action="store_true")
+    p.add_argument("--no-lowercase", action="store_true")
+    p.add_argument("--no-digits", action="store_true")
+    p.add_argument("--no-symbols", action="store_true")
+    p.set_defaults(func=cmd_generate)
+
+    p = commands.add_parser("audit", help="audit a password, or every password in a vault")
+    p.add_argument("--vault", action="store_true", help="audit every password in the user's vault")
+    p.set_defaults(func=cmd_audit)
+
+    p = commands.add_parser("unlock", help="cache the vault key in the key agent")
+    p.add_argument("--ttl", type=int,
+                   help="seconds without use before the key is forgotten "
+                        "(default: your auto-logout time)")
+    p.set_defaults(func=cmd_unlock)
+
+    p = commands.add_parser("lock", help="forget the cached vault key")
+    p.add_argument("--all", action="store_true", help="forget every user's key")
+    p.set_defaults(func=cmd_lock)
+
+    p = commands.add_parser("agent", help="start, stop or inspect the key agent")
+    p.add_argument("action", choices=("start", "stop", "status"))
+    p.set_defaults(func=cmd_agent)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Services report progress with print(); keep stdout for results only
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        args.func(args, out)
+    except CLIError as e:
+        print(f"bluevault: {e}", file=sys.stderr)
+        return 1
+    except EOFError:
+        print("bluevault: no master password given", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        sys.stdout = out
+        out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
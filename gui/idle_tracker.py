@@ -0,0 +1,131 @@
+import time
+
+
+class IdleTracker:
+    """
+    Calls ``on_expire`` once a window has seen no input for ``timeout`` seconds.
+
+    Key presses and clicks only record a time.monotonic() timestamp. A
+    single after() callback is pending at a time, due at the current
+    deadline; if input has moved the deadline on by the time it fires, it
+    re-arms for the new one. The monotonic clock keeps the deadline right
+    when the wall clock jumps (NTP, DST, suspend and resume).
+
+    An optional countdown label is redrawn once per second at most, and
+    only while it is visible: ticking stops when the window is hidden or
+    minimized and starts again when it is shown.
+
+    The main menu tracks every window of its Tk interpreter (bind_all);
+    a child window can track just itself:
+
+        IdleTracker(self, 120, on_expire=self.destroy).start()
+    """
+
+    def __init__(self, widget, timeout, on_expire, label=None, format_label=None,
+                 bind_all=False):
+        """
+        Args:
+            widget: window whose input resets the timer (and that runs the
+                    after() callbacks)
+            timeout: seconds of inactivity before on_expire is called
+            on_expire: callable() run once when the timeout is reached
+            label: optional tk.Label showing the time left
+            format_label: callable(seconds_left) -> label text
+            bind_all: track input in every window of the application
+                      instead of only ``widget`` and its children
+        """
+        self.widget = widget
+        self.timeout = timeout
+        self.on_expire = on_expire
+        self.label = label
+        self.format_label = format_label
+        self.last_input = time.monotonic()
+        self._running = False
+        self._expire_id = None
+        self._tick_id = None
+        self._shown_seconds = None
+
+        if bind_all:
+            widget.bind_all("<Key>", self.touch, add="+")
+            widget.bind_all("<Button>", self.touch, add="+")
+        else:
+            widget.bind("<Key>", self.touch, add="+")
+            widget.bind("<Button>", self.touch, add="+")
+        if label is not None:
+            label.winfo_toplevel().bind("<Map>", self._on_map, add="+")
+
+    def touch(self, event=None):
+        """Record user input (the only work done per key press or click)."""
+        self.last_input = time.monotonic()
+
+    def remaining(self):
+        """Seconds left until the timeout (never negative)."""
+        return max(0.0, self.last_input + self.timeout - time.monotonic())
+
+    def start(self):
+        """Start (or restart) tracking, counting from now."""
+        self.stop()
+        self._running = True
+        self.touch()
+        self._arm()
+        self._tick()
+
+    def stop(self):
+        """Stop tracking; on_expire will not be called."""
+        self._running = False
+        for after_id in (self._expire_id, self._tick_id):
+            if after_id is not None:
+                try:
+                    self.widget.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._expire_id = None
+        self._tick_id = None
+
+    def set_timeout(self, timeout):
+        """Change the timeout; a running tracker re-arms for the new deadline."""
+        self.timeout = timeout
+        if self._running:
+            if self._expire_id is not None:
+                self.widget.after_cancel(self._expire_id)
+            self._arm()
+            self._shown_seconds = None
+            self._tick()
+
+    def _arm(self):
+        # +1 ms so the callback never lands just before the deadline
+        delay_ms = int(self.remaining() * 1000) + 1
+        self._expire_id = self.widget.after(delay_ms, self._check_deadline)
+
+    def _check_deadline(self):
+        self._expire_id = None
+        if not self._running:
+            return
+        if self.remaining() > 0:
+            self._arm()  # input moved the deadline on
+            return
+        self.stop()
+        self.on_expire()
+
+    def _tick(self):
+        """Redraw the countdown label, then wait for the next whole second."""
+        self._tick_id = None
+        if not self._running or self.label is None:
+            return
+        try:
+            if not self.label.winfo_viewable():
+                return  # resumed by _on_map when shown again
+            remaining = self.remaining()
+            seconds = int(remaining + 0.999)
+            if seconds != self._shown_seconds:
+                self._shown_seconds = seconds
+                self.label.config(text=self.format_label(seconds))
+        except Exception:
+            return  # label destroyed
+        # Wake up when the displayed second changes
+        delay_ms = int((remaining - (seconds - 1)) * 1000) + 1 if seconds else 1000
+        self._tick_id = self.widget.after(delay_ms, self._tick)
+
+    def _on_map(self, event=None):
+        if self._running and self._tick_id is None:
+            self._tick()
@@ -0,0 +1,129 @@
+import tkinter as tk
+
+
+class LockScreen(tk.Frame):
+    """
+    Overlay that covers a locked main menu.
+
+    The main menu stays built underneath (cards, search, scroll position);
+    only the vault key is dropped. Unlocking takes the master password or,
+    if one was set, the session PIN. After a master-password unlock a new
+    session PIN can be chosen for next time.
+    """
+
+    def __init__(self, master, username, reason, pin_set, on_unlock, on_logout):
+        """
+        Args:
+            master: the main menu window
+            username: the logged-in user
+            reason: why the session locked (shown under the title)
+            pin_set: True if a session PIN can be used to unlock
+            on_unlock: callable(secret, new_pin) -> (success, message)
+            on_logout: callable() that logs out completely
+        """
+        super().__init__(master, bg="#23272a")
+        self.on_unlock = on_unlock
+        self.on_logout = on_logout
+        self.pin_set = pin_set
+
+        self.create_widgets(username, reason)
+        self.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self.tkraise()
+        self.secret_entry.focus_force()
+
+    def create_widgets(self, username, reason):
+        form_frame = tk.Frame(self, bg="#23272a", highlightbackground="#7289da", highlightthickness=2, bd=0)
+        form_frame.place(relx=0.5, rely=0.45, anchor="center")
+
+        tk.Label(
+            form_frame,
+            text="🔒 BlueVault is locked",
+            font=("Arial", 20, "bold"),
+            bg="#23272a",
+            fg="#7289da"
+        ).grid(row=0, column=0, columnspan=2, padx=20, pady=(15, 5))
+
+        tk.Label(
+            form_frame,
+            text=f"{reason}\nLogged in as: {username}",
+            font=("Arial", 11),
+            bg="#23272a",
+            fg="#ffffff"
+        ).grid(row=1, column=0, columnspan=2, pady=(0, 15))
+
+        entry_style = {
+            "font": ("Arial", 12), "width": 25, "show": "*",
+            "bg": "#2c2f33", "fg": "#ffffff", "insertbackground": "#ffffff",
+            "relief": tk.FLAT, "highlightthickness": 1, "highlightbackground": "#444",
+        }
+
+        tk.Label(
+            form_frame,
+            text="Session PIN or master password:" if self.pin_set else "Master password:",
+            font=("Arial", 12),
+            bg="#23272a",
+            fg="#ffffff"
+        ).grid(row=2, column=0, sticky="e", padx=10, pady=10)
+
+        self.secret_entry = tk.Entry(form_frame, **entry_style)
+        self.secret_entry.grid(row=2, column=1, padx=10, pady=10)
+        self.secret_entry.bind("<Return>", lambda e: self.handle_unlock())
+
+        # Without a PIN, offer to set one for the next unlock
+        self.new_pin_entry = None
+        if not self.pin_set:
+            tk.Label(
+                form_frame,
+                text="New session PIN (optional):",
+                font=("Arial", 12),
+                bg="#23272a",
+                fg="#ffffff"
+            ).grid(row=3, column=0, sticky="e", padx=10, pady=10)
+
+            self.new_pin_entry = tk.Entry(form_frame, **entry_style)
+            self.new_pin_entry.grid(row=3, column=1, padx=10, pady=10)
+            self.new_pin_entry.bind("<Return>", lambda e: self.handle_unlock())
+
+        self.error_label = tk.Label(
+            form_frame,
+            text="",
+            font=("Arial", 10),
+            bg="#23272a",
+            fg="#F44336"
+        )
+        self.error_label.grid(row=4, column=0, columnspan=2)
+
+        button_style = {
+            "font": ("Arial", 13, "bold"),
+            "width": 15,
+            "bg": "#2196F3",
+            "fg": "white",
+            "activebackground": "#1976D2",
+            "activeforeground": "#ffffff",
+            "cursor": "hand2",
+            "highlightbackground": "#23272a",
+            "highlightthickness": 0,
+            "bd": 0,
+            "relief": tk.FLAT,
+        }
+
+        button_frame = tk.Frame(form_frame, bg="#23272a")
+        button_frame.grid(row=5, column=0, columnspan=2, pady=(10, 15))
+
+        tk.Button(button_frame, text="Unlock", command=self.handle_unlock, **button_style).pack(
+            side=tk.LEFT, padx=8, ipady=4, ipadx=4
+        )
+        tk.Button(button_frame, text="Log Out", command=self.on_logout, **button_style).pack(
+            side=tk.LEFT, padx=8, ipady=4, ipadx=4
+        )
+
+    def handle_unlock(self):
+        secret = self.secret_entry.get()
+        new_pin = self.new_pin_entry.get() if self.new_pin_entry is not None else ""
+        if not secret:
+            return
+        success, message = self.on_unlock(secret, new_pin)
+        if not success:
+            self.error_label.config(text=message)
+            self.secret_entry.delete(0, tk.END)
+            self.secret_entry.focus()
@@ -10,22 +10,46 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 class LoginWindow(tk.Tk):
     """Login window with account creation and login functionality."""
 
+    # Modules the main menu needs after login, imported while the login
+    # screen is idle (one per idle callback, so typing stays responsive)
+    WARM_UP_MODULES = (
+        "cryptography.fernet",
+        "services.account",
+        "services.settings",
+        "services.query_filter",
+        "ui_main_menu",
+    )
+
+    # Wait this long after the login screen shows before warming up
+    WARM_UP_DELAY_MS = 300
+
     def __init__(self):
         super().__init__()
         self.title("BlueVault - Login")
         self.geometry("500x400")
         self.configure(bg="#23272a")  # Dark gray background
 
-        # Import login manager
-        from services.login import LoginManager
-        self.login_manager = LoginManager()
+        # Login manager, created on first use so that importing it (and
+        # creating accounts.json on a first run) stays off the startup path
+        self._login_manager = None
 
         # Store the logged-in username (passed to main menu on success)
         self.logged_in_username = None
 
+        # Pending idle warm-up steps (None until the login screen is shown)
+        self._warm_up_steps = None
+
         # Show initial screen
         self.show_initial_screen()
 
+    @property
+    def login_manager(self):
+        """The LoginManager, created when first needed."""
+        if self._login_manager is None:
+            from services.login import LoginManager
+            self._login_manager = LoginManager()
+        return self._login_manager
+
     def clear_window(self):
         """Clear all widgets from the window."""
         for widget in self.winfo_children():
@@ -125,6 +149,15 @@ class LoginWindow(tk.Tk):
         self.login_username_entry.bind("<Return>", lambda e: self.login_password_entry.focus())
         self.login_password_entry.bind("<Return>", lambda e: self.handle_login())
 
+        # Read the user's vault file once they move on to the password
+        self.login_username_entry.bind(
+            "<FocusOut>",
+            lambda e: self.after_idle(self._prefetch_vault, self.login_username_entry.get().strip())
+        )
+
+        # Warm up the main menu's imports while the user types
+        self.start_warm_up()
+
         # Button style
         button_style = {
             "font": ("Arial", 13, "bold"),
@@ -152,6 +185,48 @@ class LoginWindow(tk.Tk):
         back_btn = tk.Button(button_frame, text="Back", command=self.show_initial_screen, **button_style)
         back_btn.pack(side=tk.LEFT, padx=8, ipady=4, ipadx=4)
 
+    def start_warm_up(self):
+        """
+        Prepare for the main menu while the login screen is idle.
+
+        Imports the modules it needs and loads the login and breach data,
+        so that after login only the key derivation and vault decryption
+        remain. Runs once; each step gets its own idle callback.
+        """
+        if self._warm_up_steps is not None:
+            return
+        from importlib import import_module
+        self._warm_up_steps = [lambda: self.login_manager]
+        self._warm_up_steps += [lambda m=m: import_module(m) for m in self.WARM_UP_MODULES]
+        self._warm_up_steps.append(self._warm_up_breach_list)
+        self.after(self.WARM_UP_DELAY_MS, self._run_warm_up_step)
+
+    def _run_warm_up_step(self):
+        if not self._warm_up_steps:
+            return
+        step = self._warm_up_steps.pop(0)
+        try:
+            step()
+        except Exception as e:
+            print(f"[login] Warm-up step failed: {e}")
+        # Idle callbacks run after pending events, e.g. keystrokes
+        self.after_idle(self._run_warm_up_step)
+
+    def _warm_up_breach_list(self):
+        from services.password_auditor import PasswordAuditor
+        PasswordAuditor.preload()
+
+    def _prefetch_vault(self, username):
+        """Read ``username``'s (still encrypted) vault file into memory."""
+        if not username or not self.login_manager.user_exists(username):
+            return
+        from services.settings import read_vault_storage
+        if read_vault_storage(username) != "json":
+            return  # SQLite reads its own pages; the JSON file is not used
+        from services import vault_file
+        from services.account import vault_path
+        vault_file.prefetch(vault_path(username))
+
     def show_create_account_screen(self):
         """Show the create account screen."""
         self.clear_window()
@@ -7,6 +7,23 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 class MainMenu(tk.Tk):
+    # Cards rendered per page; "Show more" appends the next page
+    PAGE_SIZE = 60
+
+    # Copies are written to the vault in one batch this long after the
+    # first one (see copy_to_clipboard)
+    COPY_FLUSH_DELAY_MS = 2000
+
+    # Entry fields a card displays. The password and notes are not among
+    # them: they share one encrypted token, decrypted only when one of
+    # them is shown or copied, so rendering a page decrypts nothing.
+    CARD_FIELDS = ("account_name", "username", "website_url", "last_password_change")
+
+    # Password age label color per renewal level (metadata_columns FRESH,
+    # AGING, OLD, OVERDUE): gray, then yellow / orange for the middle and
+    # last third of the renewal period, red once overdue
+    RENEWAL_COLORS = ("#666666", "#F9A825", "#FB8C00", "#F44336")
+
     def __init__(self, username="User", login_window=None, auto_logout_time=300, master_password=None):
         super().__init__()
         self.title("BlueVault")
@@ -26,20 +43,44 @@ class MainMenu(tk.Tk):
             auto_logout_time = settings_logout
 
         self.auto_logout_time = auto_logout_time  # in seconds
-        self.time_remaining = auto_logout_time
 
-        # Initialize account manager
+        # Initialize account manager (vault load errors are shown in a dialog)
         from services.account import AccountManager
-        self.account_manager = AccountManager(username, master_password)
+        from tkinter import messagebox
+        self.account_manager = AccountManager(
+            username, master_password,
+            storage=self.settings_manager.get_vault_storage(),
+            on_error=messagebox.showerror,
+            secret_ttl=self.settings_manager.get_clipboard_autoclear_seconds(),
+        )
+
+        # Pending purge of expired entries from the secret cache
+        self._secret_purge_after_id = None
 
         # Track clipboard auto-clear scheduler id and fingerprint
         self._clipboard_clear_after_id = None
         self._clipboard_expected_text = None
 
-        # Store reference to opened windows
+        # Pending write of recorded copies (see _schedule_copy_flush)
+        self._copy_flush_after_id = None
+
+        # Session lock: the overlay while locked, and the optional PIN
+        from services.session_lock import SessionPin
+        self.session_pin = SessionPin()
+        self._lock_screen = None
+        self._refresh_pending = False
+
+        # (hide, restore) callbacks for the cards' decrypted secrets
+        # (a revealed password or notes), run on lock and unlock
+        self._secret_views = []
+
+        # Store reference to opened windows. The generator, auditor and
+        # settings windows are built on first use and then only hidden and
+        # shown again (see _show_cached_window)
         self.password_generator_window = None
         self.password_auditor_window = None
         self.settings_window = None
+        self.quick_switcher_window = None
 
         self.create_header()
         self.create_main_content()
@@ -48,9 +89,25 @@ class MainMenu(tk.Tk):
         self.bind("<Configure>", self._on_window_resize)
         self._resize_timer = None
 
-        # Reset auto-logout timer on any user input
-        self.bind_all("<Key>", self._reset_timer)
-        self.bind_all("<Button>", self._reset_timer)
+        # Auto-lock after auto_logout_time seconds without input in any
+        # BlueVault window
+        from idle_tracker import IdleTracker
+        self.idle_tracker = IdleTracker(
+            self, auto_logout_time,
+            on_expire=self._on_idle_timeout,
+            label=self.timer_label,
+            format_label=self._format_time,
+            bind_all=True,
+        )
+
+        # Ctrl+K opens the quick switcher palette, Ctrl+L locks
+        self.bind("<Control-k>", self.open_quick_switcher)
+        self.bind("<Control-K>", self.open_quick_switcher)
+        self.bind("<Control-l>", self.lock)
+        self.bind("<Control-L>", self.lock)
+
+        # Write any recorded copies before the window goes away
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Start the auto-logout timer
         self.start_timer()
@@ -77,7 +134,7 @@ class MainMenu(tk.Tk):
         # Timer label that will be updated
         self.timer_label = tk.Label(
             left_frame,
-            text=self._format_time(self.time_remaining),
+            text=self._format_time(self.auto_logout_time),
             font=("Arial", 11),
             bg="#2c2f33",
             fg="#ffffff",
@@ -85,6 +142,31 @@ class MainMenu(tk.Tk):
         )
         self.timer_label.pack(anchor="w", pady=(5, 0))
 
+        # Search box - filters the account cards as you type
+        search_frame = tk.Frame(header_frame, bg="#2c2f33")
+        search_frame.pack(side=tk.LEFT, padx=10, pady=10)
+
+        tk.Label(
+            search_frame,
+            text="Search  (filters: age>90  site:  user:  copied:<7d  is:due)",
+            font=("Arial", 9),
+            bg="#2c2f33",
+            fg="#ffffff",
+            anchor="w"
+        ).pack(anchor="w")
+
+        self.search_var = tk.StringVar(master=self)
+        self.search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Arial", 11),
+            width=24
+        )
+        self.search_entry.pack(anchor="w", pady=(3, 0))
+        self.search_entry.bind("<Escape>", self._clear_search)
+        self._search_after_id = None
+        self.search_var.trace_add("write", self._on_search_changed)
+
         # Center - PNG Logo (replace 'logo.png' with your file)
         try:
             from tkinter import PhotoImage
@@ -108,6 +190,7 @@ class MainMenu(tk.Tk):
             ("💡", "PW Generator", self.open_password_generator, blue_color),
             ("🔍", "PW audit.", self.open_password_auditor, blue_color),
             ("⚙", "Settings.", self.open_settings, blue_color),
+            ("🔒", "Lock.", self.lock, blue_color),
             ("→", "Log out.", self.logout, blue_color)
         ]
 
@@ -179,45 +262,62 @@ class MainMenu(tk.Tk):
         """Handle mouse wheel scrolling."""
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
-    # ------------------------------------------------------------------
-    # Sorting (driven by settings)
-    # ------------------------------------------------------------------
-    def _sort_accounts(self, accounts):
-        """Sort accounts according to the user's settings."""
-        sort_by = self.settings_manager.get_account_sort_by()
-
-        if sort_by == "alphabetical":
-            return sorted(accounts, key=lambda x: x.get("account_name", "").lower())
-        if sort_by == "date_created":
-            return sorted(accounts, key=lambda x: x.get("created_date", ""), reverse=True)
-        if sort_by == "date_modified":
-            return sorted(accounts, key=lambda x: x.get("last_modified", ""), reverse=True)
-        if sort_by == "last_copied":
-            return sorted(accounts, key=lambda x: x.get("last_copied") or "", reverse=True)
-        return accounts
-
     def refresh_accounts(self):
-        """Load accounts and refresh the display."""
+        """Load the first page of accounts and refresh the display."""
+        # Rebuilt once the vault is unlocked (revealed secrets are hidden
+        # on lock, see lock())
+        if self._lock_screen is not None:
+            self._refresh_pending = True
+            return
+
         # Clear existing account cards
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
+        self._cards_shown = 0
+        self._show_more_button = None
+        self._secret_views = []
+        # Shown cards by account id, and the ids in grid order
+        self._cards = {}
+        self._card_ids = []
+
+        # Decrypted secrets stay cached as long as copies stay on the
+        # clipboard (the setting may just have changed)
+        self.account_manager.secret_cache.set_ttl(
+            self.settings_manager.get_clipboard_autoclear_seconds()
+        )
+
+        # Parse the search box once; every page reuses the compiled query
+        from services.query_filter import QueryError, compile_query
+        query = self.search_var.get().strip()
+        error = None
+        try:
+            self._compiled_query = compile_query(
+                query, renewal_days=self.settings_manager.get_password_renewal_days()
+            )
+        except QueryError as e:
+            self._compiled_query = None
+            error = str(e)
 
-        # Load accounts from manager, then sort
-        accounts = self.account_manager.get_all_accounts()
+        # Load accounts from manager, sorted according to the user's settings
+        accounts = self._load_account_page(0) if error is None else []
         print(f"[DEBUG] refresh_accounts: loaded {len(accounts)} accounts for user {self.username}")
-        accounts = self._sort_accounts(accounts)
 
         if not accounts:
             print("[DEBUG] No accounts found. Displaying empty state message.")
+            if error is not None:
+                message = f"Invalid filter: {error}"
+            elif query:
+                message = f"No accounts match '{query}'."
+            else:
+                message = "No accounts yet.\n\nClick the '+' button to create your first account!"
             tk.Label(
                 self.scrollable_frame,
-                text="No accounts yet.\n\nClick the '+' button to create your first account!",
+                text=message,
                 font=("Arial", 14),
                 bg="#ffffff",
                 fg="#888888"
             ).grid(row=0, column=0, pady=100, padx=100)
         else:
-            print(f"[DEBUG] Displaying {len(accounts)} account cards.")
             # Calculate number of columns based on window width
             window_width = self.winfo_width()
             if window_width < 100:
@@ -225,18 +325,117 @@ class MainMenu(tk.Tk):
 
             available_width = window_width - 60
             card_width = 400
-            num_columns = max(1, available_width // card_width)
+            self._num_columns = max(1, available_width // card_width)
 
-            for index, account in enumerate(accounts):
-                row = index // num_columns
-                col = index % num_columns
-                self.create_account_card(account, row, col)
+            self._render_cards(accounts)
 
-            for col in range(num_columns):
+            for col in range(self._num_columns):
                 self.scrollable_frame.grid_columnconfigure(col, weight=1, uniform="column")
 
-    def create_account_card(self, account, row, col):
-        """Create a card widget for an account entry."""
+    def _load_account_page(self, offset):
+        """Fetch one page of card data in the current sort/search order."""
+        return list(self.account_manager.iter_accounts(
+            self.settings_manager.get_account_sort_by(),
+            query=self._compiled_query,
+            offset=offset,
+            limit=self.PAGE_SIZE,
+            fields=self.CARD_FIELDS,
+        ))
+
+    def _render_cards(self, accounts):
+        """Append cards to the grid, followed by a "Show more" button."""
+        print(f"[DEBUG] Displaying {len(accounts)} account cards.")
+        if self._show_more_button is not None:
+            self._show_more_button.destroy()
+            self._show_more_button = None
+
+        # Password ages and renewal levels for the whole page in one pass
+        ages = self.account_manager.password_ages(
+            [account["id"] for account in accounts],
+            renewal_days=self.settings_manager.get_password_renewal_days(),
+        )
+
+        num_columns = self._num_columns
+        for account in accounts:
+            row = self._cards_shown // num_columns
+            col = self._cards_shown % num_columns
+            age = ages.get(account["id"], (None, 0))
+            self._cards[account["id"]] = self.create_account_card(account, row, col, age)
+            self._card_ids.append(account["id"])
+            self._cards_shown += 1
+
+        # A full page means there may be more to show
+        if len(accounts) == self.PAGE_SIZE:
+            next_row = (self._cards_shown + num_columns - 1) // num_columns
+            self._show_more_button = tk.Button(
+                self.scrollable_frame,
+                text="Show more",
+                command=self._show_more_accounts,
+                font=("Arial", 11),
+                bg="#2196F3",
+                fg="white",
+                activebackground="#2196F3",
+                cursor="hand2",
+                relief=tk.RAISED,
+                borderwidth=1
+            )
+            self._show_more_button.grid(
+                row=next_row, column=0, columnspan=num_columns, pady=10
+            )
+
+    def _show_more_accounts(self):
+        """Render the next page of cards below the current ones."""
+        self._render_cards(self._load_account_page(self._cards_shown))
+
+    def _move_card(self, account_id):
+        """
+        Put one card back in sort order after its entry changed (e.g. was
+        copied). Only the cards between its old and new place are
+        re-gridded; nothing is rebuilt.
+
+        Returns:
+            bool: False if the card is not shown or the order is unknown
+        """
+        if account_id not in self._cards:
+            return False
+        order = self.account_manager.order_ids(
+            self._card_ids, self.settings_manager.get_account_sort_by()
+        )
+        if order is None:
+            return False
+        old = self._card_ids.index(account_id)
+        new = order.index(account_id)
+        if new == old:
+            return True
+        del self._card_ids[old]
+        self._card_ids.insert(new, account_id)
+        for position in range(min(old, new), max(old, new) + 1):
+            self._cards[self._card_ids[position]].grid(
+                row=position // self._num_columns, column=position % self._num_columns
+            )
+        return True
+
+    def _on_search_changed(self, *args):
+        """Refresh the cards shortly after the user stops typing."""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(120, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        self.refresh_accounts()
+
+    def _clear_search(self, event=None):
+        """Clear the search box and show all accounts again."""
+        self.search_var.set("")
+
+    def create_account_card(self, account, row, col, age=(None, 0)):
+        """
+        Create a card widget for an account entry.
+
+        ``age`` is the entry's (password age in days, renewal level), as
+        returned by AccountManager.password_ages.
+        """
         from datetime import datetime
 
         # Card frame
@@ -366,7 +565,8 @@ class MainMenu(tk.Tk):
                 show_btn.config(text="👁")
                 show_password[0] = False
             else:
-                password_var.set(account["password"])
+                password_var.set(self.account_manager.get_secret(account["id"]) or "")
+                self._schedule_secret_purge()
                 show_btn.config(text="👁‍🗨")
                 show_password[0] = True
             password_display.update_idletasks()
@@ -382,13 +582,17 @@ class MainMenu(tk.Tk):
         )
         show_btn.pack(side=tk.LEFT)
 
+        def hide_password():
+            if show_password[0]:
+                toggle_password_visibility()
+
+        self._secret_views.append((hide_password, None))
+
         # Copy password button - passes account_id so we can track last_copied
         tk.Button(
             password_frame,
             text="📋",
-            command=lambda: self.copy_to_clipboard(
-                account["password"], "Password", account_id=account["id"]
-            ),
+            command=lambda: self.copy_password(account["id"]),
             font=("Arial", 10),
             bg="#f9f9f9",
             relief=tk.FLAT,
@@ -420,101 +624,129 @@ class MainMenu(tk.Tk):
             website_label.pack(side=tk.LEFT, padx=5)
             website_label.bind("<Button-1>", lambda e: self.open_website(account["website_url"]))
 
-        # Notes (if present)
-        if account.get("notes"):
-            notes_frame = tk.Frame(content_frame, bg="#f9f9f9")
-            notes_frame.pack(fill=tk.X, pady=5)
+        # Notes: stored in the same encrypted token as the password, so
+        # like the password they are only decrypted when revealed
+        notes_frame = tk.Frame(content_frame, bg="#f9f9f9")
+        notes_frame.pack(fill=tk.X, pady=5)
 
-            tk.Label(
-                notes_frame,
-                text="Notes:",
-                font=("Arial", 10, "bold"),
-                bg="#f9f9f9",
-                width=12,
-                anchor="w"
-            ).pack(side=tk.LEFT, anchor="n")
+        tk.Label(
+            notes_frame,
+            text="Notes:",
+            font=("Arial", 10, "bold"),
+            bg="#f9f9f9",
+            width=12,
+            anchor="w"
+        ).pack(side=tk.LEFT, anchor="n")
 
-            notes_text = tk.Text(
-                notes_frame,
-                font=("Arial", 9),
-                bg="#ffffff",
-                height=3,
-                width=40,
-                wrap=tk.WORD,
-                state="normal"
-            )
-            notes_text.pack(side=tk.LEFT, padx=5)
-            notes_text.insert(1.0, account["notes"])
-            notes_text.config(state="disabled")
+        notes_text = tk.Text(
+            notes_frame,
+            font=("Arial", 9),
+            bg="#ffffff",
+            height=3,
+            width=40,
+            wrap=tk.WORD,
+            state="disabled"
+        )
+        show_notes = [False]
+
+        def toggle_notes_visibility():
+            if show_notes[0]:
+                notes_text.config(state="normal")
+                notes_text.delete(1.0, tk.END)
+                notes_text.config(state="disabled")
+                notes_text.pack_forget()
+                notes_btn.config(text="👁")
+                show_notes[0] = False
+            else:
+                notes = self.account_manager.get_secret(account["id"], "notes") or ""
+                self._schedule_secret_purge()
+                notes_text.config(state="normal")
+                notes_text.insert(1.0, notes or "No notes.")
+                notes_text.config(state="disabled", height=3 if notes else 1)
+                notes_text.pack(side=tk.LEFT, padx=5, before=notes_btn)
+                notes_btn.config(text="👁‍🗨")
+                show_notes[0] = True
+
+        notes_btn = tk.Button(
+            notes_frame,
+            text="👁",
+            command=toggle_notes_visibility,
+            font=("Arial", 10),
+            bg="#f9f9f9",
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        notes_btn.pack(side=tk.LEFT, anchor="n")
+
+        def hide_notes():
+            if show_notes[0]:
+                toggle_notes_visibility()
+
+        self._secret_views.append((hide_notes, None))
 
         # Bottom info row - password age with renewal color coding
         info_frame = tk.Frame(card, bg="#f9f9f9")
         info_frame.pack(fill=tk.X, padx=15, pady=(5, 10))
 
-        last_change = datetime.fromisoformat(account["last_password_change"])
-        now = datetime.now()
-        delta = now - last_change
+        age_days, level = age
+        last_change = account.get("last_password_change")
+        changed_on = datetime.fromisoformat(last_change).strftime('%m/%d/%Y') if last_change else "unknown"
 
         # Format time ago
-        if delta.days == 0:
+        if age_days is None:
+            time_ago = "never"
+        elif age_days == 0:
             time_ago = "Today"
-        elif delta.days == 1:
+        elif age_days == 1:
             time_ago = "1 day ago"
-        elif delta.days < 7:
-            time_ago = f"{delta.days} days ago"
-        elif delta.days < 30:
-            weeks = delta.days // 7
+        elif age_days < 7:
+            time_ago = f"{age_days} days ago"
+        elif age_days < 30:
+            weeks = age_days // 7
             time_ago = f"{weeks} week{'s' if weeks > 1 else ''} ago"
-        elif delta.days < 365:
-            months = delta.days // 30
+        elif age_days < 365:
+            months = age_days // 30
             time_ago = f"{months} month{'s' if months > 1 else ''} ago"
         else:
-            years = delta.days // 365
+            years = age_days // 365
             time_ago = f"{years} year{'s' if years > 1 else ''} ago"
 
-        # Determine color based on password renewal setting
-        renewal_days = self.settings_manager.get_password_renewal_days()
-        text_color = "#666666"  # default gray
-
-        if renewal_days > 0:
-            age_days = delta.days
-            t1 = renewal_days / 3.0
-            t2 = (renewal_days / 3.0) * 2.0
-            if age_days > renewal_days:
-                text_color = "#F44336"   # red - overdue
-            elif age_days > t2:
-                text_color = "#FB8C00"   # orange - last third
-            elif age_days > t1:
-                text_color = "#F9A825"   # yellow - middle third
-            # first third -> stays gray
+        # Color from the renewal level (gray when renewal is off)
+        text_color = self.RENEWAL_COLORS[level]
 
         tk.Label(
             info_frame,
-            text=f"Last password change: {last_change.strftime('%m/%d/%Y')} - {time_ago}",
+            text=f"Last password change: {changed_on} - {time_ago}",
             font=("Arial", 9, "italic"),
             bg="#f9f9f9",
             fg=text_color
         ).pack(side=tk.LEFT)
 
+        return card
+
     # ------------------------------------------------------------------
     # Clipboard (with auto-clear + last_copied tracking)
     # ------------------------------------------------------------------
     def copy_to_clipboard(self, text, field_name, account_id=None):
         """Copy text to clipboard, track last_copied, schedule auto-clear."""
         self.clipboard_clear()
+        # Tk hands the text to other applications from its event loop; no
+        # update() is needed (it would run every pending redraw first)
         self.clipboard_append(text)
-        self.update()  # Force clipboard to sync
         print(f"{field_name} copied to clipboard")
 
-        # Track last_copied for sorting (for both username and password copies).
+        # Track last_copied for sorting (for both username and password
+        # copies). It is recorded in memory now and written in a batch later.
         if account_id is not None:
             try:
-                self.account_manager.update_last_copied(account_id)
-                # If currently sorting by last_copied, refresh order
-                if self.settings_manager.get_account_sort_by() == "last_copied":
-                    self.refresh_accounts()
+                self.account_manager.record_copy(account_id)
+                self._schedule_copy_flush()
+                # If the current sort depends on copies, move just that card
+                if self.settings_manager.get_account_sort_by() in ("last_copied", "most_used"):
+                    if not self._move_card(account_id):
+                        self.refresh_accounts()
             except Exception as e:
-                print(f"[main_menu] update_last_copied failed: {e}")
+                print(f"[main_menu] record_copy failed: {e}")
 
         # Cancel any previously scheduled clear
         if self._clipboard_clear_after_id is not None:
@@ -567,6 +799,46 @@ class MainMenu(tk.Tk):
                 print(f"[main_menu] Clipboard auto-clear failed: {e}")
         self._clipboard_expected_text = None
 
+    def _schedule_copy_flush(self):
+        """Write recorded copies shortly, together with any that follow."""
+        if self._copy_flush_after_id is None:
+            self._copy_flush_after_id = self.after(self.COPY_FLUSH_DELAY_MS, self._flush_copies)
+
+    def _flush_copies(self):
+        """Write the copies recorded since the last flush to the vault."""
+        if self._copy_flush_after_id is not None:
+            try:
+                self.after_cancel(self._copy_flush_after_id)
+            except Exception:
+                pass
+            self._copy_flush_after_id = None
+        if not self.account_manager.flush_copies():
+            print("[main_menu] Saving copy times failed; will retry on the next flush.")
+
+    def copy_password(self, account_id):
+        """Copy an entry's password (decrypted on demand) to the clipboard."""
+        self.copy_to_clipboard(
+            self.account_manager.get_secret(account_id) or "",
+            "Password", account_id=account_id
+        )
+        self._schedule_secret_purge()
+
+    def _schedule_secret_purge(self):
+        """Wipe cached secrets when they expire, not only when next looked up."""
+        if self._secret_purge_after_id is not None:
+            self.after_cancel(self._secret_purge_after_id)
+            self._secret_purge_after_id = None
+        delay = self.account_manager.secret_cache.next_expiry()
+        if delay is not None:
+            self._secret_purge_after_id = self.after(
+                int(delay * 1000) + 10, self._purge_secret_cache
+            )
+
+    def _purge_secret_cache(self):
+        self._secret_purge_after_id = None
+        self.account_manager.secret_cache.purge_expired()
+        self._schedule_secret_purge()
+
     def open_website(self, url):
         """Open website URL in default browser."""
         import webbrowser
@@ -625,50 +897,72 @@ class MainMenu(tk.Tk):
             settings_manager=self.settings_manager,
         )
 
+    def _show_cached_window(self, attr, *args):
+        """
+        Show the hidden window stored in ``attr``, passing ``args`` to its
+        show(). Returns False if it was never built (or was destroyed).
+        """
+        window = getattr(self, attr)
+        if window is None:
+            return False
+        try:
+            window.show(*args)
+            return True
+        except tk.TclError:
+            setattr(self, attr, None)
+            return False
+
     def open_password_generator(self):
         """Open the password generator window."""
-        if self.password_generator_window is not None:
-            try:
-                self.password_generator_window.lift()
-                self.password_generator_window.focus_force()
-                return
-            except tk.TclError:
-                pass
+        if self._show_cached_window("password_generator_window"):
+            return
 
         try:
             from ui_password_generator import PasswordGeneratorApp
-            self.password_generator_window = PasswordGeneratorApp()
+            self.password_generator_window = PasswordGeneratorApp(self)
         except ImportError as e:
             print(f"Error importing password generator: {e}")
             print("Make sure ui_password_generator.py exists in the gui folder")
 
     def open_password_auditor(self):
         """Open password auditor window."""
-        if self.password_auditor_window is not None:
-            try:
-                self.password_auditor_window.lift()
-                self.password_auditor_window.focus_force()
-                return
-            except tk.TclError:
-                pass
+        if self._show_cached_window("password_auditor_window"):
+            return
 
         try:
             from ui_password_auditor import PasswordAuditorApp
-            self.password_auditor_window = PasswordAuditorApp()
+            self.password_auditor_window = PasswordAuditorApp(self)
         except ImportError as e:
             print(f"Error importing password auditor: {e}")
             print("Make sure ui_password_auditor.py exists in the gui folder")
 
-    def open_settings(self):
-        """Open the settings window."""
-        # If already open, just raise it
-        if self.settings_window is not None:
+    def open_quick_switcher(self, event=None):
+        """Open the fuzzy quick switcher palette (Ctrl+K)."""
+        if self._lock_screen is not None:
+            return "break"
+        if self.quick_switcher_window is not None:
             try:
-                self.settings_window.lift()
-                self.settings_window.focus_force()
-                return
+                self.quick_switcher_window.lift()
+                self.quick_switcher_window.query_entry.focus_force()
+                return "break"
             except tk.TclError:
-                self.settings_window = None
+                self.quick_switcher_window = None
+
+        from ui_quick_switcher import QuickSwitcher
+        self.quick_switcher_window = QuickSwitcher(
+            self, self.account_manager, on_copy=self.copy_password
+        )
+        return "break"
+
+    def open_settings(self):
+        """Open the settings window."""
+        # Settings may rewrite the vault, so write recorded copies first
+        self._flush_copies()
+
+        # Built once per session; later opens just show it again
+        if self._show_cached_window(
+                "settings_window", self.account_manager, self.master_password):
+            return
 
         # We need the LoginManager to change master password
         from services.login import LoginManager
@@ -685,19 +979,13 @@ class MainMenu(tk.Tk):
             callback=self.refresh_accounts,
         )
 
-        # Clear reference when window closes
-        def _on_close():
-            try:
-                self.settings_window.destroy()
-            finally:
-                self.settings_window = None
-
-        self.settings_window.protocol("WM_DELETE_WINDOW", _on_close)
-
     def logout(self):
         """Handle logout."""
-        if hasattr(self, 'timer_id'):
-            self.after_cancel(self.timer_id)
+        self.idle_tracker.stop()
+        self._flush_copies()
+
+        # Forget the session PIN's wrapped key
+        self.session_pin.clear()
 
         # Cancel any pending clipboard auto-clear
         if self._clipboard_clear_after_id is not None:
@@ -708,7 +996,10 @@ class MainMenu(tk.Tk):
             self._clipboard_clear_after_id = None
 
         # Close any open child windows
-        for attr in ("password_generator_window", "password_auditor_window", "settings_window"):
+        for attr in (
+            "password_generator_window", "password_auditor_window",
+            "settings_window", "quick_switcher_window",
+        ):
             w = getattr(self, attr, None)
             if w is not None:
                 try:
@@ -728,54 +1019,134 @@ class MainMenu(tk.Tk):
     # Auto-logout timer
     # ------------------------------------------------------------------
     def start_timer(self):
-        """Start the auto-logout countdown timer."""
-        self.update_timer()
+        """Start the auto-logout countdown, counting from now."""
+        self.idle_tracker.start()
 
-    def _reset_timer(self, event=None):
-        """Reset the countdown on any user input."""
-        self.time_remaining = self.auto_logout_time
-        if hasattr(self, "timer_label"):
-            try:
-                self.timer_label.config(text=self._format_time(self.time_remaining))
-            except tk.TclError:
-                pass
+    def _on_idle_timeout(self):
+        """Time's up - lock in place; the menu is kept for a fast unlock."""
+        minutes = max(1, self.auto_logout_time // 60)
+        self.lock(reason=f"Locked after {minutes} min without activity.")
 
-    def update_timer(self):
-        """Update the timer display and handle auto-logout."""
-        if self.time_remaining > 0:
-            self.time_remaining -= 1
-            self.timer_label.config(text=self._format_time(self.time_remaining))
-            self.timer_id = self.after(1000, self.update_timer)
-        else:
-            # Time's up - close app FIRST, then show message
-            if hasattr(self, 'timer_id'):
-                self.after_cancel(self.timer_id)
+    def _format_time(self, seconds):
+        """Format seconds into a readable time string."""
+        minutes = seconds // 60
+        secs = seconds % 60
+        return f"Time until auto-lock: {minutes}m {secs}s"
 
-            # Close any open child windows
-            for attr in ("password_generator_window", "password_auditor_window", "settings_window"):
-                w = getattr(self, attr, None)
-                if w is not None:
-                    try:
-                        w.destroy()
-                    except Exception:
-                        pass
+    # ------------------------------------------------------------------
+    # Session lock
+    # ------------------------------------------------------------------
+    def lock(self, event=None, reason="Locked."):
+        """
+        Lock the session in place (auto-lock, Lock button, Ctrl+L).
+
+        Decrypted secrets are cleared from the cards and every child
+        window is closed, and the vault key and master password are
+        dropped (wrapped under the session PIN first, if one is set).
+        The window, its cards and the vault's metadata and indexes are
+        kept, so unlocking is near-instant.
+        """
+        if self._lock_screen is not None:
+            return "break"
+        self.idle_tracker.stop()
+        self._flush_copies()
+
+        # Clear the clipboard now if it still holds what we copied
+        if self._clipboard_clear_after_id is not None:
+            self.after_cancel(self._clipboard_clear_after_id)
+            self._clipboard_auto_clear()
+
+        # Hide (and clear) the cached windows; close the other child
+        # windows, including account edit windows
+        cached = []
+        for attr in (
+            "password_generator_window", "password_auditor_window", "settings_window",
+        ):
+            w = getattr(self, attr, None)
+            if w is not None:
+                cached.append(w)
+                try:
+                    w.close()
+                except tk.TclError:
+                    setattr(self, attr, None)
+        for w in self.winfo_children():
+            if isinstance(w, tk.Toplevel) and w not in cached:
+                w.destroy()
+        self.quick_switcher_window = None
+
+        for hide, _ in self._secret_views:
+            hide()
+        self.account_manager.lock()
+        self.master_password = None
+
+        self._show_lock_screen(reason)
+        return "break"
+
+    def _show_lock_screen(self, reason):
+        from ui_lock_screen import LockScreen
+        if self._lock_screen is not None:
+            self._lock_screen.destroy()
+        self._lock_screen = LockScreen(
+            self,
+            username=self.username,
+            reason=reason,
+            pin_set=self.session_pin.is_set,
+            on_unlock=self._unlock,
+            on_logout=self.logout,
+        )
 
-            self.withdraw()
+    def _unlock(self, secret, new_pin=""):
+        """
+        Unlock with the session PIN or the master password.
 
-            from tkinter import messagebox
-            messagebox.showinfo("Session Expired", "Your session has expired. Please log in again.")
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        from services import vault_file
+        from services.session_lock import validate_pin
 
-            self.destroy()
+        if new_pin:
+            ok, message = validate_pin(new_pin)
+            if not ok:
+                return False, message
 
-            if self.login_window is not None:
-                self.login_window.deiconify()
-                self.login_window.show_initial_screen()
+        unwrapped = self.session_pin.unwrap(secret)
+        if unwrapped is not None:
+            key, master_password = unwrapped
+        else:
+            key, master_password = vault_file.derive_key(secret), secret
+        try:
+            self.account_manager.unlock(key)
+        except vault_file.VaultKeyError:
+            if not self.session_pin.is_set:
+                return False, "Incorrect master password."
+            remaining = self.session_pin.record_failure()
+            if remaining == 0:
+                self._show_lock_screen("Too many wrong PINs. Enter your master password.")
+                return True, ""
+            return False, f"Incorrect PIN or password ({remaining} PIN attempts left)."
 
-    def _format_time(self, seconds):
-        """Format seconds into a readable time string."""
-        minutes = seconds // 60
-        secs = seconds % 60
-        return f"Time until auto log-out: {minutes}m {secs}s"
+        self.master_password = master_password
+        if new_pin:
+            self.session_pin.set(new_pin, key, master_password)
+
+        self._lock_screen.destroy()
+        self._lock_screen = None
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_accounts()
+        else:
+            for _, restore in self._secret_views:
+                if restore is not None:
+                    restore()
+
+        self.start_timer()
+        return True, ""
+
+    def _on_close(self):
+        """Window closed from the title bar: save recorded copies, then quit."""
+        self._flush_copies()
+        self.destroy()
 
     def _on_window_resize(self, event):
         """Handle window resize events to refresh grid layout."""
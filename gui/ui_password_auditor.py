@@ -8,7 +8,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 class PasswordAuditorApp(tk.Toplevel):
-    """Password Auditor as a Toplevel window that analyzes password strength."""
+    """
+    Password Auditor as a Toplevel window that analyzes password strength.
+
+    The main menu builds it once per session: closing it only hides it
+    (see close), and show() brings it back.
+    """
     
     def __init__(self, master=None):
         super().__init__(master)
@@ -22,6 +27,32 @@ class PasswordAuditorApp(tk.Toplevel):
         
         self.create_widgets()
 
+        # Closing hides the window so it can be shown again without rebuilding
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def show(self):
+        """Show the (hidden) window again."""
+        self.deiconify()
+        self.lift()
+        self.password_entry.focus_force()
+
+    def close(self):
+        """Hide the window and clear the audited password and its results."""
+        self.withdraw()
+        self.reset()
+
+    def reset(self):
+        """Clear the password entry and the results."""
+        self.password_entry.delete(0, tk.END)
+        self.show_password_var.set(False)
+        self.password_entry.config(show="*")
+        self.score_label.config(text="—", fg="#666666")
+        self.entropy_label.config(text="—")
+        self.breached_label.config(text="")
+        self.warnings_text.config(state=tk.NORMAL)
+        self.warnings_text.delete(1.0, tk.END)
+        self.warnings_text.config(state=tk.DISABLED)
+
     def create_widgets(self):
         # Title
         title_label = tk.Label(
@@ -77,7 +108,7 @@ class PasswordAuditorApp(tk.Toplevel):
         self.password_entry.focus()
 
         # Toggle visibility button
-        self.show_password_var = tk.BooleanVar(value=False)
+        self.show_password_var = tk.BooleanVar(master=self, value=False)
         self.toggle_button = tk.Checkbutton(
             entry_container,
             text="Show",
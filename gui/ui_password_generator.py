@@ -8,7 +8,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 class PasswordGeneratorApp(tk.Toplevel):
-    """Password Generator as a Toplevel window that can be opened from main menu."""
+    """
+    Password Generator as a Toplevel window that can be opened from main menu.
+
+    The main menu builds it once per session: closing it only hides it
+    (see close), and show() brings it back.
+    """
+
+    DEFAULT_LENGTH = "12"
     
     def __init__(self, master=None):
         super().__init__(master)
@@ -22,6 +29,28 @@ class PasswordGeneratorApp(tk.Toplevel):
         
         self.create_widgets()
 
+        # Closing hides the window so it can be shown again without rebuilding
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def show(self):
+        """Show the (hidden) window again."""
+        self.deiconify()
+        self.lift()
+        self.focus_force()
+
+    def close(self):
+        """Hide the window and clear the generated password."""
+        self.withdraw()
+        self.reset()
+
+    def reset(self):
+        """Forget the generated password and restore the default options."""
+        self.password_label.config(text="")
+        self.current_password = None
+        self.length_var.set(self.DEFAULT_LENGTH)
+        for var in (self.uppercase_var, self.lowercase_var, self.digits_var, self.symbols_var):
+            var.set(True)
+
     def create_widgets(self):
         # Title
         title_label = tk.Label(
@@ -36,7 +65,7 @@ class PasswordGeneratorApp(tk.Toplevel):
         tk.Label(length_frame, text="Password Length:", font=("Arial", 11), bg="#23272a", fg="#ffffff").pack(
             side=tk.LEFT, padx=5
         )
-        self.length_var = tk.StringVar(value="12")
+        self.length_var = tk.StringVar(master=self, value=self.DEFAULT_LENGTH)
         length_entry = tk.Entry(length_frame, textvariable=self.length_var, width=10, bg="#2c2f33", fg="#ffffff", insertbackground="#ffffff", relief=tk.FLAT, highlightthickness=1, highlightbackground="#444")
         length_entry.pack(side=tk.LEFT, padx=5)
 
@@ -48,10 +77,10 @@ class PasswordGeneratorApp(tk.Toplevel):
         options_frame.pack(pady=15, padx=20, fill=tk.BOTH)
 
         # Booleans to keep track of status
-        self.uppercase_var = tk.BooleanVar(value=True)
-        self.lowercase_var = tk.BooleanVar(value=True)
-        self.digits_var = tk.BooleanVar(value=True)
-        self.symbols_var = tk.BooleanVar(value=True)
+        self.uppercase_var = tk.BooleanVar(master=self, value=True)
+        self.lowercase_var = tk.BooleanVar(master=self, value=True)
+        self.digits_var = tk.BooleanVar(master=self, value=True)
+        self.symbols_var = tk.BooleanVar(master=self, value=True)
 
         #Uppercase checkbox
         checkbutton_style = {"bg": "#23272a", "fg": "#ffffff", "activebackground": "#23272a", "selectcolor": "#23272a", "highlightbackground": "#23272a"}
@@ -166,7 +195,7 @@ class PasswordGeneratorApp(tk.Toplevel):
 
     def copy_to_clipboard(self):
         """Copy the generated password to clipboard."""
-        if hasattr(self, "current_password"):
+        if getattr(self, "current_password", None):
             self.clipboard_clear()
             self.clipboard_append(self.current_password)
             messagebox.showinfo("Copied", "Password copied to clipboard!")
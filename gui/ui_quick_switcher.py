@@ -0,0 +1,115 @@
+import tkinter as tk
+
+
+class QuickSwitcher(tk.Toplevel):
+    """
+    Keyboard palette (Ctrl+K) for jumping to an account by fuzzy name.
+
+    Typing ranks entries by a fuzzy match on the account name or website
+    host ("gml" finds Gmail); Enter copies the selected entry's password
+    and closes the palette, Escape just closes it.
+    """
+
+    MAX_RESULTS = 12
+    HINT = "Type to search  ·  ↑↓ select  ·  Enter copy password  ·  Esc close"
+
+    def __init__(self, master, account_manager, on_copy):
+        """
+        Args:
+            master: the main menu window
+            account_manager: AccountManager to search
+            on_copy: callable(account_id) that copies that entry's password
+        """
+        super().__init__(master)
+        self.title("Quick Switch - BlueVault")
+        self.configure(bg="#23272a")
+        self.resizable(False, False)
+        self.transient(master)
+
+        self.account_manager = account_manager
+        self.on_copy = on_copy
+        self._result_ids = []
+
+        self.create_widgets()
+        self._place_over(master)
+
+        self.query_entry.focus_force()
+
+    def create_widgets(self):
+        self.query_var = tk.StringVar(master=self)
+        self.query_entry = tk.Entry(
+            self, textvariable=self.query_var, font=("Arial", 13), width=44,
+            bg="#2c2f33", fg="#ffffff", insertbackground="#ffffff",
+            relief=tk.FLAT, highlightthickness=1, highlightbackground="#444",
+            highlightcolor="#7289da",
+        )
+        self.query_entry.pack(fill=tk.X, padx=10, pady=(10, 6), ipady=4)
+
+        self.results_list = tk.Listbox(
+            self, height=self.MAX_RESULTS, font=("Arial", 11), activestyle="none", exportselection=False,
+            bg="#2c2f33", fg="#ffffff", selectbackground="#7289da",
+            selectforeground="#ffffff", relief=tk.FLAT, highlightthickness=0,
+        )
+        self.results_list.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        self.status_label = tk.Label(
+            self, text=self.HINT,
+            font=("Arial", 9), bg="#23272a", fg="#99aab5",
+        )
+        self.status_label.pack(pady=(4, 8))
+
+        self.query_var.trace_add("write", lambda *args: self._update_results())
+        self.query_entry.bind("<Down>", lambda e: self._move_selection(1))
+        self.query_entry.bind("<Up>", lambda e: self._move_selection(-1))
+        self.bind("<Return>", lambda e: self._copy_selected())
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.results_list.bind("<Double-Button-1>", lambda e: self._copy_selected())
+
+    def _place_over(self, master):
+        """Centre the palette horizontally near the top of the main window."""
+        self.update_idletasks()
+        try:
+            x = master.winfo_rootx() + (master.winfo_width() - self.winfo_reqwidth()) // 2
+            y = master.winfo_rooty() + 80
+            self.geometry(f"+{max(x, 0)}+{max(y, 0)}")
+        except tk.TclError:
+            pass
+
+    def _update_results(self):
+        """Re-rank entries for the current query (runs on every keystroke)."""
+        query = self.query_var.get()
+        results = self.account_manager.fuzzy_find(query, limit=self.MAX_RESULTS)
+
+        self.results_list.delete(0, tk.END)
+        self._result_ids = [account["id"] for account in results]
+        for account in results:
+            label = account["account_name"]
+            if account["username"]:
+                label += f"  —  {account['username']}"
+            self.results_list.insert(tk.END, label)
+
+        if results:
+            self.results_list.selection_set(0)
+        elif query.strip():
+            self.status_label.config(text="No matching accounts")
+            return
+        self.status_label.config(text=self.HINT)
+
+    def _move_selection(self, step):
+        if not self._result_ids:
+            return "break"
+        current = self.results_list.curselection()
+        index = current[0] + step if current else 0
+        index = max(0, min(index, len(self._result_ids) - 1))
+        self.results_list.selection_clear(0, tk.END)
+        self.results_list.selection_set(index)
+        self.results_list.see(index)
+        return "break"
+
+    def _copy_selected(self):
+        current = self.results_list.curselection()
+        if not current:
+            return
+        account_id = self._result_ids[current[0]]
+        self.destroy()
+        self.on_copy(account_id)
@@ -21,6 +21,7 @@ from services.settings import (
     CLIPBOARD_AUTOCLEAR_OPTIONS,
     PASSWORD_STRENGTH_OPTIONS,
     SORT_BY_OPTIONS,
+    VAULT_STORAGE_OPTIONS,
 )
 
 
@@ -40,7 +41,13 @@ def _label_for_value(options: dict, value):
 # Main settings window
 # -----------------------------------------------------------------------------
 class SettingsWindow(tk.Toplevel):
-    """Top-level settings window."""
+    """
+    Top-level settings window.
+
+    The main menu builds it once per session. Closing it only hides it:
+    unsaved changes are discarded and the cached master password is
+    dropped (see close), and show() brings it back.
+    """
 
     def __init__(self, master, username, settings_manager, account_manager,
                  login_manager, master_password=None, callback=None):
@@ -64,6 +71,45 @@ class SettingsWindow(tk.Toplevel):
 
         self._build_ui()
 
+        # Closing hides the window so it can be shown again without rebuilding
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    # ------------------------------------------------------------------
+    # Show / hide
+    # ------------------------------------------------------------------
+    def show(self, account_manager, master_password):
+        """Show the (hidden) window again with the main menu's current session."""
+        self.account_manager = account_manager
+        self.master_password = master_password
+        self.reset()
+        self.deiconify()
+        self.lift()
+        self.focus_force()
+        self.grab_set()
+
+    def close(self):
+        """Hide the window, discarding unsaved changes and the master password."""
+        for child in self.winfo_children():
+            if isinstance(child, tk.Toplevel):
+                child.destroy()
+        self.grab_release()
+        self.withdraw()
+        self.master_password = None
+        self.reset()
+
+    def reset(self):
+        """Show the stored settings again (drops unsaved dropdown changes)."""
+        sm = self.settings_manager
+        for var, options, value in (
+            (self.auto_logout_var, AUTO_LOGOUT_OPTIONS, sm.get_auto_logout_time()),
+            (self.renewal_var, PASSWORD_RENEWAL_OPTIONS, sm.get_password_renewal_days()),
+            (self.clipboard_var, CLIPBOARD_AUTOCLEAR_OPTIONS, sm.get_clipboard_autoclear_seconds()),
+            (self.strength_var, PASSWORD_STRENGTH_OPTIONS, sm.get_password_strength_requirement()),
+            (self.sort_var, SORT_BY_OPTIONS, sm.get_account_sort_by()),
+            (self.storage_var, VAULT_STORAGE_OPTIONS, sm.get_vault_storage()),
+        ):
+            var.set(_label_for_value(options, value))
+
     # ------------------------------------------------------------------
     # UI construction
     # ------------------------------------------------------------------
@@ -126,7 +172,7 @@ class SettingsWindow(tk.Toplevel):
         tk.Button(
             action_bar,
             text="Close",
-            command=self.destroy,
+            command=self.close,
             font=("Arial", 12),
             bg="#9E9E9E",
             fg="white",
@@ -289,8 +335,9 @@ class SettingsWindow(tk.Toplevel):
             frame,
             text=(
                 "Export your encrypted vault as a .zip (to your Downloads "
-                "folder) to move it to another device, or import a previously "
-                "exported vault."
+                "folder) to move it to another device, import a previously "
+                "exported vault, or import a CSV/JSON export from Bitwarden, "
+                "KeePass or Chrome."
             ),
             font=("Arial", 9),
             bg="#ffffff",
@@ -299,8 +346,27 @@ class SettingsWindow(tk.Toplevel):
             justify="left",
         ).pack(anchor="w", padx=14, pady=(2, 6))
 
+        self.storage_var = tk.StringVar(
+            master=self,
+            value=_label_for_value(
+                VAULT_STORAGE_OPTIONS,
+                self.settings_manager.get_vault_storage(),
+            ),
+        )
+        self._make_dropdown(
+            frame,
+            label="Vault storage",
+            description=(
+                "SQLite keeps each account in its own encrypted row with "
+                "indexed dates, so large vaults sort and page faster. "
+                "Switching migrates your accounts when you save."
+            ),
+            variable=self.storage_var,
+            options=list(VAULT_STORAGE_OPTIONS.keys()),
+        )
+
         row = tk.Frame(frame, bg="#ffffff")
-        row.pack(anchor="w", padx=14, pady=(0, 12))
+        row.pack(anchor="w", padx=14, pady=(0, 8))
 
         tk.Button(
             row,
@@ -324,6 +390,17 @@ class SettingsWindow(tk.Toplevel):
             width=18,
         ).pack(side=tk.LEFT)
 
+        tk.Button(
+            frame,
+            text="Import from Other App...",
+            command=self._on_import_external,
+            font=("Arial", 11, "bold"),
+            bg="#FF9800",
+            fg="white",
+            cursor="hand2",
+            width=38,
+        ).pack(anchor="w", padx=14, pady=(0, 12))
+
     # ------------------------------------------------------------------
     # Section / dropdown builders
     # ------------------------------------------------------------------
@@ -445,13 +522,26 @@ class SettingsWindow(tk.Toplevel):
             ),
         )
 
+        # Storage changes migrate the vault before the setting is saved
+        storage = resolve(
+            VAULT_STORAGE_OPTIONS,
+            self.storage_var.get(),
+            sm.get_vault_storage(),
+        )
+        if storage != sm.get_vault_storage():
+            if not self._change_vault_storage(storage):
+                self.storage_var.set(
+                    _label_for_value(VAULT_STORAGE_OPTIONS, sm.get_vault_storage())
+                )
+
         print(
             f"[settings] saving for {self.username}: "
             f"auto_logout={sm.get_auto_logout_time()}, "
             f"renewal={sm.get_password_renewal_days()}, "
             f"clipboard={sm.get_clipboard_autoclear_seconds()}, "
             f"strength={sm.get_password_strength_requirement()!r}, "
-            f"sort={sm.get_account_sort_by()!r}"
+            f"sort={sm.get_account_sort_by()!r}, "
+            f"storage={sm.get_vault_storage()!r}"
         )
 
         if sm.save():
@@ -471,6 +561,39 @@ class SettingsWindow(tk.Toplevel):
                 "Error", "Failed to save settings.", parent=self
             )
 
+    def _change_vault_storage(self, storage):
+        """Migrate the vault to ``storage``; returns True on success."""
+        if not self.master_password:
+            messagebox.showerror(
+                "Vault storage",
+                "Could not determine your master password for this session. "
+                "Please log out and log in again.",
+                parent=self,
+            )
+            return False
+
+        ok, msg = self.settings_manager.change_vault_storage(
+            self.master_password, storage
+        )
+        if not ok:
+            messagebox.showerror("Vault storage", msg, parent=self)
+            return False
+
+        # Point the main menu at the migrated vault
+        try:
+            from services.account import AccountManager
+            new_am = AccountManager(
+                self.username, self.master_password, storage=storage,
+                on_error=messagebox.showerror,
+                secret_ttl=self.settings_manager.get_clipboard_autoclear_seconds(),
+            )
+            self.account_manager = new_am
+            if self.master and hasattr(self.master, "account_manager"):
+                self.master.account_manager = new_am
+        except Exception as e:
+            print(f"[settings] Failed to update AccountManager in parent: {e}")
+        return True
+
     # ------------------------------------------------------------------
     # Change master password
     # ------------------------------------------------------------------
@@ -498,9 +621,15 @@ class SettingsWindow(tk.Toplevel):
             # Rebuild the main menu's account manager with the new password
             if self.master and hasattr(self.master, "account_manager"):
                 self.master.account_manager = AccountManager(
-                    self.username, new_password
+                    self.username, new_password,
+                    storage=self.settings_manager.get_vault_storage(),
+                    on_error=messagebox.showerror,
+                    secret_ttl=self.settings_manager.get_clipboard_autoclear_seconds(),
                 )
                 self.master.master_password = new_password
+                # A session PIN still wraps the old key
+                if hasattr(self.master, "session_pin"):
+                    self.master.session_pin.clear()
         except Exception as e:
             print(f"[settings] Failed to update AccountManager in parent: {e}")
 
@@ -565,6 +694,78 @@ class SettingsWindow(tk.Toplevel):
         else:
             messagebox.showerror("Import failed", msg, parent=self)
 
+    # ------------------------------------------------------------------
+    # Import from other password managers
+    # ------------------------------------------------------------------
+    def _on_import_external(self):
+        if not self.master_password:
+            messagebox.showerror(
+                "Import",
+                "Could not determine your master password for this session. "
+                "Please log out and log in again.",
+                parent=self,
+            )
+            return
+
+        file_path = filedialog.askopenfilename(
+            parent=self,
+            title="Select a Bitwarden, KeePass or Chrome export",
+            filetypes=[
+                ("Password exports (*.csv, *.json)", "*.csv *.json"),
+                ("All files", "*.*"),
+            ],
+        )
+        if not file_path:
+            return
+
+        dlg, update_progress = self._make_progress_dialog("Importing accounts...")
+        try:
+            ok, msg = self.settings_manager.import_external(
+                file_path, self.master_password, progress=update_progress
+            )
+        finally:
+            dlg.grab_release()
+            dlg.destroy()
+
+        if ok:
+            messagebox.showinfo("Import complete", msg, parent=self)
+            if self.callback:
+                try:
+                    self.callback()
+                except Exception as e:
+                    print(f"[settings] refresh callback failed: {e}")
+        else:
+            messagebox.showerror("Import failed", msg, parent=self)
+
+    def _make_progress_dialog(self, title):
+        """
+        Small modal with a progress bar. Returns (dialog, callback) where
+        callback(done, total) updates the bar and repaints.
+        """
+        dlg = tk.Toplevel(self)
+        dlg.title(title)
+        dlg.geometry("380x110")
+        dlg.configure(bg="#f0f0f0")
+        dlg.transient(self)
+        dlg.grab_set()
+        dlg.resizable(False, False)
+
+        status = tk.Label(dlg, text=title, font=("Arial", 10), bg="#f0f0f0")
+        status.pack(pady=(16, 8))
+
+        bar = ttk.Progressbar(dlg, orient="horizontal", length=320,
+                              mode="determinate", maximum=100)
+        bar.pack(padx=20)
+        dlg.update_idletasks()
+
+        def update_progress(done, total):
+            percent = (done * 100 // total) if total else 100
+            bar["value"] = percent
+            status.config(text=f"{title} {percent}%")
+            dlg.update_idletasks()
+
+        return dlg, update_progress
+
     def _ask_import_mode(self):
         """
         Small modal that asks the user whether to override or append.
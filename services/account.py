@@ -1,108 +1,523 @@
+import hmac
+import itertools
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from cryptography.fernet import Fernet
-import base64
-import hashlib
+
+from services import frecency, vault_file
+from services.account_record import AccountRecord
+from services.domain_index import DomainIndex
+from services.fuzzy_index import FuzzyIndex
+from services.metadata_columns import AGE_BUCKETS, FRESH, MetadataColumns
+from services.metadata_index import MetadataIndex
+from services.query_filter import compile_query
+from services.search_index import SearchIndex
+from services.secret_cache import DEFAULT_TTL, SecretCache
+from services.sort_index import SortIndex
+
+
+class TransactionError(Exception):
+    """Raised when a transaction() could not be applied; the vault is unchanged."""
+
+
+class VaultLoadError(Exception):
+    """Raised by a strict load when the vault cannot be read or decrypted."""
+
+
+class VaultLockedError(Exception):
+    """Raised when secrets are asked for while the vault is locked (see lock())."""
+
+
+def vault_path(username):
+    """Path of ``username``'s JSON vault file (user_data/vault_<username>.json)."""
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    vault_dir = os.path.join(project_root, "user_data")
+    os.makedirs(vault_dir, exist_ok=True)
+    return os.path.join(vault_dir, f"vault_{username}.json")
+
+
+def account_key(account):
+    """Duplicate-detection key for an entry: (account_name, username), case-insensitive."""
+    return (
+        (account.get("account_name") or "").lower(),
+        (account.get("username") or "").lower(),
+    )
 
 
 class AccountManager:
     """
     Manages password vault entries with encryption.
-    Each user gets their own vault file: vault_<username>.json
+    Each user gets their own vault file: vault_<username>.json, or with
+    storage="sqlite" a database: vault_<username>.db (see sqlite_vault.py)
     """
 
-    def __init__(self, username, master_password=None):
+    def __init__(self, username, master_password=None, storage="json", on_error=None,
+                 key=None, secret_ttl=None, renewal_days=None):
         """
         Initialize account manager for a specific user.
 
         Args:
             username: The logged-in user's username
             master_password: User's master password (used for encryption key derivation)
+            storage: "json" (vault file) or "sqlite" (vault database)
+            on_error: Optional callable(title, message) that shows vault
+                      errors to the user (e.g. a GUI dialog); errors are
+                      always printed
+            key: Already-derived vault key (e.g. from the key agent), used
+                 instead of deriving one from master_password
+            secret_ttl: Seconds get_secret() keeps a decrypted entry cached
+                        (e.g. the clipboard auto-clear time; 0 disables
+                        the cache, None uses secret_cache.DEFAULT_TTL)
+            renewal_days: Password renewal period that is:due filters in
+                          string queries use (0 = off; None = unknown,
+                          so is:due is rejected)
+
+        Raises:
+            vault_file.VaultKeyError: storage is "sqlite" and the master
+            password does not match the database
         """
         self.username = username
+        self.storage = storage
+        self.on_error = on_error
         self.vault_file = self._get_vault_path(username)
 
         # Derive encryption key from master password
         # In production, you'd want to use a proper key derivation function like PBKDF2
-        if master_password:
+        if key is not None:
+            self.encryption_key = key
+        elif master_password:
             self.encryption_key = self._derive_key(master_password)
         else:
             # Fallback: use username as seed (less secure, but works without master password)
             self.encryption_key = self._derive_key(username)
 
         self.cipher = Fernet(self.encryption_key)
-
-        # Create vault file if it doesn't exist
-        if not os.path.exists(self.vault_file):
+        # Decrypts into one reusable buffer (see vault_file.TokenReader)
+        self.reader = vault_file.TokenReader(self.encryption_key)
+
+        # Key-check value of the vault key while locked (see lock())
+        self._locked_kcv = None
+
+        # account id -> (last_copied, frecency) of copies recorded by
+        # record_copy() that flush_copies() has not written yet
+        self._pending_copies = {}
+
+        # account id -> (AccountRecord.state() when saved, encrypted token),
+        # so saves only re-encrypt entries whose contents actually changed
+        self._token_cache = {}
+
+        # account id -> secret token (encrypted password and notes). Cached
+        # entries hold metadata only; secrets are decrypted on demand.
+        self._secret_tokens = {}
+
+        # Recently decrypted secrets, for repeated reveals and copies
+        self.secret_cache = SecretCache(ttl=DEFAULT_TTL if secret_ttl is None else secret_ttl)
+
+        # The user's password renewal period, for is:due in string queries
+        self.renewal_days = renewal_days
+
+        # Working copy of the accounts while a transaction() is open; loads
+        # return it and saves are deferred until the transaction commits
+        self._transaction_accounts = None
+
+        # In-memory copy of the vault as AccountRecords (metadata only),
+        # reused until the backing file or database is changed by someone
+        # else (see _read_disk_stamp)
+        self._accounts = None
+        self._by_id = {}
+        self._disk_stamp = None
+
+        # Indexes kept in step with the cache: rebuilt on a full load and
+        # updated entry-by-entry on every mutation
+        self.search_index = SearchIndex()
+        self.metadata_index = MetadataIndex()
+        self.fuzzy_index = FuzzyIndex()
+        self.domain_index = DomainIndex()
+        self.metadata_columns = MetadataColumns()
+        self.sort_indexes = {
+            "alphabetical": SortIndex(lambda a: (a.get("account_name") or "").casefold()),
+            "date_created": SortIndex(lambda a: a.created or 0, reverse=True),
+            "date_modified": SortIndex(lambda a: a.modified or 0, reverse=True),
+            "last_copied": SortIndex(lambda a: a.copied or 0, reverse=True),
+            "most_used": SortIndex(frecency.sort_key, reverse=True),
+        }
+        self._indexes = [
+            self.search_index, self.metadata_index, self.fuzzy_index,
+            self.domain_index, self.metadata_columns, *self.sort_indexes.values(),
+        ]
+
+        # SQLite store, when selected; otherwise the JSON vault file is used
+        self._store = None
+        if storage == "sqlite":
+            from services.sqlite_vault import SQLiteVaultStore
+            self._store = SQLiteVaultStore(
+                self._get_db_path(username), self.cipher, self.encryption_key
+            )
+        elif not os.path.exists(self.vault_file):
+            # Create vault file if it doesn't exist
             self._initialize_vault()
 
     def _get_vault_path(self, username):
         """Get the path to the user's vault file."""
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        vault_dir = os.path.join(project_root, "user_data")
-        os.makedirs(vault_dir, exist_ok=True)
-        return os.path.join(vault_dir, f"vault_{username}.json")
+        return vault_path(username)
+
+    def _get_db_path(self, username):
+        """Get the path to the user's SQLite vault database."""
+        return os.path.splitext(self._get_vault_path(username))[0] + ".db"
 
     def _derive_key(self, password):
         """Derive an encryption key from a password."""
-        # Use SHA-256 to create a 32-byte key from the password
-        # In production, use PBKDF2 or similar with salt
-        hash_obj = hashlib.sha256(password.encode('utf-8'))
-        key = base64.urlsafe_b64encode(hash_obj.digest())
-        return key
+        return vault_file.derive_key(password)
 
     def _initialize_vault(self):
         """Create a new empty vault file."""
         self._save_vault([])
 
-    def _load_vault(self):
-        """Load and decrypt the vault."""
-        try:
-            with open(self.vault_file, 'r') as f:
-                encrypted_data = f.read()
-
-            if not encrypted_data:
-                print(f"Vault file {self.vault_file} is empty.")
-                return []
+    def _load_vault(self, strict=False):
+        """
+        Load the vault's entries (served from memory when unchanged).
 
-            # Decrypt the data
-            decrypted_data = self.cipher.decrypt(encrypted_data.encode())
-            accounts = json.loads(decrypted_data.decode())
+        Entries are metadata only: their secret fields (password, notes)
+        stay encrypted in self._secret_tokens until asked for.
 
-            # Backfill last_copied for older vaults that were saved before
-            # the field existed.
-            for acc in accounts:
-                acc.setdefault("last_copied", None)
+        Args:
+            strict: raise VaultLoadError when the vault cannot be read,
+                    instead of returning an empty list (for callers that
+                    would otherwise save over it)
+        """
+        if self._transaction_accounts is not None:
+            return self._transaction_accounts
+        if self._cache_is_fresh():
+            return self._accounts
 
+        try:
+            stamp = self._read_disk_stamp()
+            if self._store is not None:
+                records = self._store.load_all()
+            else:
+                records = self._read_vault_file()
+
+            accounts = [account for account, _ in records]
+            self._secret_tokens = {account["id"]: secret for account, secret in records}
+            self._set_cache(accounts, stamp)
             print(f"Loaded {len(accounts)} accounts from vault {self.vault_file}.")
             return accounts
         except Exception as e:
-            print(f"Error loading vault: {e}")
-            try:
-                import tkinter.messagebox as messagebox
-                messagebox.showerror("Vault Error", f"Error loading vault: {e}\nFile: {self.vault_file}")
-            except Exception as gui_e:
-                print(f"(GUI error dialog failed: {gui_e})")
+            # e.g. cryptography's InvalidToken has no message of its own
+            detail = str(e) or type(e).__name__
+            print(f"Error loading vault: {detail}")
+            if self.on_error is not None:
+                try:
+                    self.on_error("Vault Error", f"Error loading vault: {detail}\nFile: {self.vault_file}")
+                except Exception as gui_e:
+                    print(f"(Error dialog failed: {gui_e})")
+            if strict:
+                raise VaultLoadError(f"Error loading vault: {detail}") from e
             return []
 
-    def _save_vault(self, accounts):
-        """Encrypt and save the vault."""
+    def _read_disk_stamp(self):
+        """Cheap fingerprint of the backing store, to spot outside writes."""
+        if self._store is not None:
+            return self._store.data_version()
         try:
-            # Convert to JSON
-            json_data = json.dumps(accounts, indent=2)
-
-            # Encrypt the data
-            encrypted_data = self.cipher.encrypt(json_data.encode())
+            st = os.stat(self.vault_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _cache_is_fresh(self):
+        if self.is_locked:
+            # Nothing can be decrypted; outside changes are read after unlock
+            return self._accounts is not None
+        return (
+            self._accounts is not None
+            and self._disk_stamp == self._read_disk_stamp()
+        )
+
+    def _set_cache(self, accounts, stamp):
+        """Adopt ``accounts`` as the in-memory vault and rebuild indexes."""
+        self._accounts = accounts
+        self._by_id = {acc["id"]: acc for acc in accounts}
+        self._disk_stamp = stamp
+        # Copies not written yet still count after a reload
+        for account_id, (timestamp, score) in self._pending_copies.items():
+            account = self._by_id.get(account_id)
+            if account is not None and (account.get("last_copied") or "") < timestamp:
+                account["last_copied"] = timestamp
+                account["frecency"] = score
+        for index in self._indexes:
+            index.rebuild(accounts)
+
+    def _invalidate_cache(self):
+        """Forget the in-memory vault; the next load re-reads it."""
+        self._accounts = None
+        self._by_id = {}
+        self._secret_tokens = {}
+        self._disk_stamp = None
+
+    def _index_add(self, account):
+        """Record a new or changed entry in the cache's indexes."""
+        if self._accounts is None:
+            return
+        self._by_id[account["id"]] = account
+        for index in self._indexes:
+            index.add(account)
+
+    def _index_discard(self, account_id):
+        """Drop a deleted entry from the cache's indexes."""
+        if self._accounts is None:
+            return
+        self._by_id.pop(account_id, None)
+        for index in self._indexes:
+            index.discard(account_id)
+
+    def _read_vault_file(self):
+        """Read the JSON vault file as (metadata, secret token) records."""
+        records = []
+        token_cache = {}
+        with vault_file.open_vault(self.vault_file) as f:
+            for token, plaintext, secret in vault_file.iter_records(
+                    f, self.cipher, self.encryption_key):
+                account = vault_file.load_json(plaintext)
+                if secret is None:
+                    # Older layout with the secrets inline: split them out
+                    # (the file is upgraded on the next save)
+                    account, secret = self._split_entry(account)
+                else:
+                    # Records always have last_copied, so vaults saved
+                    # before the field existed need no backfill
+                    account = AccountRecord.from_dict(account)
+                    if token is not None:
+                        token_cache[account.id] = (account.state(), token)
+                records.append((account, secret))
 
-            # Save to file
-            with open(self.vault_file, 'wb') as f:
-                f.write(encrypted_data)
+        self._token_cache = token_cache
+        return records
 
+    def _save_vault(self, accounts):
+        """Encrypt and save the vault (deferred inside a transaction)."""
+        if self._transaction_accounts is not None:
+            self._transaction_accounts = accounts
             return True
+        return self._write_vault(accounts)
+
+    def _write_vault(self, accounts):
+        """Encrypt and atomically save the vault, one line per account."""
+        try:
+            records, inline = self._to_records(accounts)
+            if self._store is not None:
+                self._store.save_all(records)
+            else:
+                lines = self._encode_lines(records)
+                vault_file.write_vault(self.vault_file, self.encryption_key, lines)
         except Exception as e:
             print(f"Error saving vault: {e}")
+            # The cache may hold changes that never reached disk
+            self._invalidate_cache()
+            return False
+
+        accounts = [account for account, _ in records]
+        self._secret_tokens = {account["id"]: secret for account, secret in records}
+        if self._accounts is None or inline:
+            self._set_cache(accounts, self._read_disk_stamp())
+        else:
+            self._accounts = accounts
+            self._disk_stamp = self._read_disk_stamp()
+        return True
+
+    def _split_entry(self, account):
+        """Split a full entry into (AccountRecord, encrypted secret token)."""
+        meta, secrets = vault_file.split_secrets(account)
+        return AccountRecord.from_dict(meta), vault_file.encrypt_secrets(self.cipher, secrets)
+
+    def _to_records(self, accounts):
+        """
+        Pair entries with their secret tokens for saving.
+
+        Entries may be cached metadata (whose secret token is already
+        known) or full dicts with inline secrets, e.g. from an import;
+        those are split and encrypted here.
+
+        Returns:
+            (records, inline): list of (metadata, secret token), and
+            whether any entry carried inline secrets
+        """
+        records = []
+        inline = False
+        for account in accounts:
+            if any(field in account for field in vault_file.SECRET_FIELDS):
+                account, secret = self._split_entry(account)
+                inline = True
+            else:
+                secret = self._secret_tokens.get(account["id"])
+                if secret is None:
+                    account, secret = self._split_entry(account)
+                elif not isinstance(account, AccountRecord):
+                    account = AccountRecord.from_dict(account)
+            records.append((account, secret))
+        return records, inline
+
+    def _encode_lines(self, records):
+        """Encrypt records into vault file lines, reusing unchanged tokens."""
+        lines = []
+        token_cache = {}
+        for account, secret in records:
+            state = account.state()
+
+            # Reuse the existing token when the entry is unchanged
+            cached = self._token_cache.get(account.id)
+            if cached is not None and cached[0] == state:
+                token = cached[1]
+            else:
+                plaintext = json.dumps(account.to_dict(), separators=(",", ":")).encode()
+                token = self.cipher.encrypt(vault_file.pad_plaintext(plaintext))
+
+            token_cache[account.id] = (state, token)
+            lines.append(vault_file.record_line(token, secret))
+
+        self._token_cache = token_cache
+        return lines
+
+    def export_vault_bytes(self):
+        """
+        Serialize the vault in the JSON vault file format.
+
+        Used to export a SQLite-backed vault in the portable format; for the
+        JSON backend this is simply the vault file's contents.
+
+        Returns:
+            bytes: vault file contents
+        """
+        if self._store is None:
+            with open(self.vault_file, 'rb') as f:
+                return f.read()
+        lines = self._encode_lines(self._store.load_all())
+        return vault_file.vault_bytes(self.encryption_key, lines)
+
+    def rekey(self, new_password, accounts=None):
+        """
+        Re-encrypt the whole vault under a key derived from new_password.
+
+        Args:
+            new_password: The new master password
+            accounts: Already-loaded entries to write (loaded if None)
+
+        Returns:
+            bool: True if the vault was re-encrypted, False otherwise
+        """
+        if accounts is None:
+            accounts = self._load_vault()
+        # Secrets have to be decrypted with the old key before switching
+        entries = [self._with_secrets(account) for account in accounts]
+
+        self.encryption_key = self._derive_key(new_password)
+        self.cipher = Fernet(self.encryption_key)
+        self.reader = vault_file.TokenReader(self.encryption_key)
+        self._token_cache = {}
+        self._secret_tokens = {}
+
+        if self._store is None:
+            return self._write_vault(entries)
+        try:
+            records, _ = self._to_records(entries)
+            self._store.rekey(self.cipher, self.encryption_key, records)
+        except Exception as e:
+            print(f"Error re-encrypting vault: {e}")
+            self._invalidate_cache()
             return False
+        self._secret_tokens = {account["id"]: secret for account, secret in records}
+        self._set_cache([account for account, _ in records], self._read_disk_stamp())
+        return True
+
+    @property
+    def is_locked(self):
+        return self._locked_kcv is not None
+
+    def lock(self):
+        """
+        Drop the vault key until unlock() is given it again.
+
+        The cached metadata, the indexes and the still encrypted secret
+        tokens are kept, so unlocking does not re-read or re-decrypt the
+        vault. While locked, secrets cannot be decrypted (VaultLockedError).
+        """
+        if self.is_locked:
+            return
+        self.flush_copies()
+        self.secret_cache.clear()
+        self._load_vault()  # keep the metadata listable while locked
+        self._locked_kcv = vault_file.key_check_value(self.encryption_key)
+        self.encryption_key = None
+        self.cipher = None
+        self.reader.wipe()
+        self.reader = None
+        if self._store is not None:
+            self._store.forget_key()
+
+    def unlock(self, key):
+        """
+        Take the vault key back after lock().
+
+        Args:
+            key: The vault key (e.g. vault_file.derive_key(master_password))
+
+        Raises:
+            vault_file.VaultKeyError: ``key`` is not the key the vault was locked with
+        """
+        if not self.is_locked:
+            return
+        if not hmac.compare_digest(self._locked_kcv, vault_file.key_check_value(key)):
+            raise vault_file.VaultKeyError("master password does not match this vault")
+        cipher = Fernet(key)
+        if self._store is not None:
+            self._store.unlock(cipher, key)
+        self.encryption_key = key
+        self.cipher = cipher
+        self.reader = vault_file.TokenReader(key)
+        self._locked_kcv = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Apply many changes with one vault load and one save.
+
+        Example:
+            with manager.transaction():
+                manager.create_account("Gmail", "me@gmail.com", "pw")
+                manager.delete_account(3)
+
+        If the vault cannot be loaded, or the final save fails,
+        TransactionError is raised. If the block raises, nothing is
+        written and the exception propagates. Either way the vault on
+        disk is left unchanged. Nested transactions join the outermost
+        one, so a failure inside them must propagate for it to roll back.
+        """
+        if self._transaction_accounts is not None:
+            yield self
+            return
+
+        # Never start from an empty list after a failed load: the commit
+        # would save over the vault
+        try:
+            accounts = self._load_vault(strict=True)
+        except VaultLoadError as e:
+            raise TransactionError(f"{e}; no changes were applied.") from e
+
+        # The working copy is the cache itself, so a rollback must drop it
+        self._transaction_accounts = accounts
+        try:
+            yield self
+            accounts = self._transaction_accounts
+        except BaseException:
+            self._invalidate_cache()
+            raise
+        finally:
+            self._transaction_accounts = None
+
+        if not self._write_vault(accounts):
+            raise TransactionError("Failed to save vault; no changes were applied.")
 
     def create_account(self, account_name, username, password, notes="", website_url=""):
         """
@@ -118,14 +533,88 @@ class AccountManager:
         Returns:
             dict: The created account entry with ID
         """
-        accounts = self._load_vault()
+        if self._store is not None and self._transaction_accounts is None:
+            account = self._new_account(
+                self._store.next_id(), account_name, username, password, notes, website_url
+            )
+            meta, secret = self._split_entry(account)
+            try:
+                self._store.put(meta, secret)
+            except Exception as e:
+                print(f"Error saving vault: {e}")
+                return None
+            if self._cache_is_fresh():
+                self._accounts.append(meta)
+                self._secret_tokens[meta["id"]] = secret
+                self._index_add(meta)
+            else:
+                self._invalidate_cache()
+            return account
+
+        try:
+            accounts = self._load_vault(strict=True)
+        except VaultLoadError:
+            return None
 
         # Generate unique ID
         account_id = self._generate_id(accounts)
 
-        # Create account entry
+        account = self._new_account(
+            account_id, account_name, username, password, notes, website_url
+        )
+        meta, secret = self._split_entry(account)
+        accounts.append(meta)
+        self._secret_tokens[account_id] = secret
+
+        if self._save_vault(accounts):
+            self._index_add(meta)
+            return account
+        else:
+            return None
+
+    def create_accounts(self, entries):
+        """
+        Create many account entries with one vault load and one save.
+
+        Args:
+            entries: Iterable of dicts holding create_account's arguments
+                     (account_name, username, password, notes, website_url)
+
+        Returns:
+            list: The created entries, or None if the vault could not be
+            loaded or saved (in which case the vault is unchanged)
+
+        Raises:
+            TransactionError: instead of returning None when called inside
+            an outer transaction(), so that the whole transaction rolls back
+        """
+        nested = self._transaction_accounts is not None
+        created = []
+        try:
+            with self.transaction():
+                accounts = self._load_vault()
+                next_id = self._generate_id(accounts)
+                for entry in entries:
+                    account = self._new_account(next_id, **entry)
+                    meta, secret = self._split_entry(account)
+                    accounts.append(meta)
+                    self._secret_tokens[next_id] = secret
+                    self._index_add(meta)
+                    created.append(account)
+                    next_id += 1
+        except TransactionError as e:
+            if nested:
+                raise
+            print(f"Error creating accounts: {e}")
+            return None
+
+        return created
+
+    def _new_account(self, account_id, account_name, username, password,
+                     notes="", website_url=""):
+        """Build a new account entry dict."""
         now = datetime.now().isoformat()
-        account = {
+        return {
             "id": account_id,
             "account_name": account_name,
             "username": username,
@@ -138,13 +627,6 @@ class AccountManager:
             "last_copied": None,  # Tracks when the password was last copied
         }
 
-        accounts.append(account)
-
-        if self._save_vault(accounts):
-            return account
-        else:
-            return None
-
     def update_account(self, account_id, **kwargs):
         """
         Update an existing account entry.
@@ -156,34 +638,109 @@ class AccountManager:
         Returns:
             dict: Updated account entry, or None if not found
         """
-        accounts = self._load_vault()
+        record = self._get_record(account_id)
+        if record is None:
+            return None
+        account, secret = record
+        secret = self._apply_update(account, secret, kwargs)
+        cached = account is self._by_id.get(account_id)
+        if cached:
+            self._secret_tokens[account_id] = secret
 
-        for account in accounts:
-            if account["id"] == account_id:
-                # Track whether the password actually changed
-                password_changed = (
-                    "password" in kwargs
-                    and kwargs["password"] != account.get("password")
-                )
+        if self._store is not None and self._transaction_accounts is None:
+            try:
+                self._store.put(account, secret)
+            except Exception as e:
+                print(f"Error saving vault: {e}")
+                self._invalidate_cache()
+                return None
+            if cached:
+                self._index_add(account)
+            return self._with_secrets(account, secret)
+
+        if self._save_vault(self._load_vault()):
+            self._index_add(account)
+            return self._with_secrets(account, secret)
+        else:
+            return None
 
-                # Update fields
-                for key, value in kwargs.items():
-                    if key in account:
-                        account[key] = value
+    def update_accounts(self, updates):
+        """
+        Update many account entries with one vault load and one save.
 
-                # Update last_modified timestamp
-                account["last_modified"] = datetime.now().isoformat()
+        Args:
+            updates: Dict mapping account ID -> dict of fields to update
+                     (same fields as update_account)
 
-                # Update last_password_change only if password actually changed
-                if password_changed:
-                    account["last_password_change"] = datetime.now().isoformat()
+        Returns:
+            list: The updated entries, or None if any ID was not found or
+            the vault could not be loaded or saved (in which case the vault
+            is unchanged)
 
-                if self._save_vault(accounts):
-                    return account
-                else:
-                    return None
+        Raises:
+            TransactionError: instead of returning None when called inside
+            an outer transaction(), so that the whole transaction rolls back
+        """
+        nested = self._transaction_accounts is not None
+        updated = []
+        try:
+            with self.transaction():
+                by_id = {acc["id"]: acc for acc in self._load_vault()}
+                for account_id, fields in updates.items():
+                    account = by_id.get(account_id)
+                    if account is None:
+                        raise TransactionError(f"No account with id {account_id}.")
+                    self._secret_tokens[account_id] = self._apply_update(
+                        account, self._secret_tokens.get(account_id), fields
+                    )
+                    self._index_add(account)
+                    updated.append(account)
+        except TransactionError as e:
+            if nested:
+                raise
+            print(f"Error updating accounts: {e}")
+            return None
 
-        return None
+        return [self._with_secrets(account) for account in updated]
+
+    def _apply_update(self, account, secret, fields):
+        """
+        Apply field updates to an entry and bump its timestamps.
+
+        Args:
+            account: The entry's metadata dict (updated in place)
+            secret: The entry's current secret token
+            fields: Fields to update
+
+        Returns:
+            bytes: The entry's secret token, re-encrypted if a secret field
+            changed
+        """
+        now = datetime.now().isoformat()
+        secret_fields = {k: v for k, v in fields.items() if k in vault_file.SECRET_FIELDS}
+        if secret_fields:
+            secrets = self._decrypt_secrets(secret)
+            # Track whether the password actually changed
+            password_changed = (
+                "password" in secret_fields
+                and secret_fields["password"] != secrets.get("password")
+            )
+            if any(secrets.get(k) != v for k, v in secret_fields.items()):
+                secrets.update(secret_fields)
+                secret = vault_file.encrypt_secrets(self.cipher, secrets)
+
+            # Update last_password_change only if password actually changed
+            if password_changed:
+                account["last_password_change"] = now
+
+        # Update fields
+        for key, value in fields.items():
+            if key in account:
+                account[key] = value
+
+        # Update last_modified timestamp
+        account["last_modified"] = now
+        return secret
 
     def delete_account(self, account_id):
         """
@@ -195,39 +752,331 @@ class AccountManager:
         Returns:
             bool: True if deleted, False otherwise
         """
-        accounts = self._load_vault()
+        if self._store is not None and self._transaction_accounts is None:
+            try:
+                self._store.delete(account_id)
+            except Exception as e:
+                print(f"Error saving vault: {e}")
+                return False
+            if self._cache_is_fresh():
+                self._accounts[:] = [acc for acc in self._accounts if acc["id"] != account_id]
+                self._secret_tokens.pop(account_id, None)
+                self._index_discard(account_id)
+            else:
+                self._invalidate_cache()
+            return True
+
+        try:
+            accounts = self._load_vault(strict=True)
+        except VaultLoadError:
+            return False
 
         # Find and remove the account
         accounts = [acc for acc in accounts if acc["id"] != account_id]
 
-        return self._save_vault(accounts)
+        if self._save_vault(accounts):
+            self._index_discard(account_id)
+            return True
+        return False
+
+    def delete_accounts(self, account_ids):
+        """
+        Delete many account entries with one vault load and one save.
+
+        Args:
+            account_ids: Iterable of account IDs to delete
+
+        Returns:
+            bool: True if saved, False otherwise (vault unchanged)
 
-    def get_account(self, account_id):
+        Raises:
+            TransactionError: instead of returning False when called inside
+            an outer transaction(), so that the whole transaction rolls back
         """
-        Get a specific account entry.
+        nested = self._transaction_accounts is not None
+        ids = set(account_ids)
+        try:
+            with self.transaction():
+                accounts = self._load_vault()
+                self._save_vault([acc for acc in accounts if acc["id"] not in ids])
+                for account_id in ids:
+                    self._index_discard(account_id)
+        except TransactionError as e:
+            if nested:
+                raise
+            print(f"Error deleting accounts: {e}")
+            return False
+
+        return True
+
+    def get_account(self, account_id, include_secrets=True):
+        """
+        Get a specific account entry, secrets included.
 
         Args:
             account_id: ID of the account
+            include_secrets: False to skip decrypting password and notes
 
         Returns:
             dict: Account entry, or None if not found
         """
-        accounts = self._load_vault()
+        record = self._get_record(account_id)
+        if record is None:
+            return None
+        if not include_secrets:
+            return record[0].to_dict()
+        return self._with_secrets(*record)
 
-        for account in accounts:
-            if account["id"] == account_id:
-                return account
+    def get_secret(self, account_id, field="password"):
+        """
+        Decrypt a single secret field of one entry on demand.
+
+        Args:
+            account_id: ID of the account
+            field: "password" or "notes"
 
-        return None
+        Returns:
+            str: The field's value, or None if the account was not found
+        """
+        record = self._get_record(account_id)
+        if record is None:
+            return None
+        secret = record[1]
+        secrets = self.secret_cache.get(account_id, secret)
+        if secrets is None:
+            if self.cipher is None:
+                raise VaultLockedError("the vault is locked")
+            if secret is None:
+                return ""
+            # The plaintext only exists in the reader's buffer and the
+            # cache's copy, both wiped later; the str is made on return
+            plaintext = self.reader.decrypt(secret)
+            try:
+                self.secret_cache.put(account_id, secret, plaintext)
+                secrets = vault_file.load_json(plaintext)
+            finally:
+                plaintext.release()
+                self.reader.wipe()
+        return secrets.get(field, "")
+
+    def _get_record(self, account_id):
+        """Return (metadata, secret token) for one entry, or None."""
+        if (self._store is not None and self._transaction_accounts is None
+                and not self._cache_is_fresh()):
+            return self._store.get(account_id)
+
+        self._load_vault()
+        account = self._by_id.get(account_id)
+        if account is None:
+            return None
+        return account, self._secret_tokens.get(account_id)
+
+    def _decrypt_secrets(self, secret):
+        """Decrypt a secret token; a missing token means empty secrets."""
+        if self.cipher is None:
+            raise VaultLockedError("the vault is locked")
+        if secret is None:
+            return {field: "" for field in vault_file.SECRET_FIELDS}
+        return vault_file.decrypt_secrets(self.reader, secret)
+
+    def _with_secrets(self, account, secret=None):
+        """Return a dict copy of an entry with its secrets decrypted."""
+        entry = account.to_dict() if isinstance(account, AccountRecord) else dict(account)
+        if any(field in account for field in vault_file.SECRET_FIELDS):
+            return entry  # already a full entry
+        if secret is None:
+            secret = self._secret_tokens.get(account["id"])
+        entry.update(self._decrypt_secrets(secret))
+        return entry
+
+    def find_accounts_by_name(self, account_name):
+        """
+        Get all entries whose account name matches (case-insensitive).
+
+        Args:
+            account_name: Name to look up
+
+        Returns:
+            list: Matching account entries
+        """
+        if (self._store is not None and self._transaction_accounts is None
+                and not self._cache_is_fresh()):
+            return [
+                self._with_secrets(account, secret)
+                for account, secret in self._store.find_by_name(account_name)
+            ]
+
+        name = (account_name or "").lower()
+        return [
+            self._with_secrets(acc) for acc in self._load_vault()
+            if (acc.get("account_name") or "").lower() == name
+        ]
 
     def get_all_accounts(self):
         """
-        Get all account entries.
+        Get all account entries, secrets included.
+
+        This decrypts every secret in the vault; prefer iter_accounts()
+        when only some entries or fields are needed.
 
         Returns:
             list: List of all account entries
         """
-        return self._load_vault()
+        return [self._with_secrets(account) for account in self._load_vault()]
+
+    def iter_accounts(self, sort_by=None, query=None, offset=0, limit=None, fields=None):
+        """
+        Lazily yield one page of entries as lightweight projections.
+
+        Secret fields (password, notes) are decrypted only when listed in
+        ``fields``, and only for the entries actually yielded.
+
+        Args:
+            sort_by: Sort mode (as for get_sorted_accounts); None keeps
+                     vault order
+            query: Optional search text or filters, as a string or a
+                   query_filter.CompiledQuery (see search_accounts);
+                   strings use self.renewal_days for is:due
+            offset: Number of matching entries to skip
+            limit: Maximum number of entries to yield (None = all)
+            fields: Field names to include besides "id" (None = all fields)
+
+        Yields:
+            dict: {"id": ..., <requested fields>} per entry
+        """
+        if fields is None:
+            meta_fields = None
+            secret_fields = vault_file.SECRET_FIELDS
+        else:
+            meta_fields = [f for f in fields if f not in vault_file.SECRET_FIELDS and f != "id"]
+            secret_fields = [f for f in fields if f in vault_file.SECRET_FIELDS]
+
+        if (not query and limit is not None and self._store is not None
+                and self._transaction_accounts is None and self._store.can_query(sort_by)
+                and not self._cache_is_fresh() and not self._pending_copies):
+            # Index scan in the database; only the requested page is decrypted
+            records = self._store.query(sort_by, offset, limit)
+        else:
+            records = self._page(sort_by, query, offset, limit)
+
+        for account, secret in records:
+            if meta_fields is None:
+                item = account.to_dict()
+            else:
+                item = {"id": account["id"]}
+                for field in meta_fields:
+                    item[field] = account.get(field)
+            if secret_fields:
+                secrets = self._decrypt_secrets(secret)
+                for field in secret_fields:
+                    item[field] = secrets.get(field, "")
+            yield item
+
+    def _page(self, sort_by, query, offset, limit):
+        """Yield (metadata, secret token) for one page of the cached vault."""
+        accounts = self._load_vault()
+        if isinstance(query, str):
+            query = compile_query(query, renewal_days=self.renewal_days)
+        index = self.sort_indexes.get(sort_by)
+        end = None if limit is None else offset + limit
+
+        if query and query.text:
+            matches = self.search_index.search(query.text)
+            ids = index.order(matches, lazy=True) if index is not None else sorted(matches)
+        elif index is not None:
+            ids = index.iter_ids() if query else index.ids(offset, limit)
+        else:
+            ids = [account["id"] for account in accounts]
+
+        if query and query.predicate is not None:
+            ids = self.metadata_index.filter(ids, query.predicate)
+        if query or index is None:
+            ids = itertools.islice(ids, offset, end)
+
+        by_id = self._by_id
+        secret_tokens = self._secret_tokens
+        for account_id in ids:
+            account = by_id.get(account_id)
+            if account is not None:  # may have been deleted meanwhile
+                yield account, secret_tokens.get(account_id)
+
+    def get_sorted_accounts(self, sort_by, offset=0, limit=None):
+        """
+        Get account entries in display order.
+
+        Args:
+            sort_by: "alphabetical" | "date_created" | "date_modified" | "last_copied"
+                     | "most_used"
+            offset: Number of entries to skip
+            limit: Maximum number of entries to return (None = all)
+
+        Returns:
+            list: Account entries, sorted
+        """
+        return list(self.iter_accounts(sort_by, offset=offset, limit=limit))
+
+    def search_accounts(self, query, sort_by=None):
+        """
+        Find entries whose name, username or website contain every term.
+
+        The query may also contain filters such as age>90, site:google.com
+        or copied:<7d (see query_filter.py).
+
+        Args:
+            query: Search text; whitespace-separated terms are ANDed
+            sort_by: Optional sort mode (as for get_sorted_accounts)
+
+        Returns:
+            list: Matching account entries
+        """
+        return list(self.iter_accounts(sort_by, query=query))
+
+    def fuzzy_find(self, query, limit=20):
+        """
+        Rank entries by a fuzzy (fzf-style) match on name or website host.
+
+        Args:
+            query: Characters to match in order, e.g. "gml" for Gmail
+            limit: Maximum number of results
+
+        Returns:
+            list: {"id", "account_name", "username", "website_url"} per
+            match, best first
+        """
+        self._load_vault()
+        by_id = self._by_id
+        results = []
+        for account_id in self.fuzzy_index.search(query, limit):
+            account = by_id[account_id]
+            results.append({
+                "id": account_id,
+                "account_name": account.get("account_name", ""),
+                "username": account.get("username", ""),
+                "website_url": account.get("website_url", ""),
+            })
+        return results
+
+    def find_accounts_for_url(self, url):
+        """
+        Find the entries saved for a website, e.g. for autofill.
+
+        Entries on exactly the URL's host come first, then entries on
+        other hosts of the same site (registrable domain), so
+        https://login.example.co.uk/path also finds www.example.co.uk.
+        Secrets are not included; fetch them with get_secret().
+
+        Args:
+            url: Full URL or bare host name
+
+        Returns:
+            list: Entry metadata dicts, best match first (each group
+            most-used first)
+        """
+        self._load_vault()
+        exact, related = self.domain_index.lookup(url)
+        order = self.sort_indexes["most_used"].order
+        by_id = self._by_id
+        return [by_id[i].to_dict() for i in order(exact) + order(related)]
 
     def _generate_id(self, accounts):
         """Generate a unique ID for a new account."""
@@ -247,21 +1096,54 @@ class AccountManager:
         Returns:
             int: Number of days since password change, or None if not found
         """
-        account = self.get_account(account_id)
+        return self.password_ages([account_id]).get(account_id, (None, FRESH))[0]
 
-        if not account:
-            return None
+    def password_ages(self, account_ids=None, renewal_days=0):
+        """
+        Password age and renewal level of many entries at once (one pass
+        over the timestamp columns, see metadata_columns).
 
-        last_change = datetime.fromisoformat(account["last_password_change"])
-        now = datetime.now()
-        delta = now - last_change
+        Args:
+            account_ids: IDs to compute (None = every entry); unknown IDs
+                         are left out
+            renewal_days: Password renewal period (0 = renewal off)
 
-        return delta.days
+        Returns:
+            dict: account id -> (days since password change or None,
+            metadata_columns renewal level)
+        """
+        if (account_ids is not None and self._store is not None
+                and self._transaction_accounts is None and not self._cache_is_fresh()):
+            # Paged from the database and not loaded: read just these
+            columns = MetadataColumns()
+            columns.rebuild(record[0] for record in map(self._store.get, account_ids) if record)
+            return columns.password_ages(renewal_days=renewal_days)
+        self._load_vault()
+        return self.metadata_columns.password_ages(account_ids, renewal_days)
+
+    def password_age_buckets(self, bounds=AGE_BUCKETS):
+        """
+        Count the vault's passwords by age.
+
+        Args:
+            bounds: Ascending upper bounds in days, e.g. (30, 90) counts
+                    ages under 30 days, 30-89 days and 90 days or more
+
+        Returns:
+            list: len(bounds) + 1 counts
+        """
+        self._load_vault()
+        return self.metadata_columns.age_buckets(bounds)
+
+    def get_due_account_ids(self, renewal_days):
+        """IDs of the entries whose password is older than ``renewal_days``."""
+        self._load_vault()
+        return self.metadata_columns.due_ids(renewal_days)
 
     def update_last_copied(self, account_id):
         """
-        Update the last_copied timestamp for an account, used by the
-        "Last Copied" sort option.
+        Record a copy: update the last_copied timestamp (the "Last Copied"
+        sort option) and bump the entry's frecency score ("Most used").
 
         Args:
             account_id: ID of the account
@@ -269,14 +1151,94 @@ class AccountManager:
         Returns:
             bool: True if updated successfully, False otherwise
         """
-        accounts = self._load_vault()
+        return self.record_copy(account_id) and self.flush_copies()
 
-        for account in accounts:
-            if account["id"] == account_id:
-                account["last_copied"] = datetime.now().isoformat()
-                return self._save_vault(accounts)
+    def record_copy(self, account_id):
+        """
+        Record a copy in memory only, like update_last_copied() without the
+        write: the cached entry and its sort indexes change at once, and
+        the next flush_copies() (or any save) writes it. The GUI batches
+        copies this way so copying never waits for the vault to be saved.
 
-        return False
+        Args:
+            account_id: ID of the account
+
+        Returns:
+            bool: True if the account exists
+        """
+        now = datetime.now().isoformat()
+        account = None
+        if self._store is not None and not self._cache_is_fresh():
+            usage = self._pending_copies.get(account_id)
+            if usage is None:
+                try:
+                    usage = self._store.get_usage(account_id)
+                except Exception as e:
+                    print(f"Error reading vault: {e}")
+                    return False
+                if usage is None:
+                    return False
+        else:
+            self._load_vault()
+            account = self._by_id.get(account_id)
+            if account is None:
+                return False
+            usage = (account.get("last_copied"), account.get("frecency"))
+
+        score = frecency.bump(usage[1], now, last_copied=usage[0])
+        self._pending_copies[account_id] = (now, score)
+        if account is not None:
+            account["last_copied"] = now
+            account["frecency"] = score
+            self._index_add(account)
+        return True
+
+    @property
+    def pending_copies(self):
+        """Number of recorded copies not written yet."""
+        return len(self._pending_copies)
+
+    def flush_copies(self):
+        """
+        Write the copies recorded by record_copy() in one go: one vault
+        save (JSON) or one UPDATE transaction (SQLite).
+
+        Returns:
+            bool: True if they were written (or there were none)
+        """
+        if not self._pending_copies or self._transaction_accounts is not None:
+            return True  # a transaction writes them when it commits
+        pending = {}
+        try:
+            if self._store is not None:
+                pending, self._pending_copies = self._pending_copies, {}
+                self._store.set_last_copied_many(
+                    [(account_id, timestamp, score)
+                     for account_id, (timestamp, score) in pending.items()]
+                )
+                return True
+            accounts = self._load_vault()
+            pending, self._pending_copies = self._pending_copies, {}
+            ok = self._save_vault(accounts)
+        except Exception as e:
+            print(f"Error saving vault: {e}")
+            ok = False
+        if not ok:
+            # Keep them for the next flush (newer copies take precedence)
+            for account_id, usage in pending.items():
+                self._pending_copies.setdefault(account_id, usage)
+        return ok
+
+    def order_ids(self, account_ids, sort_by):
+        """
+        Return ``account_ids`` in ``sort_by`` display order, e.g. to move
+        one card after a copy. None if ``sort_by`` has no sort index.
+        """
+        index = self.sort_indexes.get(sort_by)
+        if index is None:
+            return None
+        self._load_vault()
+        return index.order(set(account_ids))
 
 
 # Quick test
@@ -0,0 +1,299 @@
+"""
+Compact in-memory record for one vault entry's metadata.
+
+AccountManager used to cache every entry as a dict: a hash table of ten
+keys (new key strings per entry, since each entry is parsed on its own)
+plus four ISO timestamp strings. AccountRecord keeps the same data in
+__slots__, with the timestamps as integer microseconds, which is a
+fraction of the size (see the benchmark below).
+
+Records still behave like the dicts they replace (record["username"],
+record.get(...), record[...] = ..., dict(record)), and timestamps read
+through the mapping come back as the same ISO strings they were stored
+as, so the vault files, the SQLite columns and every caller are
+unchanged. Code that only needs to compare or subtract dates can read
+the integers directly (record.created, record.password_changed,
+record.modified, record.copied).
+
+Secret fields (password, notes) are not part of a record; they stay
+encrypted next to it and are decrypted on demand (see
+AccountManager.get_secret).
+"""
+
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+
+# Timestamps are naive local times, counted in microseconds from this
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Mapping key -> slot holding its integer timestamp
+TIMESTAMP_SLOTS = {
+    "created_date": "created",
+    "last_password_change": "password_changed",
+    "last_modified": "modified",
+    "last_copied": "copied",
+}
+
+# Keys every record has, in the order entries have always been written
+FIELDS = (
+    "id", "account_name", "username", "website_url",
+    "created_date", "last_password_change", "last_modified", "last_copied",
+)
+
+# Only present once set (written after FIELDS)
+OPTIONAL_FIELDS = ("frecency",)
+
+_PLAIN_FIELDS = frozenset(("id", "account_name", "username", "website_url", "frecency"))
+_KNOWN = _PLAIN_FIELDS | frozenset(TIMESTAMP_SLOTS)
+
+# The indexes read these on every entry; skip the generic lookup
+_GETTERS = {key: attrgetter(key) for key in ("id", "account_name", "username", "website_url")}
+
+
+def to_micros(value):
+    """
+    Convert an ISO timestamp to integer microseconds (None stays None).
+
+    Timestamps with a UTC offset are converted to local time.
+
+    Raises:
+        ValueError: ``value`` is not an ISO timestamp
+    """
+    if value is None:
+        return None
+    return _parse(value)[0]
+
+
+def _parse(value):
+    """Return (micros, whether to_iso(micros) gives back ``value`` exactly)."""
+    when = datetime.fromisoformat(value)
+    if when.tzinfo is not None:
+        return (when.astimezone().replace(tzinfo=None) - _EPOCH) // _MICROSECOND, False
+    return (when - _EPOCH) // _MICROSECOND, when.isoformat() == value
+
+
+def to_iso(micros):
+    """Convert integer microseconds back to an ISO timestamp string."""
+    if micros is None:
+        return None
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def now_micros():
+    """The current local time in integer microseconds."""
+    return (datetime.now() - _EPOCH) // _MICROSECOND
+
+
+class AccountRecord(MutableMapping):
+    """One entry's metadata, readable and writable like the dict it replaces."""
+
+    __slots__ = (
+        "id", "account_name", "username", "website_url",
+        "created", "password_changed", "modified", "copied",
+        "frecency", "_extra",
+    )
+
+    def __init__(self, account_id=None, account_name=None, username=None, website_url=None,
+                 created=None, password_changed=None, modified=None, copied=None,
+                 frecency=None):
+        """
+        Args:
+            account_id: the entry's id
+            account_name, username, website_url: text fields
+            created, password_changed, modified, copied: timestamps in
+                integer microseconds (see to_micros), or None
+            frecency: "Most used" score, or None
+        """
+        self.id = account_id
+        self.account_name = account_name
+        self.username = username
+        self.website_url = website_url
+        self.created = created
+        self.password_changed = password_changed
+        self.modified = modified
+        self.copied = copied
+        self.frecency = frecency
+        # Keys without a slot, and timestamps that would not read back
+        # as the exact string they were stored as (rare; e.g. from an
+        # older or hand-edited vault)
+        self._extra = None
+
+    @classmethod
+    def from_dict(cls, account):
+        """Build a record from an entry dict holding no secret fields."""
+        get = account.get
+        record = cls(get("id"), get("account_name"), get("username"), get("website_url"),
+                     frecency=get("frecency"))
+        previous = None
+        for key, slot in TIMESTAMP_SLOTS.items():
+            value = get(key)
+            if value is None:
+                continue
+            if value == previous:
+                # Often equal to the timestamp before it; parse once
+                setattr(record, slot, micros)
+                continue
+            micros = record._set_timestamp(key, slot, value)
+            previous = value if key not in (record._extra or ()) else None
+        for key, value in account.items():
+            if key not in _KNOWN:
+                record._set_extra(sys.intern(key), value)
+        return record
+
+    def _set_timestamp(self, key, slot, value):
+        try:
+            micros, exact = _parse(value)
+        except (TypeError, ValueError):
+            micros, exact = None, False
+        setattr(self, slot, micros)
+        if not exact:
+            self._set_extra(key, value)  # keep the original string
+        return micros
+
+    def state(self):
+        """
+        A snapshot that compares equal for records holding the same data,
+        e.g. to tell whether an entry changed since it was last saved.
+        """
+        extra = tuple(self._extra.items()) if self._extra else None
+        return (self.id, self.account_name, self.username, self.website_url,
+                self.created, self.password_changed, self.modified, self.copied,
+                self.frecency, extra)
+
+    # ------------------------------------------------------------------
+    # Mapping protocol
+    # ------------------------------------------------------------------
+    def __getitem__(self, key):
+        getter = _GETTERS.get(key)
+        if getter is not None:
+            return getter(self)
+        slot = TIMESTAMP_SLOTS.get(key)
+        if slot is not None:
+            extra = self._extra
+            if extra is not None and key in extra:
+                return extra[key]
+            return to_iso(getattr(self, slot))
+        if key in _PLAIN_FIELDS:
+            if key == "frecency" and self.frecency is None:
+                raise KeyError(key)
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        getter = _GETTERS.get(key)
+        if getter is not None:
+            return getter(self)
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return value
+
+    def __setitem__(self, key, value):
+        slot = TIMESTAMP_SLOTS.get(key)
+        if slot is not None:
+            if self._extra is not None:
+                self._extra.pop(key, None)
+            if value is None:
+                setattr(self, slot, None)
+            else:
+                self._set_timestamp(key, slot, value)
+            return
+        if key in _PLAIN_FIELDS:
+            setattr(self, key, value)
+            return
+        self._set_extra(sys.intern(key), value)
+
+    def _set_extra(self, key, value):
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in FIELDS:
+            raise KeyError(f"{key} cannot be removed from an account record")
+        if key == "frecency" and self.frecency is not None:
+            self.frecency = None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from FIELDS
+        if self.frecency is not None:
+            yield "frecency"
+        if self._extra:
+            for key in self._extra:
+                if key not in TIMESTAMP_SLOTS:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        if key in FIELDS:
+            return True
+        if key == "frecency":
+            return self.frecency is not None
+        return self._extra is not None and key in self._extra
+
+    def to_dict(self):
+        """A plain dict copy, in the key order entries are written in."""
+        created = to_iso(self.created)
+        # The three timestamps are often equal; format each value once
+        changed = created if self.password_changed == self.created else to_iso(self.password_changed)
+        modified = created if self.modified == self.created else to_iso(self.modified)
+        account = {
+            "id": self.id,
+            "account_name": self.account_name,
+            "username": self.username,
+            "website_url": self.website_url,
+            "created_date": created,
+            "last_password_change": changed,
+            "last_modified": modified,
+            "last_copied": to_iso(self.copied),
+        }
+        if self.frecency is not None:
+            account["frecency"] = self.frecency
+        if self._extra:
+            account.update(self._extra)
+        return account
+
+    def __repr__(self):
+        return f"AccountRecord({self.to_dict()!r})"
+
+
+# Quick test
+if __name__ == "__main__":
+    import json
+    import tracemalloc
+
+    def entry(i):
+        now = datetime(2024, 5, 1, 12, 0, 0, 123456) + timedelta(minutes=i)
+        return {
+            "id": i, "account_name": f"Site {i}", "username": f"user{i}@example.com",
+            "website_url": f"https://s{i}.example.com", "created_date": now.isoformat(),
+            "last_password_change": now.isoformat(), "last_modified": now.isoformat(),
+            "last_copied": None,
+        }
+
+    # Each entry is parsed on its own, as when loading a vault
+    lines = [json.dumps(entry(i)) for i in range(20_000)]
+    for name, build in (("dict", json.loads),
+                        ("AccountRecord", lambda line: AccountRecord.from_dict(json.loads(line)))):
+        tracemalloc.start()
+        entries = [build(line) for line in lines]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name}: {size / len(entries):.0f} bytes per entry")
+        del entries
+
+    record = AccountRecord.from_dict(entry(1))
+    print(record["created_date"], record.created, dict(record) == entry(1))
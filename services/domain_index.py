@@ -0,0 +1,205 @@
+"""
+Website domain index for autofill-style lookups.
+
+Every entry's website_url is parsed once into its host and its registrable
+domain (the public suffix plus one label, e.g. login.example.co.uk ->
+example.co.uk), and the index maps both to the entries using them. "Which
+accounts match this URL?" is then two hash lookups: entries on the exact
+same host, followed by the rest of the site's registrable domain.
+
+Registrable domains come from an offline, trimmed copy of the Public
+Suffix List (utils/public_suffix_list.dat), loaded on first use. Private
+suffixes such as github.io are included, so alice.github.io and
+bob.github.io are different sites.
+
+AccountManager keeps the index up to date through the same
+rebuild()/add()/discard() hooks as its other indexes.
+"""
+
+import ipaddress
+import os
+
+from services.metadata_index import host_of
+
+
+_SUFFIX_FILENAME = "public_suffix_list.dat"
+
+# (rules, wildcard rules, exception rules), loaded on first use
+_suffix_rules = None
+
+
+def _load_suffix_rules():
+    global _suffix_rules
+    if _suffix_rules is not None:
+        return _suffix_rules
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(current_dir, "..", "utils", _SUFFIX_FILENAME)
+    rules, wildcards, exceptions = set(), set(), set()
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                rule = line.split("//", 1)[0].strip().lower()
+                if not rule:
+                    continue
+                if rule.startswith("!"):
+                    exceptions.add(rule[1:])
+                elif rule.startswith("*."):
+                    wildcards.add(rule[2:])
+                else:
+                    rules.add(rule)
+    except OSError as e:
+        # Without the list every host falls back to the default rule
+        print(f"[domain_index] Could not read {_SUFFIX_FILENAME}: {e}")
+    _suffix_rules = (rules, wildcards, exceptions)
+    return _suffix_rules
+
+
+def _is_ip(host):
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+def registrable_domain(host):
+    """
+    Return the registrable domain of a host name.
+
+    Args:
+        host: lowercased host name, e.g. "login.example.co.uk"
+
+    Returns:
+        str: e.g. "example.co.uk"; the host itself for IP addresses and
+        single-label hosts (localhost); "" if the host is itself a public
+        suffix (such as "co.uk") or empty.
+    """
+    if not host:
+        return ""
+    if _is_ip(host) or "." not in host:
+        return host
+
+    rules, wildcards, exceptions = _load_suffix_rules()
+    labels = host.split(".")
+    # Walk from the longest candidate suffix down; the first rule that
+    # matches is the longest, as the PSL algorithm requires
+    for i in range(len(labels)):
+        candidate = ".".join(labels[i:])
+        if candidate in exceptions:
+            suffix_start = i + 1  # an exception rule's suffix drops its first label
+            break
+        if candidate in rules:
+            suffix_start = i
+            break
+        if i + 1 < len(labels) and ".".join(labels[i + 1:]) in wildcards:
+            suffix_start = i
+            break
+    else:
+        suffix_start = len(labels) - 1  # default rule "*": the TLD
+
+    if suffix_start == 0:
+        return ""
+    return ".".join(labels[suffix_start - 1:])
+
+
+class DomainIndex:
+    """Maps website hosts and registrable domains to account ids."""
+
+    def __init__(self):
+        self._by_host = {}    # host -> set of ids
+        self._by_domain = {}  # registrable domain -> set of ids
+        self._entries = {}    # id -> (host, domain)
+        self._pending = None  # id -> entry, awaiting a deferred rebuild
+
+    def __len__(self):
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._entries)
+
+    def rebuild(self, accounts):
+        """Discard everything; ``accounts`` are indexed on the next lookup."""
+        self._by_host = {}
+        self._by_domain = {}
+        self._entries = {}
+        self._pending = {account["id"]: account for account in accounts}
+
+    def add(self, account):
+        """Index (or re-index) one entry."""
+        if self._pending is not None:
+            self._pending[account["id"]] = account
+            return
+        self._index(account)
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        if self._pending is not None:
+            self._pending.pop(account_id, None)
+            return
+        self._unindex(account_id)
+
+    def _index(self, account):
+        account_id = account["id"]
+        host = host_of(account.get("website_url"))
+        domain = registrable_domain(host)
+        if self._entries.get(account_id) == (host, domain):
+            return
+        self._unindex(account_id)
+        if not host:
+            return
+        self._entries[account_id] = (host, domain)
+        self._by_host.setdefault(host, set()).add(account_id)
+        if domain:
+            self._by_domain.setdefault(domain, set()).add(account_id)
+
+    def _unindex(self, account_id):
+        old = self._entries.pop(account_id, None)
+        if old is None:
+            return
+        host, domain = old
+        for mapping, key in ((self._by_host, host), (self._by_domain, domain)):
+            ids = mapping.get(key)
+            if ids is not None:
+                ids.discard(account_id)
+                if not ids:
+                    del mapping[key]
+
+    def _ensure_built(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            for account in pending.values():
+                self._index(account)
+
+    def lookup(self, url):
+        """
+        Find the entries for a URL's site.
+
+        Args:
+            url: a full URL or bare host, e.g. "https://login.example.co.uk/path"
+
+        Returns:
+            (exact, related): sets of ids whose website is on exactly this
+            host, and on another host of the same registrable domain
+        """
+        self._ensure_built()
+        host = host_of(url)
+        if not host:
+            return set(), set()
+        exact = set(self._by_host.get(host, ()))
+        related = self._by_domain.get(registrable_domain(host), set()) - exact
+        return exact, related
+
+
+# Quick test
+if __name__ == "__main__":
+    for h in ("login.example.co.uk", "example.com", "a.b.github.io", "co.uk",
+              "www.ck", "foo.bar.ck", "192.168.0.1", "localhost"):
+        print(f"{h!r} -> {registrable_domain(h)!r}")
+
+    index = DomainIndex()
+    index.rebuild([
+        {"id": 1, "website_url": "https://login.example.co.uk"},
+        {"id": 2, "website_url": "https://www.example.co.uk/account"},
+        {"id": 3, "website_url": "https://example.com"},
+    ])
+    print(index.lookup("https://login.example.co.uk/path"))
@@ -0,0 +1,94 @@
+"""
+Frecency scores behind the "Most used" sort mode.
+
+An entry's frecency is its copy count with every copy decaying
+exponentially (half-life HALF_LIFE_DAYS), so an account copied daily last
+month ranks below one copied daily this week:
+
+    score(now) = sum over copies i of 2 ** -((now - t_i) / half_life)
+
+Decaying every entry as time passes would mean rewriting the whole vault.
+Instead each entry stores the log of its score anchored at a fixed epoch,
+
+    stored = log(sum over copies i of exp(rate * t_i))
+
+which never changes between copies: score(now) = exp(stored - rate * now)
+and the common exp(-rate * now) factor does not affect the order. So
+sorting by the stored value is sorting by current score, a copy updates it
+in O(1) (one log-add-exp), and an ordered index over it never goes stale.
+The stored value is a single float kept next to last_copied.
+"""
+
+import math
+from datetime import datetime
+
+
+HALF_LIFE_DAYS = 14
+
+# Decay rate per second
+_RATE = math.log(2) / (HALF_LIFE_DAYS * 86400)
+
+
+def _anchored(when):
+    """log-domain weight of one copy at ``when`` (datetime or ISO string)."""
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    return _RATE * when.timestamp()
+
+
+def bump(stored, when, last_copied=None):
+    """
+    Record one copy at ``when``.
+
+    Args:
+        stored: the entry's current stored frecency (None if it has none)
+        when: time of the copy (datetime or ISO string)
+        last_copied: the entry's previous last_copied, used to seed
+                     entries that were copied before frecency was tracked
+
+    Returns:
+        float: the new stored frecency
+    """
+    new = _anchored(when)
+    if stored is None and last_copied:
+        try:
+            stored = _anchored(last_copied)
+        except ValueError:
+            stored = None
+    if stored is None:
+        return round(new, 6)
+    # log(exp(stored) + exp(new)) without overflow
+    high, low = max(stored, new), min(stored, new)
+    return round(high + math.log1p(math.exp(low - high)), 6)
+
+
+def score_at(stored, now=None):
+    """Decayed copy count for a stored frecency (0.0 if never copied)."""
+    if stored is None:
+        return 0.0
+    now = now or datetime.now()
+    return math.exp(stored - _anchored(now))
+
+
+def sort_key(account):
+    """SortIndex key: stored frecency, never-copied entries lowest."""
+    stored = account.get("frecency")
+    return -math.inf if stored is None else stored
+
+
+# Quick test
+if __name__ == "__main__":
+    from datetime import timedelta
+
+    now = datetime.now()
+    daily_last_month = None
+    for day in range(30, 23, -1):
+        daily_last_month = bump(daily_last_month, now - timedelta(days=day))
+    daily_this_week = None
+    for day in range(7, 0, -1):
+        daily_this_week = bump(daily_this_week, now - timedelta(days=day))
+    once_today = bump(None, now)
+    for label, stored in (("daily last month", daily_last_month),
+                          ("daily this week", daily_this_week),
+                          ("once today", once_today)):
+        print(f"{label}: stored={stored} score={score_at(stored, now):.2f}")
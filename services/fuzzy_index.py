@@ -0,0 +1,216 @@
+"""
+Fuzzy (fzf-style) matching of account names and website hosts.
+
+A query matches an entry when its characters appear in order, not
+necessarily adjacent, in the account name or the website host: "gml"
+matches "Gmail", "ghub" matches "github.com". Matches are ranked by an
+fzf-like score that rewards consecutive characters, matches at word
+starts and a match on the first character, and penalises gaps.
+
+To keep ranking cheap on large vaults each entry stores a 64-bit mask of
+the characters it contains. Any entry missing one of the query's
+characters is rejected with a single AND before any string work. The
+survivors are checked with a compiled subsequence regex, and only the
+best of those are fully scored. The last query's matches are kept, so as
+the user types more characters only the previous matches are searched
+again.
+
+AccountManager keeps one of these up to date through its index hooks;
+like the search index, a rebuild is deferred until the first query.
+"""
+
+import heapq
+import re
+
+from services.metadata_index import host_of
+
+
+# Score weights (loosely after fzf's v1 algorithm)
+_SCORE_MATCH = 16
+_BONUS_CONSECUTIVE = 8
+_BONUS_BOUNDARY = 8
+_BONUS_FIRST_CHAR = 8
+_PENALTY_GAP_START = 3
+_PENALTY_GAP_EXTENSION = 1
+
+# Only this many of the best coarse matches get a full score
+_RESCORE_LIMIT = 200
+
+
+def char_mask(text):
+    """64-bit mask with one bit set per distinct character (hashed)."""
+    mask = 0
+    for ch in set(text):
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def fuzzy_score(text, query):
+    """
+    Score ``query`` as a subsequence of ``text`` (both casefolded).
+
+    Returns:
+        int score (higher is better), or None if ``query`` does not match.
+    """
+    n, m = len(text), len(query)
+    if m == 0:
+        return 0
+
+    # Forward pass: end of the first complete subsequence match
+    qi = 0
+    end = -1
+    for ti in range(n):
+        if text[ti] == query[qi]:
+            qi += 1
+            if qi == m:
+                end = ti
+                break
+    if end < 0:
+        return None
+
+    # Backward pass: latest start for that end, i.e. the tightest window
+    qi = m - 1
+    start = end
+    for ti in range(end, -1, -1):
+        if text[ti] == query[qi]:
+            qi -= 1
+            if qi < 0:
+                start = ti
+                break
+
+    # Score the window greedily
+    score = 0
+    qi = 0
+    prev = -2
+    in_gap = False
+    for ti in range(start, end + 1):
+        ch = text[ti]
+        if qi < m and ch == query[qi]:
+            bonus = 0
+            if ti == 0 or not text[ti - 1].isalnum():
+                bonus = _BONUS_BOUNDARY
+            if prev == ti - 1:
+                bonus = max(bonus, _BONUS_CONSECUTIVE)
+            if qi == 0:
+                bonus += _BONUS_FIRST_CHAR if ti == 0 else 0
+            score += _SCORE_MATCH + bonus
+            prev = ti
+            qi += 1
+            in_gap = False
+        else:
+            score -= _PENALTY_GAP_EXTENSION if in_gap else _PENALTY_GAP_START
+            in_gap = True
+    # Prefer shorter texts among otherwise equal matches
+    return score * 1000 - n
+
+
+class FuzzyIndex:
+    """Per-entry fuzzy matching data: casefolded name and host + char masks."""
+
+    def __init__(self):
+        self._entries = {}    # id -> (name, host, "name\nhost", mask)
+        self._pending = None  # id -> entry, awaiting a deferred rebuild
+        self._last = None     # (query, ids that matched it)
+
+    def __len__(self):
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._entries)
+
+    def rebuild(self, accounts):
+        """Discard everything; ``accounts`` are indexed on the next query."""
+        self._entries = {}
+        self._last = None
+        self._pending = {account["id"]: account for account in accounts}
+
+    def add(self, account):
+        """Index (or re-index) one entry."""
+        self._last = None
+        if self._pending is not None:
+            self._pending[account["id"]] = account
+            return
+        self._entries[account["id"]] = self._make_entry(account)
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        self._last = None
+        if self._pending is not None:
+            self._pending.pop(account_id, None)
+            return
+        self._entries.pop(account_id, None)
+
+    @staticmethod
+    def _make_entry(account):
+        name = (account.get("account_name") or "").casefold().replace("\n", " ")
+        host = host_of(account.get("website_url"))
+        return name, host, name + "\n" + host, char_mask(name) | char_mask(host)
+
+    def _ensure_built(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self._entries = {i: self._make_entry(a) for i, a in pending.items()}
+
+    def search(self, query, limit=50):
+        """
+        Rank entries against a fuzzy query.
+
+        Args:
+            query: text typed by the user (spaces are ignored)
+            limit: maximum number of results
+
+        Returns:
+            list of account ids, best match first
+        """
+        self._ensure_built()
+        query = "".join(query.casefold().split())
+        if not query:
+            return []
+
+        # Typing extends the query: only the previous matches can still match
+        if self._last is not None and query.startswith(self._last[0]):
+            candidates = self._last[1]
+        else:
+            candidates = self._entries.keys()
+
+        qmask = char_mask(query)
+        # Gaps may not cross the newline between name and host
+        find = re.compile("[^\n]*?".join(map(re.escape, query))).search
+        entries = self._entries
+
+        matched = []
+        coarse = []
+        for account_id in candidates:
+            entry = entries[account_id]
+            if entry[3] & qmask != qmask:
+                continue
+            hit = find(entry[2])
+            if hit is not None:
+                matched.append(account_id)
+                # Tighter, then earlier (name before host) matches first
+                start = hit.start()
+                coarse.append(((hit.end() - start) << 16 | start, account_id))
+        self._last = (query, matched)
+
+        scored = []
+        for _, account_id in heapq.nsmallest(_RESCORE_LIMIT, coarse):
+            name, host, _, _ = entries[account_id]
+            score = max(
+                (s for s in (fuzzy_score(name, query), fuzzy_score(host, query)) if s is not None),
+                default=None,
+            )
+            if score is not None:
+                scored.append((-score, account_id))
+        scored.sort()
+        return [account_id for _, account_id in scored[:limit]]
+
+
+# Quick test
+if __name__ == "__main__":
+    index = FuzzyIndex()
+    index.rebuild([
+        {"id": 1, "account_name": "Gmail", "website_url": "https://mail.google.com"},
+        {"id": 2, "account_name": "GitHub", "website_url": "https://github.com"},
+        {"id": 3, "account_name": "Good Money Ledger", "website_url": ""},
+    ])
+    for q in ("gml", "ghub", "gh", "google"):
+        print(f"{q!r}: {index.search(q)}")
@@ -0,0 +1,209 @@
+"""
+Streaming importers for third-party password manager exports.
+
+Each parser reads its file lazily, one row at a time, and yields entries
+already mapped onto AccountManager's fields:
+
+    {"account_name", "username", "password", "notes", "website_url"}
+
+Supported formats:
+    bitwarden_csv   Bitwarden "Export vault" (.csv)
+    bitwarden_json  Bitwarden "Export vault" (.json, unencrypted)
+    keepass_csv     KeePassXC / KeePass 2 CSV export
+    chrome_csv      Chrome / Edge "Export passwords" (.csv)
+
+Deduplication and saving are left to the caller (see
+SettingsManager.import_external), so these parsers never touch the vault.
+"""
+
+import csv
+import json
+import os
+from urllib.parse import urlsplit
+
+
+# Candidate CSV column names per AccountManager field, per format.
+# Matching is case-insensitive; the first column present wins.
+_CSV_COLUMNS = {
+    "bitwarden_csv": {
+        "account_name": ("name",),
+        "username": ("login_username",),
+        "password": ("login_password",),
+        "notes": ("notes",),
+        "website_url": ("login_uri",),
+    },
+    "keepass_csv": {
+        "account_name": ("title", "account"),
+        "username": ("username", "login name", "user name"),
+        "password": ("password",),
+        "notes": ("notes", "comments"),
+        "website_url": ("url", "web site"),
+    },
+    "chrome_csv": {
+        "account_name": ("name",),
+        "username": ("username",),
+        "password": ("password",),
+        "notes": ("note",),
+        "website_url": ("url",),
+    },
+}
+
+# Report progress every this many rows
+_PROGRESS_EVERY = 200
+
+
+class ImportFormatError(ValueError):
+    """Raised when a file is not in a recognised export format."""
+
+
+def detect_format(path: str) -> str:
+    """Guess the export format of ``path`` from its first line."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        first = f.readline()
+
+    if first.lstrip().startswith("{"):
+        return "bitwarden_json"
+
+    columns = {c.strip().lower() for c in next(csv.reader([first]), [])}
+    if "login_password" in columns:
+        return "bitwarden_csv"
+    if "title" in columns or "login name" in columns:
+        return "keepass_csv"
+    if {"name", "url", "username", "password"} <= columns:
+        return "chrome_csv"
+    raise ImportFormatError(
+        "Unrecognised import file. Expected a Bitwarden, KeePass or "
+        "Chrome password export."
+    )
+
+
+def iter_file(path: str, fmt: str = "auto", progress=None):
+    """
+    Lazily yield AccountManager entries from an exported file.
+
+    Args:
+        path: path to the export file
+        fmt: one of the format keys above, or "auto" to detect it
+        progress: optional callable(bytes_read, total_bytes), called every
+                  few hundred rows and once at the end
+
+    Yields:
+        dict entries with AccountManager's create_account fields
+    """
+    if fmt == "auto":
+        fmt = detect_format(path)
+
+    total = os.path.getsize(path)
+    if fmt == "bitwarden_json":
+        rows = _iter_bitwarden_json(path)
+    elif fmt in _CSV_COLUMNS:
+        rows = _iter_csv(path, _CSV_COLUMNS[fmt], bitwarden=(fmt == "bitwarden_csv"))
+    else:
+        raise ImportFormatError(f"Unknown import format: {fmt}")
+
+    count = 0
+    for bytes_read, entry in rows:
+        count += 1
+        if progress is not None and count % _PROGRESS_EVERY == 0:
+            progress(bytes_read, total)
+        yield entry
+
+    if progress is not None:
+        progress(total, total)
+
+
+def _iter_csv(path: str, columns: dict, bitwarden: bool = False):
+    """Yield (bytes_read, entry) from a CSV export, one row at a time."""
+    position = [0]
+
+    def counted_lines(f):
+        for line in f:
+            position[0] += len(line)
+            yield line
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(counted_lines(f))
+        header = next(reader, None)
+        if header is None:
+            return
+        index = {name.strip().lower(): i for i, name in enumerate(header)}
+
+        # Resolve each field to a column index once, up front
+        field_columns = {}
+        for field, candidates in columns.items():
+            for name in candidates:
+                if name in index:
+                    field_columns[field] = index[name]
+                    break
+
+        type_column = index.get("type")
+        for row in reader:
+            if not row:
+                continue
+            # Bitwarden exports also contain secure notes, cards, etc.
+            if bitwarden and type_column is not None and _cell(row, type_column).strip() not in ("", "login"):
+                continue
+            values = {field: _cell(row, i) for field, i in field_columns.items()}
+            entry = _make_entry(**values)
+            if entry is not None:
+                yield position[0], entry
+
+
+def _iter_bitwarden_json(path: str):
+    """
+    Yield (bytes_read, entry) from a Bitwarden JSON export.
+
+    The format is a single JSON document, so it is parsed in one go;
+    entries are still mapped and yielded one at a time.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        data = json.load(f)
+    if data.get("encrypted"):
+        raise ImportFormatError(
+            "This Bitwarden export is encrypted. Export it again as "
+            "unencrypted JSON or CSV."
+        )
+
+    total = os.path.getsize(path)
+    for item in data.get("items", []):
+        login = item.get("login")
+        if not login:
+            continue
+        uris = login.get("uris") or []
+        entry = _make_entry(
+            account_name=item.get("name") or "",
+            username=login.get("username") or "",
+            password=login.get("password") or "",
+            notes=item.get("notes") or "",
+            website_url=(uris[0].get("uri") or "") if uris else "",
+        )
+        if entry is not None:
+            yield total, entry
+
+
+def _cell(row, i):
+    return row[i] if i < len(row) else ""
+
+
+def _make_entry(account_name="", username="", password="", notes="", website_url=""):
+    """Map raw values onto an entry, or return None for unusable rows."""
+    if not password:
+        return None
+
+    # Passwords are kept verbatim; surrounding whitespace may be intentional
+    account_name = account_name.strip()
+    username = username.strip()
+    notes = notes.strip()
+    # Bitwarden can pack several URIs into one cell; keep the first
+    website_url = website_url.split(",")[0].strip()
+
+    if not account_name:
+        account_name = urlsplit(website_url).hostname or username or "Imported account"
+
+    return {
+        "account_name": account_name,
+        "username": username,
+        "password": password,
+        "notes": notes,
+        "website_url": website_url,
+    }
@@ -0,0 +1,381 @@
+"""
+Key-caching agent (like ssh-agent) for the command line interface.
+
+Without help every CLI call would ask for the master password again. The
+agent is a small background process that keeps derived vault keys in
+memory, one per BlueVault user, and hands them back over a Unix socket. A
+CLI call that finds its key in the agent skips the password prompt (and
+the login check and key derivation that follow it, both single SHA-256
+hashes, so the time saved is the prompt rather than the computation).
+
+Keys expire after a TTL, which defaults to the user's auto_logout_time
+setting. Like the GUI's auto-logout it is an inactivity timeout: every
+successful lookup restarts it. Expired or removed keys are overwritten in
+memory before they are dropped.
+
+The socket is mode 0600 in a 0700 per-user directory (see runtime_dir).
+On Linux the agent also checks that every connecting process belongs to
+the same user (SO_PEERCRED).
+
+Protocol: JSON lines, as for vault_daemon.py:
+    add         username, key, ttl   -> true
+    get         username             -> key (restarts the TTL)
+    remove      username             -> true if a key was held
+    remove_all                       -> number of keys dropped
+    list                             -> {username: seconds left}
+    stop                             -> stops the agent
+
+The client helpers (fetch_key, store_key, ...) only use the socket
+module, so asking the agent for a key adds almost nothing to CLI startup.
+
+Run with: python -m services.key_agent   (or: bluevault agent start)
+"""
+
+import json
+import os
+import socket
+import stat
+import tempfile
+
+
+_AGENT_SOCKET = "agent.sock"
+
+
+class AgentError(Exception):
+    """The agent refused a request (or is not running)."""
+
+
+def runtime_dir():
+    """
+    Per-user directory for BlueVault sockets, only accessible by its owner.
+
+    Uses $XDG_RUNTIME_DIR when set, otherwise the system temp directory.
+
+    Raises:
+        AgentError: the directory cannot be created, or the path is taken
+            by something other than a directory owned by the current user
+            (in a shared temp directory anyone can create it first)
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    directory = os.path.join(base, f"bluevault-{os.getuid()}")
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError as e:
+        raise AgentError(f"cannot create runtime directory {directory}: {e}")
+    if not stat.S_ISDIR(st.st_mode):
+        raise AgentError(f"{directory} is not a directory (a symlink?); remove it and retry")
+    if st.st_uid != os.getuid():
+        raise AgentError(
+            f"{directory} belongs to another user; remove it or set XDG_RUNTIME_DIR"
+        )
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        os.chmod(directory, 0o700)
+    return directory
+
+
+def agent_socket_path():
+    return os.path.join(runtime_dir(), _AGENT_SOCKET)
+
+
+def peer_is_owner(writer):
+    """
+    On Linux, check that the process connected to a Unix socket server
+    (asyncio StreamWriter) runs as the same user. Used by the agent and
+    the vault daemon.
+    """
+    sock = writer.get_extra_info("socket")
+    if sock is None or not hasattr(socket, "SO_PEERCRED"):
+        return True  # rely on the socket's file permissions
+    import struct
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid == os.getuid()
+
+
+def _encode(obj):
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _wipe(buffer):
+    buffer[:] = b"\0" * len(buffer)
+
+
+# ----------------------------------------------------------------------
+# Client side
+# ----------------------------------------------------------------------
+def _request(op, socket_path=None, timeout=2.0, **args):
+    """
+    Send one request to the agent.
+
+    Raises:
+        AgentError: the agent is not running, or refused the request
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(socket_path or agent_socket_path())
+        except OSError:
+            raise AgentError("agent is not running")
+        sock.sendall(_encode({"op": op, **args}))
+        line = sock.makefile("rb").readline()
+    finally:
+        sock.close()
+    if not line:
+        raise AgentError("agent closed the connection")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise AgentError(response.get("error", "request failed"))
+    return response.get("result")
+
+
+def is_running(socket_path=None):
+    try:
+        return _request("list", socket_path) is not None
+    except AgentError:
+        return False
+
+
+def fetch_key(username, socket_path=None):
+    """Return the cached vault key (bytes) for ``username``, or None."""
+    try:
+        return _request("get", socket_path, username=username).encode("ascii")
+    except AgentError:
+        return None
+
+
+def store_key(username, key, ttl, socket_path=None):
+    """Hand a derived vault key to the agent for ``ttl`` seconds."""
+    _request("add", socket_path, username=username, key=key.decode("ascii"), ttl=ttl)
+
+
+def forget_key(username, socket_path=None):
+    """Drop ``username``'s key; returns True if the agent held one."""
+    try:
+        return bool(_request("remove", socket_path, username=username))
+    except AgentError:
+        return False
+
+
+def forget_all(socket_path=None):
+    """Drop every key; returns how many were held (0 if no agent)."""
+    try:
+        return _request("remove_all", socket_path)
+    except AgentError:
+        return 0
+
+
+def list_keys(socket_path=None):
+    """Return {username: seconds until expiry} (raises AgentError if not running)."""
+    return _request("list", socket_path)
+
+
+def stop_agent(socket_path=None):
+    """Stop a running agent; returns False if none was running."""
+    try:
+        return bool(_request("stop", socket_path))
+    except AgentError:
+        return False
+
+
+def start_agent(socket_path=None, timeout=3.0):
+    """
+    Start the agent in the background unless it is already running.
+
+    Returns:
+        bool: True once the agent answers
+
+    Raises:
+        AgentError: the agent did not come up within ``timeout`` seconds
+    """
+    import subprocess
+    import sys
+    import time
+
+    if socket_path is None:
+        runtime_dir()  # a directory we cannot use is reported, not waited on
+    if is_running(socket_path):
+        return True
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    command = [sys.executable, "-m", "services.key_agent"]
+    if socket_path:
+        command += ["--socket", socket_path]
+    subprocess.Popen(
+        command, cwd=project_root, start_new_session=True,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running(socket_path):
+            return True
+        time.sleep(0.02)
+    raise AgentError("agent did not start")
+
+
+# ----------------------------------------------------------------------
+# Agent
+# ----------------------------------------------------------------------
+class KeyAgent:
+    """Holds derived vault keys in memory and serves them over a Unix socket."""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        # username -> (key bytearray, ttl seconds, expiry timer handle)
+        self._keys = {}
+        self._stopped = None
+        self._ops = {
+            "add": self._op_add,
+            "get": self._op_get,
+            "remove": self._op_remove,
+            "remove_all": self._op_remove_all,
+            "list": self._op_list,
+            "stop": self._op_stop,
+        }
+
+    async def serve(self, ready=None):
+        """Listen until a client sends "stop"; all keys are wiped on exit."""
+        import asyncio
+
+        self._stopped = asyncio.Event()
+        self._remove_stale_socket()
+
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+        try:
+            async with server:
+                if ready is not None:
+                    ready.set()
+                await self._stopped.wait()
+        finally:
+            self._op_remove_all({})
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        if is_running(self.socket_path):
+            raise AgentError(f"an agent is already listening on {self.socket_path}")
+        os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader, writer):
+        try:
+            if not peer_is_owner(writer):
+                return
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self._respond(line))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, line):
+        try:
+            request = json.loads(line)
+            handler = self._ops.get(request.get("op"))
+            if handler is None:
+                raise AgentError(f"unknown op {request.get('op')!r}")
+            result = handler(request)
+        except (AgentError, ValueError, TypeError, AttributeError) as e:
+            return _encode({"ok": False, "error": str(e)})
+        return _encode({"ok": True, "result": result})
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    def _schedule_expiry(self, username, ttl):
+        import asyncio
+        return asyncio.get_running_loop().call_later(ttl, self._drop, username)
+
+    def _drop(self, username):
+        entry = self._keys.pop(username, None)
+        if entry is None:
+            return False
+        key, _, timer = entry
+        timer.cancel()
+        _wipe(key)
+        return True
+
+    def _op_add(self, request):
+        username = request["username"]
+        key = request["key"]
+        ttl = request.get("ttl")
+        if not isinstance(username, str) or not isinstance(key, str):
+            raise AgentError("username and key must be strings")
+        if not isinstance(ttl, (int, float)) or ttl <= 0:
+            raise AgentError("ttl must be a positive number of seconds")
+        self._drop(username)
+        self._keys[username] = (
+            bytearray(key.encode("ascii")), ttl, self._schedule_expiry(username, ttl)
+        )
+        return True
+
+    def _op_get(self, request):
+        username = request.get("username")
+        entry = self._keys.get(username)
+        if entry is None:
+            raise AgentError(f"no key for {username!r}")
+        key, ttl, timer = entry
+        # Inactivity timeout: each use restarts the countdown
+        timer.cancel()
+        self._keys[username] = (key, ttl, self._schedule_expiry(username, ttl))
+        return key.decode("ascii")
+
+    def _op_remove(self, request):
+        return self._drop(request.get("username"))
+
+    def _op_remove_all(self, request):
+        usernames = list(self._keys)
+        for username in usernames:
+            self._drop(username)
+        return len(usernames)
+
+    def _op_list(self, request):
+        import asyncio
+        now = asyncio.get_running_loop().time()
+        return {
+            username: max(0, round(timer.when() - now))
+            for username, (_, _, timer) in self._keys.items()
+        }
+
+    def _op_stop(self, request):
+        self._stopped.set()
+        return True
+
+
+def main(argv=None):
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.key_agent",
+        description="Cache derived BlueVault keys for the command line interface.",
+    )
+    parser.add_argument("--socket", help="socket path (default: per-user runtime dir)")
+    args = parser.parse_args(argv)
+
+    try:
+        socket_path = args.socket or agent_socket_path()
+        asyncio.run(KeyAgent(socket_path).serve())
+    except KeyboardInterrupt:
+        pass
+    except AgentError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
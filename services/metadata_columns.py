@@ -0,0 +1,289 @@
+"""
+Columnar copy of every entry's timestamps, for whole-vault date math.
+
+For each entry the index keeps its four timestamps (see AccountRecord:
+created, modified, password_changed, copied) in parallel int64 columns,
+one row per entry. Password ages, renewal levels, age buckets and date
+orders for many entries are then computed in one pass over the columns
+instead of one datetime parse per entry.
+
+The columns are array("q") buffers. When NumPy is installed the passes
+run vectorized over zero-copy views of them; without it the same
+results are computed with plain loops. Missing timestamps (never
+copied) are stored as MISSING.
+
+AccountManager keeps it up to date through the same add()/discard()
+hooks as its other indexes. Like the metadata index, a rebuild is
+deferred until the columns are first needed.
+"""
+
+from array import array
+
+from services.account_record import now_micros
+
+try:
+    import numpy as np
+except ImportError:  # optional; the loops below give the same results
+    np = None
+
+
+COLUMNS = ("created", "modified", "password_changed", "copied")
+
+# Stored for a missing timestamp
+MISSING = -2 ** 63
+
+DAY_MICROS = 86_400_000_000
+
+# Renewal levels (see renewal_level): first, middle and last third of
+# the renewal period, and overdue
+FRESH, AGING, OLD, OVERDUE = range(4)
+
+# Default upper bounds (in days) of the password age buckets
+AGE_BUCKETS = (30, 90, 180, 365)
+
+
+def renewal_level(age_days, renewal_days):
+    """Renewal level of one password age (FRESH when renewal is off)."""
+    if age_days is None or not renewal_days or renewal_days <= 0:
+        return FRESH
+    if age_days > renewal_days:
+        return OVERDUE
+    if age_days > renewal_days * 2 / 3:
+        return OLD
+    if age_days > renewal_days / 3:
+        return AGING
+    return FRESH
+
+
+class MetadataColumns:
+    """Parallel int64 timestamp columns, one row per entry."""
+
+    def __init__(self):
+        self._ids = array("q")   # row -> account id
+        self._rows = {}          # account id -> row
+        self._columns = {name: array("q") for name in COLUMNS}
+        self._pending = None     # id -> entry, awaiting a deferred rebuild
+
+    def __len__(self):
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._ids)
+
+    # ------------------------------------------------------------------
+    # Index protocol
+    # ------------------------------------------------------------------
+    def rebuild(self, accounts):
+        """Discard everything; ``accounts`` are indexed when next needed."""
+        self._pending = {account.id: account for account in accounts}
+
+    def add(self, account):
+        """Index (or re-index) one entry."""
+        if self._pending is not None:
+            self._pending[account.id] = account
+            return
+        row = self._rows.get(account.id)
+        if row is None:
+            self._rows[account.id] = len(self._ids)
+            self._ids.append(account.id)
+            for name, column in self._columns.items():
+                column.append(_stored(getattr(account, name)))
+        else:
+            for name, column in self._columns.items():
+                column[row] = _stored(getattr(account, name))
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        if self._pending is not None:
+            self._pending.pop(account_id, None)
+            return
+        row = self._rows.pop(account_id, None)
+        if row is None:
+            return
+        # Move the last row into the hole
+        last_id = self._ids.pop()
+        columns = [(column, column.pop()) for column in self._columns.values()]
+        if last_id != account_id:
+            self._ids[row] = last_id
+            self._rows[last_id] = row
+            for column, value in columns:
+                column[row] = value
+
+    def _build(self):
+        if self._pending is None:
+            return
+        accounts, self._pending = list(self._pending.values()), None
+        self._ids = array("q", [account.id for account in accounts])
+        self._rows = {account_id: row for row, account_id in enumerate(self._ids)}
+        for name in COLUMNS:
+            self._columns[name] = array("q", [_stored(getattr(account, name)) for account in accounts])
+
+    # ------------------------------------------------------------------
+    # Whole-column passes
+    # ------------------------------------------------------------------
+    def password_ages(self, account_ids=None, renewal_days=0, now=None):
+        """
+        Password age and renewal level of many entries in one pass.
+
+        Args:
+            account_ids: entries to compute (None = every entry); unknown
+                         ids are left out
+            renewal_days: password renewal period (0 = renewal off)
+            now: current time in microseconds (default: now)
+
+        Returns:
+            dict: account id -> (age in days or None, renewal level)
+        """
+        self._build()
+        now = now_micros() if now is None else now
+        if account_ids is None:
+            rows = range(len(self._ids))
+        else:
+            rows = [self._rows[i] for i in account_ids if i in self._rows]
+        ids = self._ids
+        changed = self._columns["password_changed"]
+
+        if np is not None:
+            if account_ids is None:
+                rows = np.arange(len(rows), dtype=np.int64)
+            else:
+                rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+            ages, known = self._ages(changed, rows, now)
+            levels = np.zeros(len(rows), dtype=np.int64)
+            if renewal_days and renewal_days > 0:
+                levels += ages > renewal_days / 3
+                levels += ages > renewal_days * 2 / 3
+                levels += ages > renewal_days
+                levels[~known] = FRESH
+            age_list = ages.tolist()
+            for row in np.flatnonzero(~known).tolist():
+                age_list[row] = None
+            return dict(zip(_view(ids)[rows].tolist(), zip(age_list, levels.tolist())))
+
+        result = {}
+        for row in rows:
+            value = changed[row]
+            age = None if value == MISSING else (now - value) // DAY_MICROS
+            result[ids[row]] = (age, renewal_level(age, renewal_days))
+        return result
+
+    def due_ids(self, renewal_days, now=None):
+        """
+        Ids of the entries whose password is past the renewal period: an
+        age of more than ``renewal_days`` whole days, the OVERDUE level
+        of password_ages (and the is:due search filter).
+        """
+        if not renewal_days or renewal_days <= 0:
+            return []
+        self._build()
+        now = now_micros() if now is None else now
+        changed = self._columns["password_changed"]
+        if np is not None:
+            ages, known = self._ages(changed, None, now)
+            return _view(self._ids)[known & (ages > renewal_days)].tolist()
+        return [self._ids[row] for row, value in enumerate(changed)
+                if value != MISSING and (now - value) // DAY_MICROS > renewal_days]
+
+    def age_buckets(self, bounds=AGE_BUCKETS, now=None):
+        """
+        Count password ages per bucket.
+
+        Args:
+            bounds: ascending upper bounds in days, e.g. (30, 90) gives the
+                    buckets <30, 30-89 and >=90 days
+
+        Returns:
+            list: len(bounds) + 1 counts (entries without a date left out)
+        """
+        self._build()
+        now = now_micros() if now is None else now
+        changed = self._columns["password_changed"]
+        if np is not None:
+            ages, known = self._ages(changed, None, now)
+            slots = np.searchsorted(np.asarray(bounds), ages[known], side="right")
+            return np.bincount(slots, minlength=len(bounds) + 1).tolist()
+
+        from bisect import bisect_right
+        counts = [0] * (len(bounds) + 1)
+        for value in changed:
+            if value != MISSING:
+                counts[bisect_right(bounds, (now - value) // DAY_MICROS)] += 1
+        return counts
+
+    def sorted_ids(self, column, reverse=True):
+        """
+        Every id ordered by one timestamp column (newest first by
+        default), ties in id order and missing timestamps last.
+        """
+        self._build()
+        values = self._columns[column]
+        if np is not None:
+            keys = _view(values)
+            ids = _view(self._ids)
+            # lexsort sorts by the last key first
+            order = np.lexsort((ids, -keys if reverse else keys, keys == MISSING))
+            return ids[order].tolist()
+        rows = sorted(
+            range(len(values)),
+            key=lambda row: (values[row] == MISSING,
+                             -values[row] if reverse else values[row],
+                             self._ids[row]),
+        )
+        return [self._ids[row] for row in rows]
+
+    @staticmethod
+    def _ages(changed, rows, now):
+        """(age in days, has-a-date mask) as NumPy arrays."""
+        column = _view(changed)
+        if rows is not None:
+            column = column[rows]
+        known = column != MISSING
+        ages = np.where(known, (now - column) // DAY_MICROS, 0)
+        return ages, known
+
+
+def _stored(value):
+    return MISSING if value is None else value
+
+
+def _view(column):
+    """Zero-copy int64 NumPy view of an array("q") column."""
+    if not column:
+        return np.empty(0, dtype=np.int64)
+    return np.frombuffer(column, dtype=np.int64)
+
+
+# Quick test
+if __name__ == "__main__":
+    import time
+    from datetime import datetime, timedelta
+
+    from services.account_record import AccountRecord
+
+    today = datetime.now()
+    columns = MetadataColumns()
+    records = []
+    for i in range(100_000):
+        changed = (today - timedelta(days=i % 400)).isoformat()
+        records.append(AccountRecord.from_dict({
+            "id": i + 1, "created_date": changed, "last_modified": changed,
+            "last_password_change": changed, "last_copied": None,
+        }))
+    columns.rebuild(records)
+    columns._build()
+
+    def timed(label, run):
+        start = time.perf_counter()
+        result = run()
+        print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+        return result
+
+    print("pure Python" if np is None else "numpy")
+    ages = timed("password_ages", lambda: columns.password_ages(renewal_days=90))
+    print("entry 1:", ages[1], "entry 100:", ages[100], "entry 300:", ages[300])
+    print("buckets:", timed("age_buckets", columns.age_buckets))
+    print("due:", len(timed("due_ids", lambda: columns.due_ids(90))))
+    print("newest:", timed("sorted_ids", lambda: columns.sorted_ids("created"))[:3])
+    timed("per-entry datetime ages", lambda: [
+        (datetime.now() - datetime.fromisoformat(record["last_password_change"])).days
+        for record in records
+    ])
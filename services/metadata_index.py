@@ -0,0 +1,91 @@
+"""
+Per-entry metadata rows used to evaluate search filters.
+
+For every account the index keeps one tuple of the values filters look at,
+already normalised (casefolded text, website host, ISO timestamps), so a
+compiled filter (see query_filter.py) can test an entry with a few tuple
+lookups instead of re-parsing the entry's dict.
+
+AccountManager keeps it up to date through the same add()/discard() hooks
+as its other indexes. Like the search index, a rebuild is deferred until
+the rows are first needed.
+"""
+
+from urllib.parse import urlsplit
+
+
+# Row layout
+NAME, USERNAME, URL, HOST, CREATED, MODIFIED, PASSWORD_CHANGED, COPIED = range(8)
+
+
+def host_of(url):
+    """Return the lowercased host name of ``url`` ("" if there is none)."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = "//" + url  # bare "example.com/path"
+    try:
+        return (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:
+        return ""
+
+
+def make_row(account):
+    """Build the metadata row for one entry."""
+    url = account.get("website_url") or ""
+    return (
+        (account.get("account_name") or "").casefold(),
+        (account.get("username") or "").casefold(),
+        url.casefold(),
+        host_of(url),
+        account.get("created_date") or "",
+        account.get("last_modified") or "",
+        account.get("last_password_change") or "",
+        account.get("last_copied"),
+    )
+
+
+class MetadataIndex:
+    """Maps account id -> metadata row (see the row layout above)."""
+
+    def __init__(self):
+        self._rows = {}
+        self._pending = None  # id -> entry, awaiting a deferred rebuild
+
+    def __len__(self):
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._rows)
+
+    def rebuild(self, accounts):
+        """Discard everything; ``accounts`` are indexed when next needed."""
+        self._rows = {}
+        self._pending = {account["id"]: account for account in accounts}
+
+    def add(self, account):
+        """Index (or re-index) one entry."""
+        if self._pending is not None:
+            self._pending[account["id"]] = account
+            return
+        self._rows[account["id"]] = make_row(account)
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        if self._pending is not None:
+            self._pending.pop(account_id, None)
+            return
+        self._rows.pop(account_id, None)
+
+    @property
+    def rows(self):
+        """The id -> row mapping, building any deferred rows first."""
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            self._rows = {account_id: make_row(account) for account_id, account in pending.items()}
+        return self._rows
+
+    def filter(self, ids, predicate):
+        """Lazily yield the ids (in the given order) whose row matches."""
+        rows = self.rows
+        return (account_id for account_id in ids if predicate(rows[account_id]))
@@ -25,9 +25,17 @@ class PasswordAuditor:
 
     _BREACH_FILENAME = 'common_passwords.txt'
 
+    # Breach set shared by every auditor, loaded on first use
+    _breached_cache = None
+
     def __init__(self, breach_file: str | None = None):
         self.breached_passwords = self._load_breached_password()
 
+    @classmethod
+    def preload(cls) -> None:
+        """Load the breach list ahead of the first audit (e.g. at login)."""
+        cls._load_breached_password()
+
     # Main method to audit a password, returning a dictionary with the results
     def audit_password(self, password: str) -> dict:
         # Default report (minimums)
@@ -62,9 +70,12 @@ class PasswordAuditor:
         return report
 
     # Private method to load breached passwords txt file into a set for O(1) lookups
-    def _load_breached_password(self) -> set:
+    @classmethod
+    def _load_breached_password(cls) -> set:
+        if cls._breached_cache is not None:
+            return cls._breached_cache
         current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, '..', 'utils', self._BREACH_FILENAME)
+        file_path = os.path.join(current_dir, '..', 'utils', cls._BREACH_FILENAME)
         bad_passwords = set()
         try:
             if os.path.exists(file_path):
@@ -73,8 +84,12 @@ class PasswordAuditor:
                         bad_passwords.add(line.strip())
             else:
                 print(f"Warning: Breached passwords file not found at {file_path}.")
+                return bad_passwords
         except Exception as e:
             print(f"Error loading breached passwords: {e}")
+            return set()
+        # Only a successful load is kept; otherwise the next audit retries
+        cls._breached_cache = bad_passwords
         return bad_passwords
 
 
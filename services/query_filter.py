@@ -0,0 +1,265 @@
+"""
+Filter language for the main menu search box.
+
+A query is a mix of free-text terms (matched by the search index) and
+filters, e.g.
+
+    bank age>90 site:google.com user:*@work.com copied:<7d
+
+Filters:
+    age>90  age<30      password age; a bare number means days, and
+                        durations such as 2w, 6m or 1y are also accepted.
+                        "age:90" is short for age>90.
+    copied:<7d          last copied within 7 days ("copied:7d" is the same);
+    copied:>30d         copied more than 30 days ago, or never;
+    copied:never        never copied.
+    modified:<7d        last modified (same forms as copied).
+    created:<7d         created (same forms as copied).
+    site:google.com     website host is google.com or a subdomain of it;
+                        wildcards (* and ?) match the host instead.
+    user:*@work.com     username matches the wildcard pattern; without
+                        wildcards it matches anywhere in the username.
+    name:bank           account name, like user:.
+    is:due              password is older than the renewal period
+                        (the password_renewal_days setting).
+
+Prefix any filter with "-" to negate it, e.g. -site:google.com.
+Values containing spaces can be quoted: name:"my bank".
+
+Ages count whole days, as on the account cards: age>90 matches a
+password shown as 91 days old or more, and is:due is age>N for a renewal
+period of N days. Durations in hours (copied:<2h) compare exact times.
+
+compile_query() parses a query once into a CompiledQuery, turning every
+filter into a predicate over MetadataIndex rows. Relative times are
+resolved to ISO timestamp cutoffs at compile time, so evaluating a filter
+is a plain string comparison per entry.
+"""
+
+import math
+import re
+import shlex
+from datetime import datetime, timedelta
+from fnmatch import translate
+
+from services.metadata_index import (
+    COPIED,
+    CREATED,
+    HOST,
+    MODIFIED,
+    NAME,
+    PASSWORD_CHANGED,
+    USERNAME,
+    host_of,
+)
+
+
+class QueryError(ValueError):
+    """Raised for a filter that cannot be parsed."""
+
+
+# -key:op value, where op is one of < <= > >= or a bare ":"
+_FILTER_RE = re.compile(r"^(-?)([a-z]+)(:?)(<=|>=|<|>)?(.*)$", re.S)
+
+_UNITS = {"h": 1 / 24, "d": 1, "w": 7, "m": 30, "y": 365}
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([hdwmy]?)$")
+
+# Timestamp filters: key -> (row column, op implied by a bare ":")
+_TIME_FILTERS = {
+    "age": (PASSWORD_CHANGED, ">"),
+    "copied": (COPIED, "<"),
+    "modified": (MODIFIED, "<"),
+    "created": (CREATED, "<"),
+}
+
+# Text filters: key -> row column
+_TEXT_FILTERS = {"user": USERNAME, "name": NAME}
+
+
+class CompiledQuery:
+    """A parsed query: free text for the search index plus a row predicate."""
+
+    def __init__(self, text, predicate=None):
+        self.text = text
+        # Callable(row) -> bool, or None when the query has no filters
+        self.predicate = predicate
+
+    def __bool__(self):
+        return bool(self.text) or self.predicate is not None
+
+
+def compile_query(query, renewal_days=None, now=None):
+    """
+    Parse a search box query.
+
+    Args:
+        query: the query text
+        renewal_days: password renewal period for is:due (0 = off; None =
+                      not known, and is:due raises QueryError)
+        now: reference time for relative filters (defaults to now)
+
+    Returns:
+        CompiledQuery
+
+    Raises:
+        QueryError: a filter's value could not be parsed
+    """
+    now = now or datetime.now()
+    try:
+        tokens = shlex.split(query)
+    except ValueError:
+        tokens = query.split()  # unbalanced quote while typing
+
+    words = []
+    predicates = []
+    for token in tokens:
+        compiled = _compile_filter(token, renewal_days, now)
+        if compiled is None:
+            words.append(token)
+        else:
+            predicates.append(compiled)
+
+    if not predicates:
+        return CompiledQuery(" ".join(words))
+    # Cheapest checks first, so the costly ones see fewer rows
+    predicates.sort(key=lambda compiled: compiled[0])
+    return CompiledQuery(" ".join(words), _all_of([p for _, p in predicates]))
+
+
+def _all_of(predicates):
+    """Combine predicates into one that short-circuits left to right."""
+    if len(predicates) == 1:
+        return predicates[0]
+    first, rest = predicates[0], _all_of(predicates[1:])
+    return lambda row: first(row) and rest(row)
+
+
+def _compile_filter(token, renewal_days, now):
+    """
+    Compile one ``key:value`` token.
+
+    Returns:
+        (cost, predicate), or None if the token is plain text
+    """
+    match = _FILTER_RE.match(token)
+    if match is None:
+        return None
+    negate, key, colon, op, value = match.groups()
+    if not (colon or op):
+        return None
+
+    if key in _TIME_FILTERS:
+        column, default_op = _TIME_FILTERS[key]
+        predicate = _time_filter(column, op or default_op, value, now)
+    elif key == "is" and colon and not op:
+        predicate = _is_filter(value, renewal_days, now)
+    elif key in _TEXT_FILTERS and colon and not op:
+        predicate = _text_filter(_TEXT_FILTERS[key], value)
+    elif key in ("site", "url") and colon and not op:
+        predicate = _site_filter(value)
+    else:
+        return None  # not a filter we know; search for it as text
+
+    # Timestamp comparisons are cheapest, wildcard patterns dearest
+    if key in _TIME_FILTERS or key == "is":
+        cost = 0
+    else:
+        cost = 2 if ("*" in value or "?" in value) else 1
+
+    if negate:
+        return cost, lambda row: not predicate(row)
+    return cost, predicate
+
+
+def _parse_duration(value):
+    """Return (days, whether the age is counted in whole days)."""
+    match = _DURATION_RE.match(value.strip().lower())
+    if match is None:
+        raise QueryError(f"Expected a number of days or a duration like 7d, 2w, 6m: '{value}'")
+    amount, unit = match.groups()
+    return float(amount) * _UNITS[unit or "d"], unit != "h"
+
+
+def _time_filter(column, op, value, now):
+    if value.strip().lower() == "never":
+        if column != COPIED:
+            raise QueryError("Only copied: accepts 'never'.")
+        return lambda row: row[column] is None
+    days, whole_days = _parse_duration(value)
+    return _age_filter(column, op, days, whole_days, now)
+
+
+def _age_filter(column, op, days, whole_days, now):
+    """Predicate comparing the age of a timestamp column with ``days``."""
+    # "older than" for > and <= (its negation), "at least as old" for >=
+    # and <
+    strict = op in (">", "<=")
+    if whole_days:
+        # An age of N whole days is more than N (>) once it reaches
+        # N + 1 days, and at least N (>=) once it reaches N days
+        days = math.floor(days) + 1 if strict else math.ceil(days)
+        strict = False
+    cutoff = (now - timedelta(days=days)).isoformat()
+
+    # ISO timestamps compare correctly as strings; entries with no
+    # timestamp (never copied) count as infinitely old
+    if strict:
+        older = lambda row: row[column] is None or row[column] < cutoff
+    else:
+        older = lambda row: row[column] is None or row[column] <= cutoff
+    if op in (">", ">="):
+        return older
+    return lambda row: not older(row)
+
+
+def _text_filter(column, value):
+    pattern = value.casefold()
+    if not pattern:
+        raise QueryError("Filter value cannot be empty.")
+    if "*" in pattern or "?" in pattern:
+        match = re.compile(translate(pattern)).match
+        return lambda row: match(row[column]) is not None
+    return lambda row: pattern in row[column]
+
+
+def _site_filter(value):
+    domain = value.strip().casefold().rstrip(".")
+    if "://" in domain or "/" in domain:
+        domain = host_of(domain)
+    if not domain:
+        raise QueryError("site: needs a domain, e.g. site:google.com")
+    if "*" in domain or "?" in domain:
+        match = re.compile(translate(domain)).match
+        return lambda row: match(row[HOST]) is not None
+    suffix = "." + domain
+    return lambda row: row[HOST] == domain or row[HOST].endswith(suffix)
+
+
+def _is_filter(value, renewal_days, now):
+    value = value.strip().lower()
+    if value == "due":
+        if renewal_days is None:
+            raise QueryError("is:due needs the password renewal period.")
+        if renewal_days <= 0:
+            return lambda row: False  # renewal reminders are off
+        # Same test as the cards' overdue badge; no date is never due
+        overdue = _age_filter(PASSWORD_CHANGED, ">", renewal_days, True, now)
+        return lambda row: row[PASSWORD_CHANGED] is not None and overdue(row)
+    raise QueryError(f"Unknown filter is:{value} (try is:due).")
+
+
+# Quick test
+if __name__ == "__main__":
+    from services.metadata_index import make_row
+
+    sample = make_row({
+        "account_name": "Google", "username": "me@work.com",
+        "website_url": "https://accounts.google.com/login",
+        "created_date": "2020-01-01T00:00:00",
+        "last_modified": "2020-01-01T00:00:00",
+        "last_password_change": "2020-01-01T00:00:00",
+        "last_copied": None,
+    })
+    for text in ("age>90", "site:google.com", "user:*@work.com", "copied:<7d", "-copied:never"):
+        q = compile_query(text)
+        print(f"{text!r}: {q.predicate(sample)}")
@@ -0,0 +1,144 @@
+"""
+In-memory full-text search index over vault entries.
+
+Indexes account_name, username, website_url and (optionally) notes. Every
+trigram of the case-folded text maps to the set of account ids containing
+it; queries intersect those sets, smallest first, and then confirm the
+candidates with a plain substring check. Queries shorter than three
+characters fall back to a word-prefix map.
+
+AccountManager keeps one of these up to date incrementally: add() and
+discard() touch only the grams of the entry being changed. A rebuild is
+deferred until the first search, so loading a vault that is never
+searched costs nothing here.
+"""
+
+import re
+
+
+_DEFAULT_FIELDS = ("account_name", "username", "website_url")
+
+# Longest word prefix kept for short (1-2 character) queries
+_MAX_PREFIX = 2
+
+_WORD_SPLIT = re.compile(r"[\W_]+")
+
+# Below this many candidates, further terms are checked by substring scan
+_SCAN_LIMIT = 256
+
+
+class SearchIndex:
+    """Trigram + short-prefix index mapping search text to account ids."""
+
+    def __init__(self, include_notes=False):
+        self.fields = _DEFAULT_FIELDS + (("notes",) if include_notes else ())
+        self._grams = {}      # trigram -> set of ids
+        self._prefixes = {}   # 1-2 character word prefix -> set of ids
+        self._docs = {}       # id -> (folded text, grams, prefixes)
+        self._pending = None  # id -> entry, awaiting a deferred rebuild
+
+    def __len__(self):
+        if self._pending is not None:
+            return len(self._pending)
+        return len(self._docs)
+
+    def rebuild(self, accounts):
+        """Discard everything; ``accounts`` are indexed on the next search."""
+        self._grams.clear()
+        self._prefixes.clear()
+        self._docs.clear()
+        self._pending = {account["id"]: account for account in accounts}
+
+    def _build_pending(self):
+        pending, self._pending = self._pending, None
+        for account in pending.values():
+            self.add(account)
+
+    def add(self, account):
+        """Index (or re-index) one entry."""
+        account_id = account["id"]
+        if self._pending is not None:
+            self._pending[account_id] = account
+            return
+        if account_id in self._docs:
+            self.discard(account_id)
+
+        # Fields are joined with a separator no query can contain, so a
+        # match never spans two fields
+        text = "\n".join(str(account.get(f) or "") for f in self.fields).casefold()
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        grams = {g for g in grams if "\n" not in g}
+        prefixes = set()
+        for word in _WORD_SPLIT.split(text):
+            for n in range(1, min(len(word), _MAX_PREFIX) + 1):
+                prefixes.add(word[:n])
+
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(account_id)
+        for prefix in prefixes:
+            self._prefixes.setdefault(prefix, set()).add(account_id)
+        self._docs[account_id] = (text, grams, prefixes)
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        if self._pending is not None:
+            self._pending.pop(account_id, None)
+            return
+        doc = self._docs.pop(account_id, None)
+        if doc is None:
+            return
+        _, grams, prefixes = doc
+        for table, keys in ((self._grams, grams), (self._prefixes, prefixes)):
+            for key in keys:
+                ids = table.get(key)
+                if ids is not None:
+                    ids.discard(account_id)
+                    if not ids:
+                        del table[key]
+
+    def search(self, query):
+        """
+        Return the set of ids matching every whitespace-separated term.
+
+        Terms of three or more characters match anywhere in a field; shorter
+        terms match the start of a word.
+        """
+        if self._pending is not None:
+            self._build_pending()
+        terms = query.casefold().split()
+        if not terms:
+            return set(self._docs)
+
+        # Longest terms first: they are usually the most selective
+        terms.sort(key=len, reverse=True)
+        result = self._search_term(terms[0])
+        docs = self._docs
+        for term in terms[1:]:
+            if not result:
+                break
+            if len(term) >= 3 and len(result) < _SCAN_LIMIT:
+                # Few candidates left: checking them directly is cheaper
+                # than building the term's (possibly huge) posting set
+                result = {i for i in result if term in docs[i][0]}
+            else:
+                result &= self._search_term(term)
+        return result
+
+    def _search_term(self, term):
+        if len(term) < 3:
+            return set(self._prefixes.get(term, ()))
+
+        postings = []
+        for i in range(len(term) - 2):
+            ids = self._grams.get(term[i:i + 3])
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+        if len(term) == 3:
+            return candidates
+        # Trigrams can all appear without the whole term; confirm
+        docs = self._docs
+        return {i for i in candidates if term in docs[i][0]}
@@ -0,0 +1,163 @@
+"""
+Bounded cache of decrypted secret fields for AccountManager.get_secret.
+
+Secrets stay encrypted until revealed or copied. Repeating those actions
+on the same entry is common (reveal, then copy; copy the password again a
+minute later), so the most recently decrypted entries are kept for a
+short while:
+
+- LRU eviction once there are more than max_entries entries or more than
+  max_bytes of plaintext
+- a TTL counted from when the entry was decrypted (the main menu uses the
+  clipboard auto-clear time, so a copied password leaves the cache about
+  when it leaves the clipboard)
+- each entry is kept together with the secret token it was decrypted from,
+  so an edited entry (new token) is never served stale
+
+Plaintext is held in bytearrays that are overwritten with zeros when an
+entry is evicted, expires, is replaced or the cache is cleared. Values
+handed out by get() are ordinary Python strings, which cannot be wiped;
+the cache only controls its own copy.
+
+Counters (hits, misses, evictions, expirations) are exposed by stats().
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 16 * 1024
+DEFAULT_TTL = 60
+
+
+def _wipe(buffer):
+    buffer[:] = b"\0" * len(buffer)
+
+
+class SecretCache:
+    """LRU + TTL cache of decrypted secret payloads, keyed by account id."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl=DEFAULT_TTL, clock=time.monotonic):
+        """
+        Args:
+            max_entries: most entries kept at once (0 disables the cache)
+            max_bytes: most plaintext bytes kept at once
+            ttl: seconds an entry is kept after being decrypted (0 disables)
+            clock: time source, monotonic seconds
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # account id -> (secret token, plaintext bytearray, expiry time);
+        # least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl > 0
+
+    def set_ttl(self, ttl):
+        """Change the TTL for new entries; 0 disables the cache and wipes it."""
+        self.ttl = ttl
+        if not self.enabled:
+            self.clear()
+
+    def get(self, account_id, token):
+        """
+        Return the cached secrets dict for ``account_id`` if it was
+        decrypted from ``token`` and has not expired, else None.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(account_id)
+        if entry is not None:
+            cached_token, plaintext, expires = entry
+            if self._clock() >= expires:
+                self._drop(account_id)
+                self.expirations += 1
+            elif cached_token != token:
+                self._drop(account_id)  # the entry was edited since
+            else:
+                self._entries.move_to_end(account_id)
+                self.hits += 1
+                return json.loads(plaintext)
+        self.misses += 1
+        return None
+
+    def put(self, account_id, token, plaintext):
+        """Keep the decrypted ``plaintext`` (bytes) of ``token``."""
+        if not self.enabled or len(plaintext) > self.max_bytes:
+            return
+        self._drop(account_id)
+        self._entries[account_id] = (token, bytearray(plaintext), self._clock() + self.ttl)
+        self._bytes += len(plaintext)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def purge_expired(self):
+        """Wipe every expired entry; returns how many there were."""
+        now = self._clock()
+        expired = [account_id for account_id, (_, _, expires) in self._entries.items()
+                   if now >= expires]
+        for account_id in expired:
+            self._drop(account_id)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def next_expiry(self):
+        """Seconds until the next entry expires, or None if the cache is empty."""
+        if not self._entries:
+            return None
+        soonest = min(expires for _, _, expires in self._entries.values())
+        return max(0.0, soonest - self._clock())
+
+    def clear(self):
+        """Wipe every entry (e.g. when the vault is locked)."""
+        for account_id in list(self._entries):
+            self._drop(account_id)
+
+    def _drop(self, account_id):
+        entry = self._entries.pop(account_id, None)
+        if entry is not None:
+            _wipe(entry[1])
+            self._bytes -= len(entry[1])
+
+    def stats(self):
+        """Counters for tuning the budgets and TTL."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Quick test
+if __name__ == "__main__":
+    now = [0.0]
+    cache = SecretCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put(1, b"t1", b'{"password":"a","notes":""}')
+    cache.put(2, b"t2", b'{"password":"b","notes":""}')
+    print(cache.get(1, b"t1"))
+    cache.put(3, b"t3", b'{"password":"c","notes":""}')  # evicts 2
+    print(cache.get(2, b"t2"), cache.get(1, b"other token"))
+    now[0] = 11
+    print(cache.purge_expired(), cache.stats())
@@ -0,0 +1,129 @@
+"""
+Session PIN for unlocking a locked main menu without the master password.
+
+When the main menu locks (auto-lock or the Lock button), the vault key is
+dropped (see AccountManager.lock). If the user chose a session PIN, the
+key and the master password (which the settings window needs) are first
+wrapped under a key derived from the PIN, so typing the PIN brings them
+back without the master password.
+
+The wrapped copy only ever lives in memory and is gone on logout. A PIN
+is short, so after MAX_ATTEMPTS wrong tries the wrapped copy is thrown
+away and the master password is needed again.
+"""
+
+import base64
+import hashlib
+import json
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+
+
+PIN_MIN_LENGTH = 4
+PIN_MAX_LENGTH = 12
+
+# Wrong PINs allowed before the wrapped key is discarded
+MAX_ATTEMPTS = 5
+
+# PBKDF2-HMAC-SHA256 rounds for the PIN key (about 0.1 s)
+_PBKDF2_ROUNDS = 100_000
+
+
+def validate_pin(pin):
+    """
+    Check a new session PIN.
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    if not pin.isdigit():
+        return False, "The PIN must contain digits only."
+    if not PIN_MIN_LENGTH <= len(pin) <= PIN_MAX_LENGTH:
+        return False, f"The PIN must be {PIN_MIN_LENGTH}-{PIN_MAX_LENGTH} digits long."
+    return True, "PIN is valid."
+
+
+class SessionPin:
+    """The vault key and master password, wrapped under a session PIN."""
+
+    def __init__(self):
+        self._salt = None
+        self._wrapped = None
+        self.failed_attempts = 0
+
+    @property
+    def is_set(self):
+        return self._wrapped is not None
+
+    def _pin_cipher(self, pin):
+        raw = hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), self._salt, _PBKDF2_ROUNDS)
+        return Fernet(base64.urlsafe_b64encode(raw))
+
+    def set(self, pin, vault_key, master_password):
+        """
+        Wrap ``vault_key`` and ``master_password`` under ``pin``.
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        ok, message = validate_pin(pin)
+        if not ok:
+            return False, message
+        self._salt = os.urandom(16)
+        payload = json.dumps({
+            "key": vault_key.decode("ascii"),
+            "master_password": master_password,
+        }).encode("utf-8")
+        self._wrapped = self._pin_cipher(pin).encrypt(payload)
+        self.failed_attempts = 0
+        return True, "Session PIN set."
+
+    def unwrap(self, pin):
+        """
+        Return (vault_key, master_password) if ``pin`` is right, else None.
+
+        Wrong PINs are not counted here; call record_failure() once an
+        unlock attempt has failed altogether.
+        """
+        if not self.is_set or not pin.isdigit():
+            return None
+        try:
+            payload = json.loads(self._pin_cipher(pin).decrypt(self._wrapped))
+        except InvalidToken:
+            return None
+        self.failed_attempts = 0
+        return payload["key"].encode("ascii"), payload["master_password"]
+
+    def record_failure(self):
+        """
+        Count a failed unlock; discards the PIN after MAX_ATTEMPTS.
+
+        Returns:
+            int: PIN attempts left (0 once the PIN has been discarded)
+        """
+        if not self.is_set:
+            return 0
+        self.failed_attempts += 1
+        remaining = MAX_ATTEMPTS - self.failed_attempts
+        if remaining <= 0:
+            self.clear()
+            return 0
+        return remaining
+
+    def clear(self):
+        """Forget the PIN and the wrapped key."""
+        self._salt = None
+        self._wrapped = None
+        self.failed_attempts = 0
+
+
+# Quick test
+if __name__ == "__main__":
+    from services.vault_file import derive_key
+
+    pin = SessionPin()
+    print(pin.set("12", derive_key("pw"), "pw"))
+    print(pin.set("4821", derive_key("pw"), "pw"))
+    print("wrong:", pin.unwrap("0000"), "left:", pin.record_failure())
+    print("right:", pin.unwrap("4821"))
@@ -9,8 +9,6 @@ settings UI exposes (change master password, export vault, import vault).
 
 import json
 import os
-import shutil
-import tempfile
 import zipfile
 from datetime import datetime
 
@@ -29,8 +27,10 @@ DEFAULT_SETTINGS = {
     # Password strength enforcement on account creation: "off" | "low" | "strong"
     "password_strength_requirement": "off",
     # How the main menu sorts account cards
-    # "alphabetical" | "date_created" | "date_modified" | "last_copied"
+    # "alphabetical" | "date_created" | "date_modified" | "last_copied" | "most_used"
     "account_sort_by": "alphabetical",
+    # Where the vault is stored: "json" (vault file) | "sqlite" (database)
+    "vault_storage": "json",
 }
 
 AUTO_LOGOUT_OPTIONS = {
@@ -64,9 +64,33 @@ SORT_BY_OPTIONS = {
     "Date Created": "date_created",
     "Date Modified": "date_modified",
     "Last Copied": "last_copied",
+    "Most Used": "most_used",
 }
 
 
+VAULT_STORAGE_OPTIONS = {
+    "JSON file": "json",
+    "SQLite database": "sqlite",
+}
+
+
+def read_vault_storage(username: str) -> str:
+    """
+    Return ``username``'s vault storage setting without creating a
+    settings file (unlike SettingsManager); the default when there is none.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                        "user_data", f"settings_{username}.json")
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    return str(data.get("vault_storage", DEFAULT_SETTINGS["vault_storage"]))
+
+
 class SettingsManager:
     """
     Manage per-user settings and vault-level operations driven by the
@@ -164,6 +188,9 @@ class SettingsManager:
     def get_account_sort_by(self) -> str:
         return str(self.settings.get("account_sort_by", DEFAULT_SETTINGS["account_sort_by"]))
 
+    def get_vault_storage(self) -> str:
+        return str(self.settings.get("vault_storage", DEFAULT_SETTINGS["vault_storage"]))
+
     # ------------------------------------------------------------------
     # Master password change
     # ------------------------------------------------------------------
@@ -199,7 +226,8 @@ class SettingsManager:
 
         # Load the decrypted vault with the old key
         try:
-            old_am = AccountManager(self.username, old_password)
+            old_am = AccountManager(self.username, old_password,
+                                    storage=self.get_vault_storage())
             accounts = old_am._load_vault()
         except Exception as e:
             return False, f"Failed to decrypt current vault: {e}"
@@ -214,14 +242,78 @@ class SettingsManager:
 
         # Re-encrypt the vault with the new key
         try:
-            new_am = AccountManager(self.username, new_password)
-            if not new_am._save_vault(accounts):
+            if not old_am.rekey(new_password, accounts):
                 return False, "Failed to re-encrypt vault with new password."
         except Exception as e:
             return False, f"Failed to re-encrypt vault: {e}"
 
         return True, "Master password changed successfully."
 
+    # ------------------------------------------------------------------
+    # Vault storage backend
+    # ------------------------------------------------------------------
+    def change_vault_storage(self, master_password: str, storage: str):
+        """
+        Migrate the vault to another storage backend and remember the choice.
+
+        The old store is left on disk as a backup; migrating back later
+        overwrites it with the current contents. The setting only changes
+        once the whole vault was read (nothing is migrated from a vault
+        that cannot be decrypted) and read back from the new store.
+
+        Args:
+            master_password: current user's master password.
+            storage: "json" or "sqlite".
+
+        Returns:
+            (success: bool, message: str)
+        """
+        from services.account import AccountManager
+
+        current = self.get_vault_storage()
+        if storage not in VAULT_STORAGE_OPTIONS.values():
+            return False, f"Unknown vault storage: {storage}"
+        if storage == current:
+            return True, "Vault storage unchanged."
+
+        from services import vault_file
+
+        try:
+            source = AccountManager(self.username, master_password, storage=current)
+            if (current == "json"
+                    and vault_file.verify_key(source.vault_file, source.encryption_key) is False):
+                return False, "Master password does not match the vault; nothing was migrated."
+            # Strict: an unreadable vault must not be migrated as an empty one
+            source._load_vault(strict=True)
+            accounts = source.get_all_accounts()
+            if storage == "sqlite":
+                # A database left over from an earlier migration may be
+                # stale or under an old key; start from a fresh one
+                db_path = os.path.splitext(self._vault_path(self.username))[0] + ".db"
+                for path in (db_path, db_path + "-wal", db_path + "-shm"):
+                    if os.path.exists(path):
+                        os.remove(path)
+            target = AccountManager(self.username, master_password, storage=storage)
+            ok = target._save_vault(accounts)
+            if ok:
+                # Read the new store back before switching to it
+                check = AccountManager(self.username, master_password, storage=storage)
+                migrated = len(check._load_vault(strict=True))
+        except Exception as e:
+            return False, f"Failed to migrate vault: {e}"
+        if not ok:
+            return False, "Failed to write migrated vault."
+        if migrated != len(accounts):
+            return False, (
+                f"Migrated vault holds {migrated} of {len(accounts)} accounts; "
+                f"staying on {current} storage."
+            )
+
+        self.set("vault_storage", storage)
+        if not self.save():
+            return False, "Vault migrated, but the setting could not be saved."
+        return True, f"Vault moved to {storage} storage ({len(accounts)} accounts)."
+
     # ------------------------------------------------------------------
     # Export / Import vault
     # ------------------------------------------------------------------
@@ -238,6 +330,10 @@ class SettingsManager:
         Bundle the user's (already-encrypted) vault file plus a small
         manifest into a zip in the user's Downloads directory.
 
+        The vault is never decrypted here: the master password is checked
+        against the key-check value in the vault header, and the existing
+        ciphertext is streamed into the zip as-is.
+
         Args:
             master_password: verifies the user can actually decrypt the
                              vault before we export anything.
@@ -246,18 +342,33 @@ class SettingsManager:
         Returns:
             (success: bool, message_or_path: str)
         """
-        from services.account import AccountManager
-
-        # Sanity check: ensure the password decrypts the vault
-        try:
-            am = AccountManager(self.username, master_password)
-            _ = am._load_vault()
-        except Exception as e:
-            return False, f"Cannot decrypt vault with provided password: {e}"
+        from services import vault_file
 
         vault_path = self._vault_path(self.username)
-        if not os.path.exists(vault_path):
-            return False, "No vault file to export."
+        vault_data = None
+        if self.get_vault_storage() == "sqlite":
+            # Convert the database to the portable vault file format
+            from services.account import AccountManager
+            try:
+                am = AccountManager(self.username, master_password, storage="sqlite")
+                vault_data = am.export_vault_bytes()
+            except vault_file.VaultKeyError:
+                return False, "Cannot decrypt vault with provided password."
+            except Exception as e:
+                return False, f"Failed to read vault database: {e}"
+        else:
+            if not os.path.exists(vault_path):
+                return False, "No vault file to export."
+
+            # Sanity check: ensure the password matches the vault key
+            verified = vault_file.verify_key(
+                vault_path, vault_file.derive_key(master_password)
+            )
+            if verified is None:
+                # Legacy vault without a header - fall back to a trial decrypt
+                verified = self._decrypt_vault_file(vault_path, master_password) is not None
+            if not verified:
+                return False, "Cannot decrypt vault with provided password."
 
         out_dir = destination or self._downloads_dir()
         os.makedirs(out_dir, exist_ok=True)
@@ -275,7 +386,11 @@ class SettingsManager:
 
         try:
             with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                zf.write(vault_path, arcname=f"vault_{self.username}.json")
+                arcname = f"vault_{self.username}.json"
+                if vault_data is None:
+                    zf.write(vault_path, arcname=arcname)
+                else:
+                    zf.writestr(arcname, vault_data)
                 zf.writestr("manifest.json", json.dumps(manifest, indent=2))
         except Exception as e:
             return False, f"Failed to write export zip: {e}"
@@ -287,6 +402,11 @@ class SettingsManager:
         """
         Import an exported BlueVault zip into the current user's vault.
 
+        The vault entry is streamed straight out of the zip and decrypted
+        one account at a time; nothing is extracted to disk. Entries are
+        merged against the current vault in memory and the result is
+        written back with a single atomic save.
+
         Args:
             zip_path: path to the exported .zip
             master_password: current user's master password (must match
@@ -298,14 +418,26 @@ class SettingsManager:
         Returns:
             (success: bool, message: str)
         """
+        from cryptography.fernet import InvalidToken
         from services.account import AccountManager
+        from services import vault_file
 
         if mode not in ("override", "append"):
             return False, f"Unknown import mode: {mode}"
         if not os.path.isfile(zip_path):
             return False, "Import file not found."
 
-        # Extract zip contents to a temp directory
+        try:
+            current_am = AccountManager(self.username, master_password,
+                                        storage=self.get_vault_storage())
+        except vault_file.VaultKeyError:
+            return False, "Master password does not match the current vault."
+        except Exception as e:
+            return False, f"Import failed: {e}"
+        if (current_am.storage == "json" and vault_file.verify_key(
+                current_am.vault_file, current_am.encryption_key) is False):
+            return False, "Master password does not match the current vault."
+
         try:
             with zipfile.ZipFile(zip_path, "r") as zf:
                 names = zf.namelist()
@@ -329,103 +461,154 @@ class SettingsManager:
                         f"in as '{self.username}'."
                     )
 
-                # Extract vault file to temp
-                tmpdir = tempfile.mkdtemp(prefix="bluevault_import_")
-                try:
-                    zf.extract(expected_vault_name, tmpdir)
-                    extracted_path = os.path.join(tmpdir, expected_vault_name)
-
-                    # Try to decrypt with current master password.
-                    # We temporarily swap in the extracted vault by pointing
-                    # a new AccountManager at it, then reading its contents.
-                    imported_accounts = self._decrypt_vault_file(
-                        extracted_path, master_password
+                # Decrypt entries incrementally, straight out of the zip,
+                # with the current master password's key.
+                with zf.open(expected_vault_name) as vf:
+                    imported = vault_file.iter_entries(
+                        vf, current_am.cipher, current_am.encryption_key
                     )
-                    if imported_accounts is None:
-                        return False, (
-                            "Could not decrypt imported vault. The master "
-                            "password on this device does not match the "
-                            "password used when the vault was exported."
-                        )
-                finally:
-                    shutil.rmtree(tmpdir, ignore_errors=True)
+                    if mode == "override":
+                        merged, count = self._override_accounts(imported)
+                    else:
+                        current = current_am._load_vault()
+                        merged, count = self._append_accounts(current, imported)
+        except (vault_file.VaultKeyError, InvalidToken):
+            return False, (
+                "Could not decrypt imported vault. The master "
+                "password on this device does not match the "
+                "password used when the vault was exported."
+            )
         except zipfile.BadZipFile:
             return False, "Import file is not a valid zip."
         except Exception as e:
             return False, f"Failed to read import file: {e}"
 
-        # Now merge / override into the current user's vault
+        # Single atomic write of the merged / replaced vault
         try:
-            current_am = AccountManager(self.username, master_password)
-            current = current_am._load_vault()
-
-            if mode == "override":
-                new_vault = list(imported_accounts)
-                # Re-number ids cleanly
-                for i, acc in enumerate(new_vault, start=1):
-                    acc["id"] = i
-                merged_count = len(new_vault)
-                ok = current_am._save_vault(new_vault)
-                if not ok:
-                    return False, "Failed to write imported vault."
-                return True, f"Override complete. Replaced vault with {merged_count} accounts."
-
-            # Append mode - only add accounts whose (account_name, username)
-            # are not already present in the current vault.
-            existing_keys = {
-                (acc.get("account_name", "").lower(),
-                 acc.get("username", "").lower())
-                for acc in current
-            }
-            next_id = max((acc.get("id", 0) for acc in current), default=0) + 1
-
-            added = 0
-            for acc in imported_accounts:
-                key = (acc.get("account_name", "").lower(),
-                       acc.get("username", "").lower())
-                if key in existing_keys:
-                    continue
-                new_acc = dict(acc)
-                new_acc["id"] = next_id
-                next_id += 1
-                # Ensure last_copied key exists
-                new_acc.setdefault("last_copied", None)
-                current.append(new_acc)
-                existing_keys.add(key)
-                added += 1
-
-            ok = current_am._save_vault(current)
-            if not ok:
-                return False, "Failed to write merged vault."
-            return True, f"Append complete. Added {added} new account(s)."
+            if not current_am._save_vault(merged):
+                return False, "Failed to write imported vault."
         except Exception as e:
             return False, f"Import failed: {e}"
 
+        if mode == "override":
+            return True, f"Override complete. Replaced vault with {count} accounts."
+        return True, f"Append complete. Added {count} new account(s)."
+
     @staticmethod
-    def _decrypt_vault_file(vault_file_path: str, master_password: str):
-        """Attempt to decrypt an exported vault file; return list or None."""
-        import base64
-        import hashlib
-        from cryptography.fernet import Fernet, InvalidToken
+    def _override_accounts(imported):
+        """Build a replacement vault from imported entries, re-numbering ids."""
+        new_vault = []
+        for i, acc in enumerate(imported, start=1):
+            acc["id"] = i
+            acc.setdefault("last_copied", None)
+            new_vault.append(acc)
+        return new_vault, len(new_vault)
+
+    @staticmethod
+    def _append_accounts(current, imported):
+        """
+        Merge imported entries into ``current``, skipping any whose
+        (account_name, username) key is already present.
+
+        Returns:
+            (merged accounts, number added)
+        """
+        from services.account import account_key
+
+        existing_keys = {account_key(acc) for acc in current}
+        next_id = max((acc.get("id", 0) for acc in current), default=0) + 1
+
+        added = 0
+        for acc in imported:
+            key = account_key(acc)
+            if key in existing_keys:
+                continue
+            acc["id"] = next_id
+            next_id += 1
+            # Ensure last_copied key exists
+            acc.setdefault("last_copied", None)
+            current.append(acc)
+            existing_keys.add(key)
+            added += 1
+        return current, added
+
+    def import_external(self, file_path: str, master_password: str,
+                        fmt: str = "auto", progress=None):
+        """
+        Import a third-party password export (Bitwarden, KeePass, Chrome)
+        into the current user's vault.
+
+        Rows are parsed lazily and appended in a single transaction.
+        Entries whose (account_name, username) already exist are skipped,
+        exactly like import_vault's append mode.
+
+        Args:
+            file_path: path to the exported .csv / .json file
+            master_password: current user's master password
+            fmt: an importers format key, or "auto" to detect it
+            progress: optional callable(bytes_read, total_bytes)
+
+        Returns:
+            (success: bool, message: str)
+        """
+        import csv
+        from services import importers, vault_file
+        from services.account import AccountManager, TransactionError, account_key
+
+        if not os.path.isfile(file_path):
+            return False, "Import file not found."
 
         try:
-            with open(vault_file_path, "r") as f:
-                encrypted = f.read()
-        except OSError:
-            return None
+            am = AccountManager(self.username, master_password,
+                                storage=self.get_vault_storage())
+        except vault_file.VaultKeyError:
+            return False, "Master password does not match the current vault."
+        except Exception as e:
+            return False, f"Import failed: {e}"
+        if (am.storage == "json" and vault_file.verify_key(
+                am.vault_file, am.encryption_key) is False):
+            return False, "Master password does not match the current vault."
 
-        if not encrypted:
-            return []
+        try:
+            with am.transaction():
+                existing_keys = {account_key(acc) for acc in am._load_vault()}
+                new_entries = []
+                skipped = 0
+                for entry in importers.iter_file(file_path, fmt, progress):
+                    key = account_key(entry)
+                    if key in existing_keys:
+                        skipped += 1
+                        continue
+                    existing_keys.add(key)
+                    new_entries.append(entry)
+                am.create_accounts(new_entries)
+        except importers.ImportFormatError as e:
+            return False, str(e)
+        except TransactionError as e:
+            return False, f"Failed to write imported accounts: {e}"
+        except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+            return False, f"Failed to read import file: {e}"
 
-        key = base64.urlsafe_b64encode(
-            hashlib.sha256(master_password.encode("utf-8")).digest()
+        return True, (
+            f"Import complete. Added {len(new_entries)} new account(s), "
+            f"skipped {skipped} duplicate(s)."
         )
+
+    @staticmethod
+    def _decrypt_vault_file(vault_file_path: str, master_password: str):
+        """Attempt to decrypt an exported vault file; return list or None."""
+        from cryptography.fernet import Fernet, InvalidToken
+        from services import vault_file
+
+        key = vault_file.derive_key(master_password)
         cipher = Fernet(key)
 
         try:
-            decrypted = cipher.decrypt(encrypted.encode())
-            return json.loads(decrypted.decode())
-        except (InvalidToken, ValueError, json.JSONDecodeError):
+            with open(vault_file_path, "rb") as f:
+                return list(vault_file.iter_entries(f, cipher, key))
+        except OSError:
+            return None
+        except (InvalidToken, ValueError):
             return None
 
 
@@ -0,0 +1,96 @@
+"""
+Ordered indexes over vault entries, one per account sort mode.
+
+Each SortIndex keeps a sorted list of (sort key, tie-break) pairs plus a
+map from account id to its current pair, so a changed entry is located by
+binary search and moved without re-sorting anything. Sort keys (such as the
+casefolded account name) are computed once per change instead of on every
+comparison.
+
+AccountManager registers these alongside its SearchIndex and keeps them
+up to date through the same add()/discard() hooks.
+"""
+
+from bisect import bisect_left, insort
+
+
+class SortIndex:
+    """Entries ordered by ``key(account)``, ties broken by account id."""
+
+    def __init__(self, key, reverse=False):
+        """
+        Args:
+            key: callable returning an orderable sort key for an account
+            reverse: list largest keys first (ties still in id order)
+        """
+        self._key = key
+        self.reverse = reverse
+        self._entries = []  # sorted ascending (key, tie-break)
+        self._by_id = {}    # account id -> its entry in _entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, account):
+        account_id = account["id"]
+        # Negating the id keeps ties in id order when walked backwards
+        return (self._key(account), -account_id if self.reverse else account_id)
+
+    def rebuild(self, accounts):
+        """Discard everything and index ``accounts`` from scratch."""
+        self._by_id = {account["id"]: self._entry(account) for account in accounts}
+        self._entries = sorted(self._by_id.values())
+
+    def add(self, account):
+        """Insert a new entry or move a changed one to its new position."""
+        entry = self._entry(account)
+        old = self._by_id.get(account["id"])
+        if old == entry:
+            return
+        if old is not None:
+            self._remove(old)
+        insort(self._entries, entry)
+        self._by_id[account["id"]] = entry
+
+    def discard(self, account_id):
+        """Remove one entry from the index, if present."""
+        old = self._by_id.pop(account_id, None)
+        if old is not None:
+            self._remove(old)
+
+    def _remove(self, entry):
+        i = bisect_left(self._entries, entry)
+        del self._entries[i]
+
+    def ids(self, offset=0, limit=None):
+        """Return account ids in display order, optionally one page of them."""
+        entries = self._entries
+        n = len(entries)
+        stop = n if limit is None else min(n, offset + limit)
+        if offset >= stop:
+            return []
+        if self.reverse:
+            page = entries[n - stop:n - offset]
+            page.reverse()
+        else:
+            page = entries[offset:stop]
+        return [abs(entry[1]) for entry in page]
+
+    def iter_ids(self):
+        """Lazily yield every id in display order."""
+        entries = reversed(self._entries) if self.reverse else self._entries
+        return (abs(entry[1]) for entry in entries)
+
+    def order(self, ids, lazy=False):
+        """
+        Return ``ids`` (a set of indexed ids) in display order.
+
+        With ``lazy`` a large share of the vault is yielded while walking
+        the index, so reading only the first page stops early.
+        """
+        if len(ids) * 8 > len(self._entries):
+            # A large share of the vault: walking the index beats sorting
+            walk = (account_id for account_id in self.iter_ids() if account_id in ids)
+            return walk if lazy else list(walk)
+        by_id = self._by_id
+        return sorted(ids, key=by_id.__getitem__, reverse=self.reverse)
@@ -0,0 +1,373 @@
+"""
+SQLite-backed vault storage for BlueVault.
+
+An alternative to the JSON vault file, selected with the "vault_storage"
+setting. The database (user_data/vault_<username>.db) runs in WAL mode and
+keeps one row per account:
+
+    id                    INTEGER PRIMARY KEY
+    name_hash             keyed HMAC of the lowercased account name
+    created_date          plaintext ISO timestamps; the first three are
+    last_modified         indexed so the date sort modes are index scans
+    last_copied
+    last_password_change
+    frecency              plaintext "Most used" score (see frecency.py), indexed
+    entry                 Fernet token: account_name, username, website_url
+    secret                Fernet token: password, notes (same token as the
+                          JSON vault's secret token, see vault_file)
+
+Only the timestamps and the frecency score are stored in the clear. Names are looked up through
+the keyed hash, so exact-name lookups are index seeks without revealing
+the name. Alphabetical order cannot be served by an index without storing
+names in plaintext, so that sort mode still decrypts and sorts in memory.
+
+Rows are exchanged as (account metadata, secret token) records: the secret
+column is handed back still encrypted and only decrypted on demand by
+AccountManager.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import sqlite3
+
+from services import vault_file
+from services.account_record import AccountRecord
+
+
+# Entry fields kept as plaintext, indexed columns
+TIMESTAMP_FIELDS = ("created_date", "last_modified", "last_copied", "last_password_change")
+PLAIN_FIELDS = TIMESTAMP_FIELDS + ("frecency",)
+
+# Entry fields encrypted together in the secret column
+SECRET_FIELDS = vault_file.SECRET_FIELDS
+
+# Sort mode -> ORDER BY clause (newest first, never-copied last)
+_ORDER_BY = {
+    "date_created": "created_date DESC, id",
+    "date_modified": "last_modified DESC, id",
+    "last_copied": "last_copied IS NULL, last_copied DESC, id",
+    "most_used": "frecency IS NULL, frecency DESC, id",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vault_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    id                   INTEGER PRIMARY KEY,
+    name_hash            BLOB NOT NULL,
+    created_date         TEXT NOT NULL,
+    last_modified        TEXT NOT NULL,
+    last_copied          TEXT,
+    last_password_change TEXT NOT NULL,
+    frecency             REAL,
+    entry                BLOB NOT NULL,
+    secret               BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_name_hash ON accounts (name_hash);
+CREATE INDEX IF NOT EXISTS idx_accounts_created ON accounts (created_date);
+CREATE INDEX IF NOT EXISTS idx_accounts_modified ON accounts (last_modified);
+CREATE INDEX IF NOT EXISTS idx_accounts_copied ON accounts (last_copied);
+"""
+
+_SELECT = (
+    "SELECT id, created_date, last_modified, last_copied, "
+    "last_password_change, frecency, entry, secret FROM accounts"
+)
+
+_NAME_INDEX_LABEL = b"BlueVault name index v1"
+
+
+class SQLiteVaultStore:
+    """
+    Account storage in a per-user SQLite database.
+
+    Mirrors the JSON vault's load-everything / save-everything interface
+    (load_all / save_all) so AccountManager can swap it in, and adds
+    indexed lookups (get, find_by_name, query) that avoid decrypting the
+    whole vault.
+    """
+
+    def __init__(self, db_path, cipher, key):
+        """
+        Open (creating if needed) the database at ``db_path``.
+
+        Raises:
+            vault_file.VaultKeyError: ``key`` does not match the database.
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._add_frecency_column()
+        self._check_key(key)
+        self._use_key(cipher, key)
+        if self._stored_kcv() is None:
+            with self.conn:
+                self._store_kcv()
+
+        # account id -> (entry digest, secret token, timestamps); None
+        # until load_all() runs, so save_all() knows what is stored
+        self._state = None
+
+    def _add_frecency_column(self):
+        """Upgrade databases created before the frecency column existed."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(accounts)")}
+        with self.conn:
+            if "frecency" not in columns:
+                self.conn.execute("ALTER TABLE accounts ADD COLUMN frecency REAL")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_accounts_frecency ON accounts (frecency)"
+            )
+
+    def _stored_kcv(self):
+        row = self.conn.execute(
+            "SELECT value FROM vault_meta WHERE key = 'kcv'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _check_key(self, key):
+        """Raise VaultKeyError if ``key`` does not match the stored key-check value."""
+        stored = self._stored_kcv()
+        if stored is not None and not hmac.compare_digest(
+                stored, vault_file.key_check_value(key)):
+            raise vault_file.VaultKeyError("master password does not match this vault")
+
+    def forget_key(self):
+        """Drop the key while the session is locked (see AccountManager.lock)."""
+        self.cipher = None
+        self.reader = None
+        self.key = None
+        self._name_key = None
+
+    def unlock(self, cipher, key):
+        """
+        Take the key back after forget_key().
+
+        Raises:
+            vault_file.VaultKeyError: ``key`` does not match the database.
+        """
+        self._check_key(key)
+        self._use_key(cipher, key)
+
+    def _use_key(self, cipher, key):
+        self.cipher = cipher
+        self.reader = vault_file.TokenReader(key)
+        self.key = key
+        self._name_key = hmac.new(
+            base64.urlsafe_b64decode(key), _NAME_INDEX_LABEL, hashlib.sha256
+        ).digest()
+
+    def _store_kcv(self):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO vault_meta (key, value) VALUES ('kcv', ?)",
+            (vault_file.key_check_value(self.key),),
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def data_version(self):
+        """Changes whenever another connection commits to the database."""
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Row encoding
+    # ------------------------------------------------------------------
+    def name_hash(self, account_name):
+        """Keyed hash used to look accounts up by (case-insensitive) name."""
+        return hmac.new(
+            self._name_key, (account_name or "").lower().encode("utf-8"), hashlib.sha256
+        ).digest()
+
+    @staticmethod
+    def _split(account):
+        """Split entry metadata into (entry JSON, plaintext column values)."""
+        skip = ("id",) + PLAIN_FIELDS + SECRET_FIELDS
+        entry = {k: v for k, v in account.items() if k not in skip}
+        timestamps = tuple(account.get(k) for k in PLAIN_FIELDS)
+        return (
+            json.dumps(entry, sort_keys=True, separators=(",", ":")).encode(),
+            timestamps,
+        )
+
+    def _row_to_record(self, row):
+        """Decrypt a row's metadata; the secret column stays encrypted."""
+        account_id, created, modified, copied, changed, frecency, entry, secret = row
+        account = AccountRecord.from_dict(vault_file.load_json(self.reader.decrypt(entry)))
+        account.id = account_id
+        account["created_date"] = created
+        account["last_password_change"] = changed
+        account["last_modified"] = modified
+        account["last_copied"] = copied
+        account["frecency"] = frecency
+        return account, secret
+
+    # ------------------------------------------------------------------
+    # Whole-vault interface (used by AccountManager._load_vault/_save_vault)
+    # ------------------------------------------------------------------
+    def load_all(self):
+        """Return every (account metadata, secret token) record, ordered by id."""
+        records = []
+        state = {}
+        for row in self.conn.execute(_SELECT + " ORDER BY id"):
+            account, secret = self._row_to_record(row)
+            entry_json, timestamps = self._split(account)
+            state[account["id"]] = (
+                hashlib.sha256(entry_json).digest(), secret, timestamps
+            )
+            records.append((account, secret))
+        self._state = state
+        return records
+
+    def save_all(self, records):
+        """
+        Make the database match ``records`` in one SQL transaction.
+
+        Only rows that changed are written: rows whose metadata or secret
+        token changed are rewritten, rows where only timestamps changed
+        get a plain UPDATE, and missing ids are deleted.
+        """
+        if self._state is None:
+            stored_ids = {r[0] for r in self.conn.execute("SELECT id FROM accounts")}
+            old_state = {}
+        else:
+            stored_ids = set(self._state)
+            old_state = self._state
+
+        new_state, upserts, timestamp_updates = self._plan_save(records, old_state)
+        deleted = [(i,) for i in stored_ids - set(new_state)]
+        with self.conn:
+            self.conn.executemany("DELETE FROM accounts WHERE id = ?", deleted)
+            self._apply_save(upserts, timestamp_updates)
+        self._state = new_state
+
+    def rekey(self, cipher, key, records):
+        """
+        Replace every row, re-encrypted under a new key, in one transaction.
+
+        The secret tokens in ``records`` must already be encrypted under
+        the new key.
+        """
+        self._use_key(cipher, key)
+        new_state, upserts, _ = self._plan_save(records, {})
+        with self.conn:
+            self.conn.execute("DELETE FROM accounts")
+            self._store_kcv()
+            self._apply_save(upserts, [])
+        self._state = new_state
+
+    def _plan_save(self, records, old_state):
+        """Work out which rows need rewriting or just new timestamps."""
+        new_state = {}
+        upserts = []
+        timestamp_updates = []
+        for account, secret in records:
+            entry_json, timestamps = self._split(account)
+            state = (hashlib.sha256(entry_json).digest(), secret, timestamps)
+            account_id = account["id"]
+            new_state[account_id] = state
+
+            old = old_state.get(account_id)
+            if old is not None and old[:2] == state[:2]:
+                if old[2] != timestamps:
+                    timestamp_updates.append(timestamps + (account_id,))
+                continue
+            upserts.append((
+                account_id,
+                self.name_hash(account.get("account_name")),
+                *timestamps,
+                self.cipher.encrypt(vault_file.pad_plaintext(entry_json)),
+                secret,
+            ))
+        return new_state, upserts, timestamp_updates
+
+    def _apply_save(self, upserts, timestamp_updates):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO accounts (id, name_hash, created_date, "
+            "last_modified, last_copied, last_password_change, frecency, entry, secret) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            upserts,
+        )
+        self.conn.executemany(
+            "UPDATE accounts SET created_date = ?, last_modified = ?, "
+            "last_copied = ?, last_password_change = ?, frecency = ? WHERE id = ?",
+            timestamp_updates,
+        )
+
+    # ------------------------------------------------------------------
+    # Indexed lookups
+    # ------------------------------------------------------------------
+    def get(self, account_id):
+        """Return one (metadata, secret token) record by primary key, or None."""
+        row = self.conn.execute(_SELECT + " WHERE id = ?", (account_id,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def find_by_name(self, account_name):
+        """Return the records whose name matches case-insensitively."""
+        rows = self.conn.execute(
+            _SELECT + " WHERE name_hash = ? ORDER BY id",
+            (self.name_hash(account_name),),
+        )
+        return [self._row_to_record(row) for row in rows]
+
+    def can_query(self, sort_by):
+        """True if ``sort_by`` is served by an index scan."""
+        return sort_by in _ORDER_BY
+
+    def query(self, sort_by, offset=0, limit=None):
+        """Return one page of records in ``sort_by`` order via an index scan."""
+        sql = _SELECT + f" ORDER BY {_ORDER_BY[sort_by]} LIMIT ? OFFSET ?"
+        rows = self.conn.execute(sql, (-1 if limit is None else limit, offset))
+        return [self._row_to_record(row) for row in rows]
+
+    def next_id(self):
+        """Return an unused account id (one past the largest stored)."""
+        row = self.conn.execute("SELECT MAX(id) FROM accounts").fetchone()
+        return (row[0] or 0) + 1
+
+    def put(self, account, secret):
+        """Insert or replace a single account row."""
+        new_state, upserts, _ = self._plan_save([(account, secret)], {})
+        with self.conn:
+            self._apply_save(upserts, [])
+        if self._state is not None:
+            self._state.update(new_state)
+
+    def get_usage(self, account_id):
+        """Return one row's (last_copied, frecency), or None if it is missing."""
+        return self.conn.execute(
+            "SELECT last_copied, frecency FROM accounts WHERE id = ?", (account_id,)
+        ).fetchone()
+
+    def set_last_copied_many(self, usage):
+        """
+        Update several rows' last_copied and frecency in one transaction.
+
+        Args:
+            usage: list of (account id, timestamp, frecency)
+        """
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE accounts SET last_copied = ?, frecency = ? WHERE id = ?",
+                [(timestamp, score, account_id) for account_id, timestamp, score in usage],
+            )
+        for account_id, timestamp, score in usage:
+            self._note_usage(account_id, timestamp, score)
+
+    def _note_usage(self, account_id, timestamp, frecency):
+        if self._state is not None and account_id in self._state:
+            entry_digest, secret, timestamps = self._state[account_id]
+            timestamps = timestamps[:2] + (timestamp,) + timestamps[3:4] + (frecency,)
+            self._state[account_id] = (entry_digest, secret, timestamps)
+
+    def delete(self, account_id):
+        """Delete one row by primary key."""
+        with self.conn:
+            self.conn.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
+        if self._state is not None:
+            self._state.pop(account_id, None)
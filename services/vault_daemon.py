@@ -0,0 +1,529 @@
+"""
+Local vault daemon: one unlocked session served over a Unix socket.
+
+Opening a vault means deriving the key and decrypting every entry's
+metadata. The daemon does that once, keeps the AccountManager (and its
+search, sort and domain indexes) in memory, and answers requests from any
+number of local clients over a Unix domain socket, so tools like the CLI
+can look entries up without unlocking the vault themselves.
+
+Protocol: JSON lines. Each request is one JSON object on its own line,
+
+    {"id": 1, "op": "search", "query": "bank", "limit": 10}
+
+and gets exactly one response line, in request order per connection
+(clients may pipeline):
+
+    {"id": 1, "ok": true, "result": [...]}
+    {"id": 1, "ok": false, "error": "unknown account 42"}
+
+Operations:
+    ping                                   -> "pong"
+    get     account_id, fields?            -> entry (secrets only if listed in fields)
+    search  query?, sort_by?, offset?, limit?, fields?
+                                           -> list of entries (see iter_accounts)
+    url     url                            -> entries for a website, best first
+    copy    account_id, field="password"   -> the secret; records the copy
+                                              (last_copied, "Most used"),
+                                              written in a batch shortly after
+    put     account                        -> id; updates when account has an
+                                              "id", creates otherwise (only
+                                              account_name, username, password,
+                                              notes and website_url can be set)
+    delete  account_id                     -> true if deleted
+    lock                                   -> stops the daemon
+
+Anyone who can connect gets the unlocked vault, so the socket lives in a
+directory only the user can enter and is itself mode 0600; on Linux every
+connecting process must also belong to the same user (SO_PEERCRED, as for
+the key agent). Requests are
+handled one at a time on the event loop: reads are served from memory, and
+AccountManager is not thread-safe, so writes are not moved to threads.
+
+Run with:  python -m services.vault_daemon <username>
+Benchmark: python -m services.vault_daemon --bench
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+
+from services import vault_file
+
+
+# Longest accepted request line (an entry with long notes still fits)
+_LINE_LIMIT = 1 << 20
+
+# Copies are written in one batch this long after the first (as in the GUI)
+_COPY_FLUSH_DELAY = 2.0
+
+# Fields returned when a request does not list any
+_DEFAULT_FIELDS = (
+    "account_name", "username", "website_url",
+    "created_date", "last_modified", "last_password_change", "last_copied",
+)
+
+# The only fields a put may set; timestamps and usage are kept by
+# AccountManager itself
+_EDITABLE_FIELDS = ("account_name", "username", "password", "notes", "website_url")
+
+
+class DaemonError(Exception):
+    """A request failed; the message is sent back to the client."""
+
+
+def default_socket_path(username):
+    """
+    Per-user socket path, inside a directory only the current user can use.
+
+    Raises:
+        DaemonError: that directory is not safe to use (see key_agent.runtime_dir)
+    """
+    from services.key_agent import AgentError, runtime_dir
+    try:
+        return os.path.join(runtime_dir(), f"{username}.sock")
+    except AgentError as e:
+        raise DaemonError(str(e))
+
+
+def _encode(obj):
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class VaultDaemon:
+    """Serves one unlocked AccountManager over a Unix socket."""
+
+    def __init__(self, account_manager, socket_path):
+        """
+        Args:
+            account_manager: an unlocked AccountManager
+            socket_path: where to listen (see default_socket_path)
+        """
+        self.account_manager = account_manager
+        self.socket_path = socket_path
+        self._stopped = None
+        self._flush_handle = None  # pending flush of recorded copies
+        self._ops = {
+            "ping": self._op_ping,
+            "get": self._op_get,
+            "search": self._op_search,
+            "url": self._op_url,
+            "copy": self._op_copy,
+            "put": self._op_put,
+            "delete": self._op_delete,
+            "lock": self._op_lock,
+        }
+
+    # ------------------------------------------------------------------
+    # Server
+    # ------------------------------------------------------------------
+    async def serve(self, ready=None):
+        """
+        Listen until a client sends "lock" (or the task is cancelled).
+
+        Args:
+            ready: optional asyncio.Event set once the socket accepts clients
+
+        Raises:
+            DaemonError: another daemon is already listening on the socket
+        """
+        self._stopped = asyncio.Event()
+        self._remove_stale_socket()
+
+        # Create the socket with no group/other permissions from the start
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self._handle_client, path=self.socket_path, limit=_LINE_LIMIT
+            )
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+        try:
+            async with server:
+                if ready is not None:
+                    ready.set()
+                await self._stopped.wait()
+        finally:
+            self._flush_copies()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)  # left behind by a daemon that died
+            return
+        finally:
+            probe.close()
+        raise DaemonError(f"a daemon is already listening on {self.socket_path}")
+
+    async def _handle_client(self, reader, writer):
+        from services.key_agent import peer_is_owner
+        try:
+            if not peer_is_owner(writer):
+                return  # another user; the socket mode should prevent this
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(self.handle_line(line))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # client went away, or sent a line over _LINE_LIMIT
+        finally:
+            writer.close()
+
+    def handle_line(self, line):
+        """Answer one request line; always returns one response line."""
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise DaemonError("request is not valid JSON")
+            if not isinstance(request, dict):
+                raise DaemonError("request must be a JSON object")
+            request_id = request.get("id")
+            handler = self._ops.get(request.get("op"))
+            if handler is None:
+                raise DaemonError(f"unknown op {request.get('op')!r}")
+            result = handler(request)
+        except DaemonError as e:
+            return _encode({"id": request_id, "ok": False, "error": str(e)})
+        except Exception as e:
+            print(f"[vault_daemon] Request failed: {e}")
+            return _encode({"id": request_id, "ok": False, "error": f"internal error: {e}"})
+        return _encode({"id": request_id, "ok": True, "result": result})
+
+    # ------------------------------------------------------------------
+    # Operations
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _account_id(request):
+        account_id = request.get("account_id")
+        if not isinstance(account_id, int):
+            raise DaemonError("account_id must be an integer")
+        return account_id
+
+    @staticmethod
+    def _fields(request):
+        fields = request.get("fields") or _DEFAULT_FIELDS
+        if not isinstance(fields, (list, tuple)):
+            raise DaemonError("fields must be a list")
+        return list(fields)
+
+    def _op_ping(self, request):
+        return "pong"
+
+    def _op_get(self, request):
+        account_id = self._account_id(request)
+        fields = self._fields(request)
+        account = self.account_manager.get_account(
+            account_id,
+            include_secrets=any(f in vault_file.SECRET_FIELDS for f in fields),
+        )
+        if account is None:
+            raise DaemonError(f"unknown account {account_id}")
+        result = {"id": account_id}
+        for field in fields:
+            result[field] = account.get(field)
+        return result
+
+    def _op_search(self, request):
+        try:
+            return list(self.account_manager.iter_accounts(
+                request.get("sort_by"),
+                query=request.get("query") or None,
+                offset=int(request.get("offset") or 0),
+                limit=request.get("limit"),
+                fields=self._fields(request),
+            ))
+        except ValueError as e:  # includes query_filter.QueryError
+            raise DaemonError(str(e))
+
+    def _op_url(self, request):
+        url = request.get("url")
+        if not isinstance(url, str):
+            raise DaemonError("url must be a string")
+        return self.account_manager.find_accounts_for_url(url)
+
+    def _op_copy(self, request):
+        account_id = self._account_id(request)
+        field = request.get("field", "password")
+        if field not in vault_file.SECRET_FIELDS:
+            raise DaemonError(f"field must be one of {', '.join(vault_file.SECRET_FIELDS)}")
+        value = self.account_manager.get_secret(account_id, field)
+        if value is None:
+            raise DaemonError(f"unknown account {account_id}")
+        # Written in a batch later; a full vault save per copy would block
+        # every other client
+        self.account_manager.record_copy(account_id)
+        self._schedule_copy_flush()
+        return value
+
+    def _schedule_copy_flush(self):
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_copies()  # not serving (handle_line called directly)
+            return
+        self._flush_handle = loop.call_later(_COPY_FLUSH_DELAY, self._flush_copies)
+
+    def _flush_copies(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self.account_manager.flush_copies():
+            print("[vault_daemon] Failed to write copied timestamps")
+
+    def _op_put(self, request):
+        account = request.get("account")
+        if not isinstance(account, dict):
+            raise DaemonError("account must be an object")
+        fields = {k: v for k, v in account.items() if k != "id"}
+        for key, value in fields.items():
+            if key not in _EDITABLE_FIELDS:
+                raise DaemonError(
+                    f"cannot set {key!r}; editable fields are {', '.join(_EDITABLE_FIELDS)}"
+                )
+            if not isinstance(value, str):
+                raise DaemonError(f"{key} must be a string")
+        if "id" in account:
+            if not isinstance(account["id"], int):
+                raise DaemonError("id must be an integer")
+            updated = self.account_manager.update_account(account["id"], **fields)
+            if updated is None:
+                raise DaemonError(f"could not update account {account['id']}")
+            return updated["id"]
+        if not fields.get("account_name"):
+            raise DaemonError("account_name is required")
+        created = self.account_manager.create_account(
+            fields.get("account_name"),
+            fields.get("username", ""),
+            fields.get("password", ""),
+            notes=fields.get("notes", ""),
+            website_url=fields.get("website_url", ""),
+        )
+        if created is None:
+            raise DaemonError("could not create account")
+        return created["id"]
+
+    def _op_delete(self, request):
+        return bool(self.account_manager.delete_account(self._account_id(request)))
+
+    def _op_lock(self, request):
+        self._stopped.set()
+        return True
+
+
+class VaultClient:
+    """Blocking client for a running VaultDaemon (one request at a time)."""
+
+    def __init__(self, socket_path, timeout=5.0):
+        """
+        Raises:
+            OSError: no daemon is listening on ``socket_path``
+        """
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile("rb")
+        self._next_id = 0
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def request(self, op, **args):
+        """
+        Send one request and wait for its response.
+
+        Returns:
+            the response's result
+
+        Raises:
+            DaemonError: the daemon reported an error
+            OSError: the connection failed
+        """
+        self._next_id += 1
+        self._sock.sendall(_encode({"id": self._next_id, "op": op, **args}))
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "request failed"))
+        return response.get("result")
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+async def _bench_client(socket_path, requests, latencies):
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=_LINE_LIMIT)
+    loop = asyncio.get_running_loop()
+    try:
+        for request in requests:
+            start = loop.time()
+            writer.write(_encode(request))
+            await writer.drain()
+            line = await reader.readline()
+            latencies.append(loop.time() - start)
+            if not json.loads(line)["ok"]:
+                raise DaemonError(line.decode())
+    finally:
+        writer.close()
+
+
+async def benchmark(account_manager, clients=50, requests_per_client=200):
+    """
+    Serve ``account_manager`` and hammer it with concurrent clients.
+
+    Each client holds one connection and sends a mix of get, search and
+    url requests, waiting for each response before sending the next.
+
+    Returns:
+        dict: requests, seconds, requests_per_second, p50_ms, p99_ms
+    """
+    import random
+
+    ids = [a["id"] for a in account_manager.iter_accounts(fields=["id"])]
+    names = [a["account_name"] for a in account_manager.iter_accounts(fields=["account_name"])]
+    rng = random.Random(0)
+
+    def make_request(i):
+        kind = rng.random()
+        if kind < 0.6:
+            return {"id": i, "op": "get", "account_id": rng.choice(ids)}
+        if kind < 0.9:
+            # A word prefix, as typed into a search box
+            return {"id": i, "op": "search", "query": rng.choice(names)[:rng.randint(3, 6)],
+                    "sort_by": "alphabetical", "limit": 20}
+        return {"id": i, "op": "url", "url": f"https://login.site{rng.randrange(500)}.com/x"}
+
+    workload = [
+        [make_request(i) for i in range(requests_per_client)] for _ in range(clients)
+    ]
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="bluevault-bench-"), "bench.sock")
+    daemon = VaultDaemon(account_manager, socket_path)
+    ready = asyncio.Event()
+    server = asyncio.create_task(daemon.serve(ready))
+    await ready.wait()
+
+    latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.gather(*(_bench_client(socket_path, w, latencies) for w in workload))
+    elapsed = loop.time() - start
+
+    daemon._stopped.set()
+    await server
+    os.rmdir(os.path.dirname(socket_path))
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "requests": total,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "p50_ms": latencies[total // 2] * 1000,
+        "p99_ms": latencies[min(total - 1, int(total * 0.99))] * 1000,
+    }
+
+
+_BENCH_SERVICES = (
+    "Amazon", "Apple", "Bank", "Coinbase", "Discord", "Dropbox", "Facebook",
+    "GitHub", "GitLab", "Gmail", "Instagram", "LinkedIn", "Netflix", "Outlook",
+    "PayPal", "Reddit", "Slack", "Spotify", "Steam", "Twitter", "Uber", "Zoom",
+)
+
+
+def _run_benchmark(entries=5000):
+    from services.account import AccountManager
+
+    username = "daemon_bench"
+    manager = AccountManager(username, "bench-password")
+    try:
+        manager.create_accounts([
+            {
+                "account_name": f"{_BENCH_SERVICES[i % len(_BENCH_SERVICES)]} {i:05d}",
+                "username": f"user{i}@example.com",
+                "password": f"pw-{i}",
+                "website_url": f"https://login.site{i % 500}.com",
+            }
+            for i in range(entries)
+        ])
+        stats = asyncio.run(benchmark(manager))
+        print(
+            f"{stats['requests']} requests from 50 clients over {entries} entries: "
+            f"{stats['requests_per_second']:.0f} req/s, "
+            f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms"
+        )
+    finally:
+        os.remove(manager.vault_file)
+
+
+def main(argv=None):
+    import argparse
+    import getpass
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.vault_daemon",
+        description="Serve an unlocked BlueVault vault over a Unix socket.",
+    )
+    parser.add_argument("username", nargs="?")
+    parser.add_argument("--socket", help="socket path (default: per-user runtime dir)")
+    parser.add_argument("--bench", action="store_true",
+                        help="run the throughput/latency benchmark and exit")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        _run_benchmark()
+        return 0
+    if not args.username:
+        parser.error("username is required")
+
+    from services.account import AccountManager
+    from services.login import LoginManager
+    from services.settings import SettingsManager
+
+    password = getpass.getpass(f"Master password for {args.username}: ")
+    ok, message = LoginManager().verify_login(args.username, password)
+    if not ok:
+        print(message)
+        return 1
+
+    settings = SettingsManager(args.username)
+    manager = AccountManager(
+        args.username, password,
+        storage=settings.get_vault_storage(),
+        renewal_days=settings.get_password_renewal_days(),
+    )
+    manager.get_sorted_accounts("alphabetical", limit=1)  # load and index now
+    try:
+        socket_path = args.socket or default_socket_path(args.username)
+        print(f"BlueVault daemon listening on {socket_path} (send 'lock' to stop)")
+        asyncio.run(VaultDaemon(manager, socket_path).serve())
+    except KeyboardInterrupt:
+        pass
+    except DaemonError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,420 @@
+"""
+On-disk vault file format helpers for BlueVault.
+
+A vault file starts with a one-line JSON header, followed by one line per
+account holding two Fernet tokens separated by a space:
+
+    {"format": "bluevault-vault", "version": 4, "kcv": "<hex>"}
+    gAAAAA... gAAAAA...   <- account 1: metadata token, secret token
+    gAAAAA... gAAAAA...   <- account 2
+
+The metadata token holds every field except the secret ones (password and
+notes), which are encrypted separately so the vault can be listed, sorted
+and searched without decrypting any secrets.
+
+The header's key-check value (KCV) is an HMAC of a fixed label under the
+vault key, so a master password can be verified with one small MAC
+operation instead of decrypting and parsing the whole vault. Storing each
+account as its own token lets readers decrypt entries incrementally from
+any binary stream (a file or a zip member) and lets writers reuse the
+tokens of entries that did not change.
+
+The per-account layout does leak some shape: anyone holding the file
+can count the entries (one line each) and compare token sizes. Before
+encryption every plaintext is padded with spaces to a multiple of
+PAD_BLOCK bytes (see pad_plaintext), so a token only reveals a size
+bucket rather than an entry's exact length. Tokens written before the
+padding keep their size until the entry is next edited or the master
+password is changed; the entry count is not hidden.
+
+Tokens are read with TokenReader, which decrypts into one reusable
+buffer instead of a new bytes object (plus intermediate copies) per
+token; JSON is parsed straight from that buffer with load_json.
+
+Older layouts are still read and are upgraded on the next save:
+    (no header)  bare Fernet token of the JSON account list
+    version 2    header line + Fernet token of the JSON account list
+    version 3    one token per account line, secrets included
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import json
+import os
+import tempfile
+
+
+VAULT_FORMAT = "bluevault-vault"
+VAULT_VERSION = 4
+
+# First version that stores one token per account line.
+_RECORDS_VERSION = 3
+
+# Entry fields stored in the separate secret token.
+SECRET_FIELDS = ("password", "notes")
+
+# Plaintexts are padded to a multiple of this many bytes before encryption
+PAD_BLOCK = 256
+
+# Fixed message MAC'd under the vault key to produce the key-check value.
+_KCV_LABEL = b"BlueVault key check v1"
+
+# Vault file read ahead of time by prefetch(): path -> (stat stamp, bytes)
+_prefetched = {}
+
+# Initial size of a TokenReader buffer; it grows to the largest token read
+_READER_BUFFER_SIZE = 1024
+
+# Buffers are wiped in blocks of this many zeros, so wiping a large
+# plaintext does not allocate another buffer of the same size
+_ZEROS = memoryview(bytes(4096))
+
+
+def derive_key(password: str) -> bytes:
+    """Derive the Fernet vault key from a master password."""
+    # Use SHA-256 to create a 32-byte key from the password
+    # In production, use PBKDF2 or similar with salt
+    digest = hashlib.sha256(password.encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest)
+
+
+def key_check_value(key: bytes) -> str:
+    """Return the hex key-check value stored in the header for ``key``."""
+    raw_key = base64.urlsafe_b64decode(key)
+    return hmac.new(raw_key, _KCV_LABEL, hashlib.sha256).hexdigest()
+
+
+def build_header(key: bytes) -> bytes:
+    """Build the encoded header line (without trailing newline)."""
+    header = {
+        "format": VAULT_FORMAT,
+        "version": VAULT_VERSION,
+        "kcv": key_check_value(key),
+    }
+    return json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+
+def _parse_header(line: bytes):
+    """Decode a header line; return the dict, or None if it is not one."""
+    try:
+        header = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get("format") != VAULT_FORMAT:
+        return None
+    return header
+
+
+class VaultKeyError(ValueError):
+    """Raised when a key does not match a vault's key-check value."""
+
+
+def read_header(path: str):
+    """
+    Read only the header line of a vault file.
+
+    Returns:
+        dict, or None if the file is missing, empty or a legacy vault.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(1) != b"{":
+                return None
+            f.seek(0)
+            line = f.readline()
+    except OSError:
+        return None
+    return _parse_header(line.strip())
+
+
+def header_matches_key(header: dict, key: bytes) -> bool:
+    """Return True if ``key`` produces the header's key-check value."""
+    stored = header.get("kcv")
+    if not isinstance(stored, str):
+        return False
+    return hmac.compare_digest(stored, key_check_value(key))
+
+
+def verify_key(path: str, key: bytes):
+    """
+    Check ``key`` against the vault header's key-check value.
+
+    Returns:
+        True/False, or None when the vault has no header (legacy format)
+        and the caller must fall back to a trial decrypt.
+    """
+    header = read_header(path)
+    if header is None or "kcv" not in header:
+        return None
+    return header_matches_key(header, key)
+
+
+def _stat_stamp(path: str):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def prefetch(path: str) -> bool:
+    """
+    Read a vault file into memory ahead of opening it, e.g. while the
+    login screen waits for the master password. The bytes are still
+    encrypted. Only the most recent prefetch is kept, and open_vault uses
+    it once if the file has not changed since.
+
+    Returns:
+        True if the file was read.
+    """
+    try:
+        stamp = _stat_stamp(path)
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return False
+    _prefetched.clear()
+    _prefetched[path] = (stamp, data)
+    return True
+
+
+def open_vault(path: str):
+    """Open a vault file for reading, from prefetched bytes when still current."""
+    entry = _prefetched.pop(path, None)
+    if entry is not None:
+        stamp, data = entry
+        try:
+            current = _stat_stamp(path) == stamp
+        except OSError:
+            current = False
+        if current:
+            return io.BytesIO(data)
+    return open(path, "rb")
+
+
+class TokenReader:
+    """
+    Fernet-compatible decryption into one reusable buffer.
+
+    Fernet.decrypt returns a new bytes object per token and builds three
+    or four intermediate plaintext copies on the way (padded, finalized,
+    unpadded), none of which can be wiped. TokenReader checks the same
+    HMAC, decrypts AES-CBC straight into a bytearray it keeps between
+    calls and returns a memoryview of the plaintext:
+
+        reader = TokenReader(key)
+        account = load_json(reader.decrypt(token))
+
+    The view is only valid until the next decrypt() or wipe(); copy it
+    (bytes(view)) to keep the plaintext. Each decrypt() and wipe()
+    overwrites the previous plaintext with zeros.
+    """
+
+    def __init__(self, key: bytes):
+        # Imported here so the login window does not wait for cryptography
+        from cryptography.fernet import InvalidToken
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        raw_key = base64.urlsafe_b64decode(key)
+        self._signing_key = raw_key[:16]
+        # One CBC context for every token: CBC decryption of a block only
+        # depends on the block before it, so feeding a token's IV first
+        # resets the chain (its output block is skipped). The context is
+        # never finalized.
+        self._decryptor = Cipher(algorithms.AES(raw_key[16:]), modes.CBC(bytes(16))).decryptor()
+        self._invalid = InvalidToken
+        self._buffer = bytearray(_READER_BUFFER_SIZE)
+        self._used = 0
+
+    def decrypt(self, token) -> memoryview:
+        """
+        Decrypt a Fernet token (no TTL check, like Fernet.decrypt).
+
+        Raises:
+            cryptography.fernet.InvalidToken: malformed token or bad HMAC
+        """
+        try:
+            data = base64.urlsafe_b64decode(token)
+        except (TypeError, binascii.Error):
+            raise self._invalid
+        # version (1) + timestamp (8) + IV (16) + ciphertext blocks + HMAC (32)
+        if len(data) < 73 or data[0] != 0x80 or (len(data) - 57) % 16:
+            raise self._invalid
+
+        view = memoryview(data)
+        mac = hmac.new(self._signing_key, view[:-32], hashlib.sha256).digest()
+        if not hmac.compare_digest(mac, view[-32:]):
+            raise self._invalid
+
+        iv_and_ciphertext = view[9:-32]
+        self.wipe()
+        # update_into needs room for one block more than it writes
+        if len(self._buffer) < len(iv_and_ciphertext) + 15:
+            self._buffer = bytearray(max(len(iv_and_ciphertext) + 15, 2 * len(self._buffer)))
+        written = self._decryptor.update_into(iv_and_ciphertext, self._buffer)
+        self._used = written
+
+        # PKCS7 padding
+        pad = self._buffer[written - 1]
+        if not 1 <= pad <= 16 or self._buffer.count(pad, written - pad, written) != pad:
+            raise self._invalid
+        return memoryview(self._buffer)[16:written - pad]
+
+    def wipe(self):
+        """Overwrite the last plaintext left in the buffer."""
+        for start in range(0, self._used, len(_ZEROS)):
+            end = min(start + len(_ZEROS), self._used)
+            self._buffer[start:end] = _ZEROS[:end - start]
+        self._used = 0
+
+
+def load_json(buffer):
+    """Parse JSON from bytes, a bytearray or a memoryview (UTF-8)."""
+    return json.loads(str(buffer, "utf-8"))
+
+
+def split_secrets(account: dict):
+    """Split an entry into (metadata dict, secret dict)."""
+    meta = {k: v for k, v in account.items() if k not in SECRET_FIELDS}
+    secrets = {k: account.get(k, "") for k in SECRET_FIELDS}
+    return meta, secrets
+
+
+def pad_plaintext(plaintext: bytes) -> bytes:
+    """
+    Pad JSON bytes with trailing spaces to a multiple of PAD_BLOCK.
+
+    JSON ignores the trailing whitespace, so readers need no change.
+    """
+    return plaintext + b" " * (-len(plaintext) % PAD_BLOCK)
+
+
+def encrypt_secrets(cipher, secrets: dict) -> bytes:
+    """Encrypt an entry's secret fields into a secret token."""
+    plaintext = json.dumps(secrets, separators=(",", ":")).encode("utf-8")
+    return cipher.encrypt(pad_plaintext(plaintext))
+
+
+def decrypt_secrets(reader, secret_token: bytes) -> dict:
+    """
+    Decrypt a secret token back into {"password": ..., "notes": ...}.
+
+    ``reader`` is a TokenReader (whose buffer is wiped afterwards) or a
+    Fernet instance.
+    """
+    try:
+        return load_json(reader.decrypt(secret_token))
+    finally:
+        if isinstance(reader, TokenReader):
+            reader.wipe()
+
+
+def record_line(token: bytes, secret_token: bytes) -> bytes:
+    """Join an account's metadata and secret tokens into one vault line."""
+    return token + b" " + secret_token
+
+
+def iter_records(stream, cipher, key: bytes):
+    """
+    Lazily decrypt the accounts in an open binary vault stream.
+
+    Args:
+        stream: binary file-like object positioned at the start of a vault
+        cipher: Fernet instance for ``key`` (tokens are decrypted with a
+                TokenReader for ``key``; kept for existing callers)
+        key: the vault key, checked against the header before decrypting
+
+    Yields:
+        (token, plaintext, secret_token) per account. plaintext is a
+        memoryview of the decrypted JSON of the line's first token, valid
+        until the next item is requested (see TokenReader). For version 4
+        lines that is the metadata only and secret_token holds the still
+        encrypted secret fields; for older layouts plaintext is the whole
+        entry and secret_token is None. token is None for entries read
+        from a single-token layout.
+
+    Raises:
+        VaultKeyError: the header's key-check value does not match ``key``.
+        cryptography.fernet.InvalidToken: a token failed to decrypt.
+    """
+    first = stream.readline()
+    header = _parse_header(first.strip()) if first.startswith(b"{") else None
+
+    if header is not None and not header_matches_key(header, key):
+        raise VaultKeyError("master password does not match this vault")
+
+    if header is None or header.get("version", 2) < _RECORDS_VERSION:
+        # Single-token layouts: the whole account list is one token
+        body = (b"" if header is not None else first) + stream.read()
+        body = body.strip()
+        if not body:
+            return
+        reader = TokenReader(key)
+        plaintext = reader.decrypt(body)
+        del body  # only the decrypted buffer is needed from here on
+        try:
+            accounts = load_json(plaintext)
+        finally:
+            plaintext.release()
+            reader.wipe()
+        del plaintext, reader
+        for account in accounts:
+            plaintext = json.dumps(account, separators=(",", ":")).encode("utf-8")
+            yield None, memoryview(plaintext), None
+        return
+
+    reader = TokenReader(key)
+    try:
+        for line in stream:
+            parts = line.split()
+            if parts:
+                token = parts[0]
+                secret_token = parts[1] if len(parts) > 1 else None
+                yield token, reader.decrypt(token), secret_token
+    finally:
+        reader.wipe()
+
+
+def iter_entries(stream, cipher, key: bytes):
+    """Like iter_records, but yield each account as a full parsed dict."""
+    reader = TokenReader(key)
+    for _, plaintext, secret_token in iter_records(stream, cipher, key):
+        account = load_json(plaintext)
+        if secret_token is not None:
+            account.update(decrypt_secrets(reader, secret_token))
+        yield account
+
+
+def vault_bytes(key: bytes, lines) -> bytes:
+    """Serialize a header plus account lines into vault file bytes."""
+    return b"".join(_iter_lines(key, lines))
+
+
+def write_vault(path: str, key: bytes, lines) -> None:
+    """
+    Atomically write a vault file from an iterable of account lines
+    (see record_line).
+
+    The file is written next to ``path`` and moved into place with
+    os.replace, so a crash mid-write never leaves a truncated vault.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".vault_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(_iter_lines(key, lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _iter_lines(key: bytes, lines):
+    yield build_header(key) + b"\n"
+    for line in lines:
+        yield line + b"\n"
@@ -0,0 +1,121 @@
+"""
+Startup profiling for BlueVaultMain.py --profile-startup.
+
+The parent process re-runs BlueVaultMain.py under ``python -X importtime``.
+The child marks each startup phase (see StartupTimer), draws the login
+window's first frame, reports the marks on stderr and quits. The parent
+then prints how long each phase took, the slowest imports on the way to
+the login window, and whether the modules that should only load after
+login (cryptography, the vault and settings services, the main menu)
+stayed out of the startup path.
+"""
+
+import sys
+import time
+
+
+# Login window visible within this many milliseconds of launch
+TARGET_MS = 150
+
+# Modules that should not be imported before the login window shows
+DEFERRED_MODULES = (
+    "cryptography",
+    "services.account",
+    "services.settings",
+    "services.login",
+    "ui_main_menu",
+)
+
+_MARKER = "BLUEVAULT_STARTUP "
+
+
+class StartupTimer:
+    """Child side: wall-clock marks for each startup phase."""
+
+    def __init__(self):
+        self.marks = []
+
+    def mark(self, phase):
+        self.marks.append((phase, time.time()))
+
+    def report(self):
+        """Write the marks to stderr for the parent to collect."""
+        import json
+        sys.stderr.write(_MARKER + json.dumps(self.marks) + "\n")
+        sys.stderr.flush()
+
+
+def _parse_importtime(lines):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        # One space after the "|", then two more per nesting level
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), self_us, cumulative_us, depth))
+    return imports
+
+
+def run_profiled(script, argv):
+    """
+    Parent side: profile one launch of ``script`` and print a report.
+
+    Returns:
+        int: process exit status (0 if the login window met TARGET_MS)
+    """
+    import json
+    import subprocess
+
+    command = [sys.executable, "-X", "importtime", script, *argv]
+    launched = time.time()
+    result = subprocess.run(command, capture_output=True, text=True)
+
+    lines = result.stderr.splitlines()
+    marks = None
+    for line in lines:
+        if line.startswith(_MARKER):
+            marks = json.loads(line[len(_MARKER):])
+    if marks is None:
+        print("Startup profile failed; the login window did not come up:")
+        for line in [l for l in lines if not l.startswith("import time:")][-10:]:
+            print(f"  {line}")
+        return 1
+
+    print("BlueVault startup profile")
+    print("-" * 48)
+    previous = launched
+    for phase, at in marks:
+        print(f"  {phase:<34}{(at - previous) * 1000:8.1f} ms")
+        previous = at
+    total_ms = (marks[-1][1] - launched) * 1000
+    verdict = "OK" if total_ms <= TARGET_MS else "over budget"
+    print(f"  {'login window visible after':<34}{total_ms:8.1f} ms  "
+          f"(target {TARGET_MS} ms: {verdict})")
+    print("  (times include -X importtime's own overhead)")
+
+    imports = _parse_importtime(lines)
+    top_level = sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])
+    print()
+    print("Slowest top-level imports (cumulative / self ms)")
+    print("-" * 48)
+    for name, self_us, cumulative_us, _ in top_level[:12]:
+        print(f"  {cumulative_us / 1000:7.1f} {self_us / 1000:7.1f}  {name}")
+
+    loaded = {name for name, _, _, _ in imports}
+    early = [m for m in DEFERRED_MODULES
+             if any(name == m or name.startswith(m + ".") for name in loaded)]
+    print()
+    if early:
+        print("Imported before the login window (should be deferred): " + ", ".join(early))
+    else:
+        print("Deferred until after login: " + ", ".join(DEFERRED_MODULES))
+    return 0 if total_ms <= TARGET_MS and not early else 1